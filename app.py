@@ -1,176 +1,187 @@
 import os
-import glob
 import pandas as pd
-import matplotlib.pyplot as plt
 import streamlit as st
 import plotly.express as px
-import io
-import zipfile
+from hft_mm_sim import dashboard as db
+from hft_mm_sim.artifacts import read_table
 
 st.set_page_config(page_title="HFT Backtest Dashboard", layout="wide")
 st.title("📈 HFT Market Making Backtest Dashboard")
 
 # -------------------------------
-# Load Data
+# Cached readers: every cache entry is keyed by the run's file fingerprint, so a
+# rerun of the backtest invalidates it; only requested columns / time ranges are read.
 # -------------------------------
-@st.cache_data
-def load_data():
-    trades, logs = None, None
-    trades_path = "artifacts/trades.csv"
-    logs_path = "artifacts/logs.csv"
-    if os.path.exists(trades_path):
-        trades = pd.read_csv(trades_path)
-    if os.path.exists(logs_path):
-        logs = pd.read_csv(logs_path)
-    return trades, logs
+@st.cache_data(max_entries=256)
+def cached_summary(run_dir, fp):
+    return db.run_summary(run_dir)
 
-trades, logs = load_data()
+@st.cache_data(max_entries=64)
+def cached_bounds(run_dir, fp):
+    return db.time_bounds(run_dir)
+
+@st.cache_data(max_entries=128)
+def cached_series(run_dir, fp, columns, start, end, max_points):
+    return db.load_series(run_dir, list(columns), start, end, max_points)
+
+@st.cache_data(max_entries=64)
+def cached_activity(run_dir, fp, start, end, freq):
+    return db.trade_activity(run_dir, start, end, freq)
+
+@st.cache_data(max_entries=64)
+def cached_attribution(run_dir, fp, start, end, freq):
+    return db.attribution_series(run_dir, start, end, freq)
+
+@st.cache_data(max_entries=64)
+def cached_trades_head(run_dir, fp, start, end, n=20):
+    df = read_table(run_dir, "trades", start=start, end=end)
+    return None if df is None else df.head(n)
 
 # -------------------------------
-# Trades Overview
+# Results store / run selection
 # -------------------------------
-if trades is not None and not trades.empty:
-    st.header("Trades Overview")
-    st.metric("Total Trades", len(trades))
-    st.dataframe(trades.head(20))
-
-    if "pnl" in trades.columns:
-        st.subheader("Trade PnL Distribution")
-        fig = px.histogram(trades, x="pnl", nbins=40, title="Trade PnL Distribution")
-        fig.update_layout(xaxis_title="PnL", yaxis_title="Frequency")
-        st.plotly_chart(fig)
+st.sidebar.header("Runs")
+root = st.sidebar.text_input("Results store", "artifacts")
+runs = db.list_runs(root)
+if not runs:
+    st.error(f"⚠️ No runs with a logs table under {root}/. Run a backtest first.")
+    st.stop()
+run = st.sidebar.selectbox("Run", runs)
+fp = db.fingerprint(run)
 
-    if "liquidity" in trades.columns:
-        st.subheader("Maker vs Taker Split")
-        st.bar_chart(trades["liquidity"].value_counts())
-else:
-    st.error("⚠️ No trades.csv found in artifacts/. Run a backtest first.")
+bounds = cached_bounds(run, fp)
+if bounds is None:
+    st.error("⚠️ Run has an empty logs table.")
     st.stop()
+t0, t1 = bounds
 
-if len(trades) == 0:
-    st.error("⚠️ No trades executed. Check risk manager or config settings.")
+st.sidebar.header("Time range")
+start_date = st.sidebar.date_input("Start Date", t0.date(), min_value=t0.date(), max_value=t1.date())
+end_date = st.sidebar.date_input("End Date", t1.date(), min_value=t0.date(), max_value=t1.date())
+start = max(t0, pd.Timestamp(start_date))
+end = min(t1, pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1))
+max_points = st.sidebar.slider("Max points per chart", 500, 10000, 2000, step=500)
+freq = st.sidebar.selectbox("Aggregation bucket", ["5min", "15min", "1h", "4h", "1D"], index=2)
 
 # -------------------------------
-# Plots & Attribution
+# Trades Overview (aggregated server-side)
 # -------------------------------
-st.header("Generated Plots & Attribution")
-plot_files = glob.glob("artifacts/plots/*.*")
-if plot_files:
-    for f in plot_files:
-        name = os.path.basename(f)
-        if f.endswith(".png"):
-            st.image(f, caption=name)
-        elif f.endswith(".csv"):
-            df_plot = pd.read_csv(f)
-            st.subheader(name)
-            st.dataframe(df_plot.head())
+summary = cached_summary(run, fp)
+st.header("Trades Overview")
+col1, col2, col3 = st.columns(3)
+col1.metric("Total Trades", summary["trades"])
+col2.metric("Final Equity", f"{summary['final_equity']:.2f}")
+col3.metric("Max Drawdown", f"{summary['max_drawdown']:.2f}")
+if summary["trades"] == 0:
+    st.error("⚠️ No trades executed. Check risk manager or config settings.")
 else:
-    st.info("No plots found in artifacts/plots/. Run backtest with plotting enabled.")
+    head = cached_trades_head(run, fp, start, end)
+    if head is not None:
+        st.dataframe(head)
+    activity = cached_activity(run, fp, start, end, freq)
+    if not activity.empty:
+        st.subheader("Trade Activity (Maker vs Taker)")
+        trade_cols = [c for c in activity.columns if c.endswith("_trades")]
+        fig = px.bar(activity, x=activity.index, y=trade_cols, barmode="stack", title=f"Trades per {freq}")
+        fig.update_layout(xaxis_title="Time", yaxis_title="Trades")
+        st.plotly_chart(fig)
+
+# -------------------------------
+# Logs Overview (min/max downsampled for the visible range)
+# -------------------------------
+st.header("Logs Overview")
+st.caption(f"{summary['bars']} bars in run; charts show at most ~{max_points} points per series")
+for col, title in (("equity", "Equity Curve Over Time"), ("inventory", "Inventory Over Time"),
+                   ("cash", "Cash Balance Over Time")):
+    s = cached_series(run, fp, (col,), start, end, max_points)
+    if col in s.columns and len(s):
+        st.subheader(title)
+        fig = px.line(s, x=s.index, y=col, title=title)
+        fig.update_layout(xaxis_title="Time", yaxis_title=col.capitalize())
+        st.plotly_chart(fig)
+        if col == "equity" and s[col].min() < -100:  # Example threshold
+            st.warning("⚠️ Equity dropped below -100. Review strategy.")
 
 # -------------------------------
 # PnL Attribution (Spread vs Markout vs Fees)
 # -------------------------------
-attrib_file = "artifacts/plots/attribution_summary.csv"
-if os.path.exists(attrib_file):
+attr = cached_attribution(run, fp, start, end, freq)
+if not attr.empty:
     st.header("PnL Attribution Analysis")
-    df_attr = pd.read_csv(attrib_file)
-    if set(["spread", "markout", "fees", "time"]).issubset(df_attr.columns):
-        df_attr["time"] = pd.to_datetime(df_attr["time"], errors="coerce")
-
-        st.sidebar.header("Filters")
-        start_date = st.sidebar.date_input("Start Date", df_attr["time"].min().date())
-        end_date = st.sidebar.date_input("End Date", df_attr["time"].max().date())
-        mask = (df_attr["time"].dt.date >= start_date) & (df_attr["time"].dt.date <= end_date)
-        df_filtered = df_attr.loc[mask].copy()
-
-        if not df_filtered.empty:
-            st.subheader("Cumulative Attribution")
-            fig = px.area(df_filtered, x="time", y=["spread", "markout", "fees"], title="PnL Attribution (Cumulative)")
-            fig.update_layout(yaxis_title="PnL", legend_title="Components")
-            max_pnl_idx = df_filtered[["spread", "markout", "fees"]].cumsum().sum(axis=1).idxmax()
-            fig.add_annotation(x=df_filtered.loc[max_pnl_idx, "time"], y=df_filtered[["spread", "markout", "fees"]].cumsum().sum(axis=1).max(),
-                               text=f"Max PnL: {df_filtered.loc[max_pnl_idx, ['spread', 'markout', 'fees']].sum():.2f}",
-                               showarrow=True, arrowhead=2)
-            st.plotly_chart(fig)
-
-            st.subheader("Daily Attribution Breakdown")
-            daily_attr = df_filtered.set_index("time").resample("1D")[["spread", "markout", "fees"]].sum()
-            fig = px.bar(daily_attr, x=daily_attr.index, y=["spread", "markout", "fees"], title="PnL Attribution per Day",
-                         barmode="stack")
-            fig.update_layout(xaxis_title="Date", yaxis_title="PnL", xaxis_tickangle=45)
-            st.plotly_chart(fig)
-            st.dataframe(daily_attr.tail(10))
-
-            st.subheader("PnL Summary")
-            total_pnl = df_filtered[["spread", "markout", "fees"]].sum().sum()
-            contrib_percent = (df_filtered[["spread", "markout", "fees"]].sum() / total_pnl * 100).round(2).fillna(0)
-            col1, col2, col3 = st.columns(3)
-            col1.metric("Total PnL", f"{total_pnl:.2f}")
-            col2.metric("Spread Contribution", f"{contrib_percent['spread']}%")
-            col3.metric("Markout Contribution", f"{contrib_percent['markout']}%")
-            st.metric("Fees Contribution", f"{contrib_percent['fees']}% (Negative Impact)")
-
-            st.subheader("Statistical Metrics")
-            daily_pnl = daily_attr.sum(axis=1)
-            st.write(f"Average Daily PnL: {daily_pnl.mean():.2f}")
-            st.write(f"Std Dev Daily PnL: {daily_pnl.std():.2f}")
-            st.write(f"Max Daily PnL: {daily_pnl.max():.2f}")
-            st.write(f"Min Daily PnL: {daily_pnl.min():.2f}")
-
-            if total_pnl == 0 or pd.isna(total_pnl):
-                st.warning("Total PnL is zero or undefined. Check data integrity.")
-            elif total_pnl < 0:
-                st.error("Overall loss detected. Review strategy parameters.")
-            if contrib_percent.sum() == 0:
-                st.warning("No significant PnL contributions. Verify trade data.")
-
-            st.download_button("Download Attribution Data", df_filtered.to_csv(index=False),
-                               "attribution_summary_filtered.csv", mime="text/csv")
-        else:
-            st.error("Filtered data is empty. Adjust date range or check input file.")
-    else:
-        st.warning("Attribution CSV does not contain expected columns: spread, markout, fees, time")
+    st.subheader("Cumulative Attribution")
+    fig = px.area(attr.cumsum(), x=attr.index, y=["spread", "markout", "fees"], title="PnL Attribution (Cumulative)")
+    fig.update_layout(yaxis_title="PnL", legend_title="Components")
+    st.plotly_chart(fig)
+
+    st.subheader("Daily Attribution Breakdown")
+    daily_attr = attr.resample("1D").sum()
+    fig = px.bar(daily_attr, x=daily_attr.index, y=["spread", "markout", "fees"], title="PnL Attribution per Day",
+                 barmode="stack")
+    fig.update_layout(xaxis_title="Date", yaxis_title="PnL", xaxis_tickangle=45)
+    st.plotly_chart(fig)
+    st.dataframe(daily_attr.tail(10))
+
+    st.subheader("PnL Summary")
+    totals = attr.sum()
+    total_pnl = totals.sum()
+    contrib_percent = (totals / total_pnl * 100).round(2).fillna(0) if total_pnl else totals * 0
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total PnL", f"{total_pnl:.2f}")
+    col2.metric("Spread Contribution", f"{contrib_percent['spread']}%")
+    col3.metric("Markout Contribution", f"{contrib_percent['markout']}%")
+    st.metric("Fees Contribution", f"{contrib_percent['fees']}% (Negative Impact)")
+
+    st.subheader("Statistical Metrics")
+    daily_pnl = daily_attr.sum(axis=1)
+    st.write(f"Average Daily PnL: {daily_pnl.mean():.2f}")
+    st.write(f"Std Dev Daily PnL: {daily_pnl.std():.2f}")
+    st.write(f"Max Daily PnL: {daily_pnl.max():.2f}")
+    st.write(f"Min Daily PnL: {daily_pnl.min():.2f}")
+    if total_pnl == 0 or pd.isna(total_pnl):
+        st.warning("Total PnL is zero or undefined. Check data integrity.")
+    elif total_pnl < 0:
+        st.error("Overall loss detected. Review strategy parameters.")
+
+    st.download_button("Download Attribution Data", attr.to_csv(),
+                       "attribution_filtered.csv", mime="text/csv")
 else:
-    st.info("No attribution_summary.csv found. Run backtest with attribution enabled.")
-
-# -------------------------------
-# Logs Overview
-# -------------------------------
-if logs is not None and not logs.empty:
-    st.header("Logs Overview")
-    st.metric("Total Log Entries", len(logs))
-    if "time" in logs.columns:
-        logs["time"] = pd.to_datetime(logs["time"], errors="coerce")
-        if "equity" in logs.columns:
-            st.subheader("Equity Curve Over Time")
-            fig = px.line(logs, x="time", y="equity", title="Equity Curve Over Time")
-            fig.update_layout(yaxis_title="Equity")
-            st.plotly_chart(fig)
-        if "inventory" in logs.columns:
-            st.subheader("Inventory Over Time")
-            fig = px.line(logs, x="time", y="inventory", title="Inventory Over Time")
-            fig.update_layout(yaxis_title="Inventory")
-            st.plotly_chart(fig)
-        if "cash" in logs.columns:
-            st.subheader("Cash Balance Over Time")
-            fig = px.line(logs, x="time", y="cash", title="Cash Balance Over Time")
-            fig.update_layout(yaxis_title="Cash")
-            st.plotly_chart(fig)
-        if logs["equity"].min() < -100:  # Example threshold
-            st.warning("⚠️ Equity dropped below -100. Review strategy.")
-else:
-    st.info("ℹ️ No logs.csv found. To enable logs, update run_backtest.py to save logs.")
+    st.info("No trade mark-out table found for this run.")
+
+# -------------------------------
+# Plots & summary tables of the run
+# -------------------------------
+st.header("Generated Plots & Attribution")
+plots_dir = os.path.join(run, "plots")
+pngs = sorted(f for f in os.listdir(plots_dir) if f.endswith(".png")) if os.path.isdir(plots_dir) else []
+for f in pngs:
+    st.image(os.path.join(plots_dir, f), caption=f)
+for name in db.table_names(run):
+    if name != "trades_with_markouts":
+        st.subheader(name)
+        st.dataframe(read_table(plots_dir, name).head())
+if not pngs:
+    st.info("No plots found in plots/. Run backtest with plotting enabled.")
+
+# -------------------------------
+# Compare runs (summaries only; curves loaded for the selected runs)
+# -------------------------------
+if len(runs) > 1:
+    st.header("Compare Runs")
+    table = pd.DataFrame([cached_summary(r, db.fingerprint(r)) for r in runs])
+    st.dataframe(table.drop(columns=["path"]))
+    picked = st.multiselect("Overlay equity curves", runs, default=[run])
+    if picked:
+        curves = [cached_series(r, db.fingerprint(r), ("equity",), None, None, max_points)
+                  .assign(run=os.path.basename(os.path.normpath(r))) for r in picked]
+        overlay = pd.concat(curves)
+        fig = px.line(overlay, x=overlay.index, y="equity", color="run", title="Equity by Run")
+        fig.update_layout(xaxis_title="Time", yaxis_title="Equity", legend_title="Run")
+        st.plotly_chart(fig)
 
 # -------------------------------
-# Downloads
+# Downloads (zip built only when asked for)
 # -------------------------------
 st.header("Download Results")
-zip_buffer = io.BytesIO()
-with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-    zip_file.writestr("trades.csv", trades.to_csv(index=False))
-    if logs is not None:
-        zip_file.writestr("logs.csv", logs.to_csv(index=False))
-    if os.path.exists(attrib_file):
-        with open(attrib_file, "rb") as f:
-            zip_file.writestr("attribution_summary.csv", f.read())
-st.download_button("⬇️ Download All Results (Zip)", zip_buffer.getvalue(), "backtest_results.zip")
\ No newline at end of file
+if st.button("Prepare zip of this run"):
+    st.download_button("⬇️ Download All Results (Zip)", db.build_zip(run),
+                       f"{os.path.basename(os.path.normpath(run))}_results.zip")
@@ -1 +1,9 @@
-from .backtester import Backtester
+# Backtester is resolved on first access, so importing a light submodule (config, the CLI)
+# does not load the whole engine stack.
+__all__ = ['Backtester']
+
+def __getattr__(name):
+    if name == 'Backtester':
+        from .backtester import Backtester
+        return Backtester
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,50 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+# ~2 points per pixel column of a default 640px-wide figure
+MAX_PLOT_POINTS = 2000
+
+def _pyplot():
+    # imported on first use: runs that skip plotting (and sweep workers) never load matplotlib
+    import matplotlib.pyplot as plt
+    return plt
 
 def ensure_dir(p: str):
     os.makedirs(p, exist_ok=True)
 
-def save_equity_plot(logs: pd.DataFrame, out_dir: str):
+def minmax_downsample(data, max_points: int = MAX_PLOT_POINTS):
+    """
+    Shape-preserving downsampling of a Series/DataFrame for line plots: split the rows
+    into max_points // 2 equal buckets and keep, per bucket and column, the rows holding
+    the min and the max (plus the first and last row), so spikes and drawdowns survive.
+    """
+    n = len(data)
+    if max_points is None or max_points <= 0 or n <= max_points:
+        return data
+    n_buckets = max(1, max_points // 2)
+    width = -(-n // n_buckets)
+    vals = np.asarray(data.to_numpy(dtype=float)).reshape(n, -1)
+    pad = n_buckets * width - n
+    keep = [np.array([0, n - 1])]
+    offsets = np.arange(n_buckets) * width
+    for j in range(vals.shape[1]):
+        col = vals[:, j]
+        lo = np.concatenate([np.where(np.isnan(col), np.inf, col), np.full(pad, np.inf)])
+        hi = np.concatenate([np.where(np.isnan(col), -np.inf, col), np.full(pad, -np.inf)])
+        keep.append(offsets + lo.reshape(n_buckets, width).argmin(axis=1))
+        keep.append(offsets + hi.reshape(n_buckets, width).argmax(axis=1))
+    idx = np.unique(np.concatenate(keep))
+    return data.iloc[idx[idx < n]]
+
+def save_equity_plot(logs: pd.DataFrame, out_dir: str, max_points: int = MAX_PLOT_POINTS):
     ensure_dir(out_dir)
     if logs is None or logs.empty or 'equity' not in logs:
         return
+    plt = _pyplot()
     plt.figure()
-    logs['equity'].plot()
+    minmax_downsample(logs['equity'], max_points).plot()
     plt.title('Equity Curve')
     plt.xlabel('Time')
     plt.ylabel('Equity')
@@ -19,12 +52,13 @@ def save_equity_plot(logs: pd.DataFrame, out_dir: str):
     plt.savefig(os.path.join(out_dir, 'equity_curve.png'))
     plt.close()
 
-def save_inventory_plot(logs: pd.DataFrame, out_dir: str):
+def save_inventory_plot(logs: pd.DataFrame, out_dir: str, max_points: int = MAX_PLOT_POINTS):
     ensure_dir(out_dir)
     if logs is None or logs.empty or 'inventory' not in logs:
         return
+    plt = _pyplot()
     plt.figure()
-    logs['inventory'].plot()
+    minmax_downsample(logs['inventory'], max_points).plot()
     plt.title('Inventory Over Time')
     plt.xlabel('Time')
     plt.ylabel('Inventory')
@@ -33,15 +67,16 @@ def save_inventory_plot(logs: pd.DataFrame, out_dir: str):
     plt.close()
 
 # NEW: quotes vs mid
-def save_quotes_plot(logs: pd.DataFrame, out_dir: str):
+def save_quotes_plot(logs: pd.DataFrame, out_dir: str, max_points: int = MAX_PLOT_POINTS):
     ensure_dir(out_dir)
     if logs is None or logs.empty:
         return
     cols = [c for c in ['mid', 'bid', 'ask'] if c in logs.columns]
     if not cols:
         return
+    plt = _pyplot()
     plt.figure()
-    logs[cols].plot()
+    minmax_downsample(logs[cols], max_points).plot()
     plt.title('Quoted Prices vs. Mid')
     plt.xlabel('Time')
     plt.ylabel('Price')
@@ -53,10 +88,17 @@ def save_quotes_plot(logs: pd.DataFrame, out_dir: str):
 def save_markouts_and_attribution(logs: pd.DataFrame,
                                   trades: pd.DataFrame,
                                   out_dir: str,
-                                  horizons=(1, 5, 10)):
+                                  horizons=(1, 5, 10),
+                                  costs: pd.DataFrame = None,
+                                  writer=None):
+    """
+    Per-trade mark-outs and attribution summary. Returns the per-trade frame so callers
+    can pass it straight to plot_attribution_stacked; with an ArtifactWriter (rooted at
+    the run dir) the detail table is written through it instead of as CSV.
+    """
     ensure_dir(out_dir)
     if logs is None or trades is None or logs.empty or trades.empty:
-        return
+        return None
 
     df = trades.copy()
     if 'liquidity' not in df.columns:
@@ -87,7 +129,10 @@ def save_markouts_and_attribution(logs: pd.DataFrame,
         df.drop(columns=[col], inplace=True)
 
     # Save detailed
-    df.to_csv(os.path.join(out_dir, 'trades_with_markouts.csv'), index=False)
+    if writer is not None:
+        writer.write(os.path.relpath(os.path.join(out_dir, 'trades_with_markouts'), writer.out_dir), df)
+    else:
+        df.to_csv(os.path.join(out_dir, 'trades_with_markouts.csv'), index=False)
 
     # Summaries
     def _sum_safe(s): return float(s.dropna().sum()) if len(s) else 0.0
@@ -118,18 +163,28 @@ def save_markouts_and_attribution(logs: pd.DataFrame,
     for h in horizons:
         taker[f'taker_markout_{h}_sum'] = _sum_safe(tk[f'markout_{h}'])
 
+    # Non-fill costs from a compacted ledger (cancel penalties)
+    if costs is not None:
+        total['cancel_costs_sum'] = float(costs['cost'].sum()) if len(costs) else 0.0
+
     pd.DataFrame([total | maker | taker]).to_csv(
         os.path.join(out_dir, 'attribution_summary.csv'),
         index=False
     )
-def plot_attribution_stacked(logs: pd.DataFrame, trades_with_markouts_csv: str, out_dir: str):
-    """Stacked PnL contributions over time: spread_edge, markout_1 (or pick), fees."""
+    return df
+
+def plot_attribution_stacked(logs: pd.DataFrame, trades_with_markouts, out_dir: str,
+                             max_points: int = MAX_PLOT_POINTS):
+    """Stacked PnL contributions over time: spread_edge, markout_1 (or pick), fees.
+    trades_with_markouts: the frame returned by save_markouts_and_attribution, or a CSV path."""
     ensure_dir(out_dir)
-    import pandas as pd, matplotlib.pyplot as plt, numpy as np, os
-    if not os.path.exists(trades_with_markouts_csv):
-        return
-    df = pd.read_csv(trades_with_markouts_csv, parse_dates=['time'])
-    if df.empty: return
+    if isinstance(trades_with_markouts, str):
+        if not os.path.exists(trades_with_markouts):
+            return
+        df = pd.read_csv(trades_with_markouts, parse_dates=['time'])
+    else:
+        df = trades_with_markouts
+    if df is None or df.empty: return
     df = df.set_index('time').sort_index()
     # choose markout horizon
     mo = 'markout_5' if 'markout_5' in df.columns else [c for c in df.columns if c.startswith('markout_')][0]
@@ -139,19 +194,30 @@ def plot_attribution_stacked(logs: pd.DataFrame, trades_with_markouts_csv: str,
         'markout': df[mo],
         'fees': -df['fee']
     }).resample('1min').sum().fillna(0.0)
+    plt = _pyplot()
     plt.figure()
-    contrib[['spread', 'markout', 'fees']].cumsum().plot(stacked=False)
+    minmax_downsample(contrib[['spread', 'markout', 'fees']].cumsum(), max_points).plot(stacked=False)
     plt.title('Cumulative PnL Attribution (Spread vs Markout vs Fees)')
     plt.xlabel('Time'); plt.ylabel('PnL')
     plt.tight_layout()
     plt.savefig(os.path.join(out_dir, 'pnl_attribution_stacked.png'))
     plt.close()
 
-def save_heatmap(csv_path: str, x: str, y: str, z: str, out_png: str, agg='mean'):
-    if not os.path.exists(csv_path): return
-    df = pd.read_csv(csv_path)
-    if df.empty or x not in df or y not in df or z not in df: return
+def _heatmap_frame(data, cols):
+    """A results table given as a DataFrame or CSV path; None if missing or lacking `cols`."""
+    if isinstance(data, str):
+        if not os.path.exists(data): return None
+        data = pd.read_csv(data)
+    if data is None or data.empty or any(c not in data for c in cols): return None
+    return data
+
+def save_heatmap(data, x: str, y: str, z: str, out_png: str, agg='mean'):
+    """z aggregated over every (x, y) cell; data is a results DataFrame or a CSV path."""
+    df = _heatmap_frame(data, (x, y, z))
+    if df is None: return
     pivot = df.pivot_table(index=y, columns=x, values=z, aggfunc=agg)
+    os.makedirs(os.path.dirname(out_png) or '.', exist_ok=True)
+    plt = _pyplot()
     plt.figure()
     im = plt.imshow(pivot.values, aspect='auto', origin='lower')
     plt.colorbar(im, label=z)
@@ -161,6 +227,30 @@ def save_heatmap(csv_path: str, x: str, y: str, z: str, out_png: str, agg='mean'
     plt.tight_layout()
     plt.savefig(out_png)
     plt.close()
+
+def save_heatmap_facets(data, x: str, y: str, z: str, facet: str, out_png: str, agg='mean'):
+    """One (x, y) heatmap of z per value of `facet`, side by side on a shared color scale."""
+    df = _heatmap_frame(data, (x, y, z, facet))
+    if df is None: return
+    levels = sorted(df[facet].unique())
+    pivots = [df[df[facet] == v].pivot_table(index=y, columns=x, values=z, aggfunc=agg) for v in levels]
+    vmin = min(float(np.nanmin(p.values)) for p in pivots)
+    vmax = max(float(np.nanmax(p.values)) for p in pivots)
+    os.makedirs(os.path.dirname(out_png) or '.', exist_ok=True)
+    plt = _pyplot()
+    fig, axes = plt.subplots(1, len(levels), figsize=(3.2 * len(levels) + 1, 3.6), squeeze=False)
+    for ax, v, pivot in zip(axes[0], levels, pivots):
+        im = ax.imshow(pivot.values, aspect='auto', origin='lower', vmin=vmin, vmax=vmax)
+        ax.set_xticks(range(len(pivot.columns)), labels=pivot.columns, rotation=45)
+        ax.set_yticks(range(len(pivot.index)), labels=pivot.index)
+        ax.set_title(f'{facet}={v}')
+        ax.set_xlabel(x)
+    axes[0][0].set_ylabel(y)
+    fig.colorbar(im, ax=axes[0].tolist(), label=z)
+    fig.suptitle(f'{z} by {x} x {y}, per {facet}')
+    plt.savefig(out_png, bbox_inches='tight')
+    plt.close(fig)
+
 def compute_metrics(equity: pd.Series, freq_per_day=1440):
     if equity is None or len(equity) < 3:
         return {"final_equity": float(equity.iloc[-1]) if len(equity) else 0.0}
@@ -185,16 +275,63 @@ def save_metrics_csv(logs: pd.DataFrame, out_dir: str):
     m = compute_metrics(logs["equity"])
     pd.DataFrame([m]).to_csv(os.path.join(out_dir, "metrics.csv"), index=False)
 
-def save_equity_inventory_overlay(logs: pd.DataFrame, out_dir: str):
+def save_equity_inventory_overlay(logs: pd.DataFrame, out_dir: str, max_points: int = MAX_PLOT_POINTS):
     os.makedirs(out_dir, exist_ok=True)
     if logs is None or logs.empty: return
+    eq = minmax_downsample(logs["equity"], max_points)
+    inv = minmax_downsample(logs["inventory"], max_points)
+    plt = _pyplot()
     fig, ax1 = plt.subplots()
-    ax1.plot(logs.index, logs["equity"])
+    ax1.plot(eq.index, eq)
     ax1.set_xlabel("Time"); ax1.set_ylabel("Equity")
     ax2 = ax1.twinx()
-    ax2.plot(logs.index, logs["inventory"])
+    ax2.plot(inv.index, inv)
     ax2.set_ylabel("Inventory")
     plt.title("Equity (left) & Inventory (right)")
     plt.tight_layout()
     plt.savefig(os.path.join(out_dir, "equity_inventory_overlay.png"))
     plt.close()
+
+# name -> (function, logs columns it needs); all take (logs, out_dir, max_points)
+RUN_PLOTS = {
+    'equity': (save_equity_plot, ['equity']),
+    'inventory': (save_inventory_plot, ['inventory']),
+    'quotes': (save_quotes_plot, ['mid', 'bid', 'ask']),
+    'overlay': (save_equity_inventory_overlay, ['equity', 'inventory']),
+}
+
+def _render(fn, *args):
+    import matplotlib
+    matplotlib.use('Agg')  # workers never have a display
+    fn(*args)
+
+def render_run_plots(logs: pd.DataFrame, out_dir: str, markouts: pd.DataFrame = None,
+                     plots=('equity', 'inventory', 'quotes'), max_points: int = MAX_PLOT_POINTS,
+                     processes: int = None):
+    """
+    Render the per-run figures. Each figure gets only its own (already downsampled)
+    columns and, with processes != 1, is drawn in its own worker process; processes=1
+    renders serially in this process.
+    """
+    ensure_dir(out_dir)
+    jobs = []
+    if logs is not None and not logs.empty:
+        for name in plots:
+            cols = [c for c in RUN_PLOTS[name][1] if c in logs.columns]
+            if cols:
+                jobs.append((name, minmax_downsample(logs[cols], max_points)))
+    has_markouts = markouts is not None and not markouts.empty
+    if processes == 1 or len(jobs) + has_markouts <= 1:
+        for name, part in jobs:
+            RUN_PLOTS[name][0](part, out_dir, max_points)
+        if has_markouts:
+            plot_attribution_stacked(logs, markouts, out_dir, max_points)
+        return
+    with ProcessPoolExecutor(max_workers=processes or min(4, len(jobs) + has_markouts)) as pool:
+        futs = [pool.submit(_render, RUN_PLOTS[name][0], part, out_dir, max_points) for name, part in jobs]
+        if has_markouts:
+            cols = [c for c in ('time', 'spread_edge', 'fee') if c in markouts.columns]
+            cols += [c for c in markouts.columns if c.startswith('markout_')]
+            futs.append(pool.submit(_render, plot_attribution_stacked, None, markouts[cols], out_dir, max_points))
+        for f in futs:
+            f.result()
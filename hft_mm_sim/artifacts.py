@@ -0,0 +1,140 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+import pandas as pd
+
+# format -> file extension; read_table looks for them in this order
+FORMATS = {'parquet': '.parquet', 'feather': '.feather', 'csv.gz': '.csv.gz', 'csv': '.csv'}
+PARQUET_ROW_GROUP = 100_000
+
+def _require_arrow(fmt: str):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"--artifact_format {fmt} needs pyarrow: pip install pyarrow")
+
+def find_table(out_dir: str, name: str) -> Optional[str]:
+    """Path of artifact table `name` (e.g. 'trades' or 'plots/attribution_summary') in any format."""
+    for ext in FORMATS.values():
+        path = os.path.join(out_dir, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+def table_columns(out_dir: str, name: str) -> List[str]:
+    """Column names of an artifact table without reading its rows ([] if missing)."""
+    path = find_table(out_dir, name)
+    if path is None:
+        return []
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    if path.endswith('.feather'):
+        import pyarrow.ipc
+        with pyarrow.ipc.open_file(path) as f:
+            return list(f.schema.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def read_table(out_dir: str, name: str, columns: Optional[List[str]] = None,
+               start=None, end=None) -> Optional[pd.DataFrame]:
+    """
+    Read artifact table `name` from whichever format is present; None if missing.
+    Only `columns` are read; start/end keep rows with start <= time <= end (pushed
+    down to the Parquet reader, filtered after reading for other formats).
+    """
+    path = find_table(out_dir, name)
+    if path is None:
+        return None
+    ranged = start is not None or end is not None
+    if ranged and columns is not None and 'time' not in columns:
+        columns = ['time'] + list(columns)
+    if path.endswith('.parquet'):
+        filters = [f for f in (('time', '>=', pd.Timestamp(start)) if start is not None else None,
+                               ('time', '<=', pd.Timestamp(end)) if end is not None else None) if f]
+        return pd.read_parquet(path, columns=columns, filters=filters or None)
+    if path.endswith('.feather'):
+        df = pd.read_feather(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=columns)
+        if 'time' in df.columns:
+            df['time'] = pd.to_datetime(df['time'], errors='coerce')
+    if ranged and 'time' in df.columns:
+        keep = pd.Series(True, index=df.index)
+        if start is not None:
+            keep &= df['time'] >= pd.Timestamp(start)
+        if end is not None:
+            keep &= df['time'] <= pd.Timestamp(end)
+        df = df[keep].reset_index(drop=True)
+    return df
+
+def write_table(df: pd.DataFrame, out_dir: str, name: str, fmt: str = 'csv', index: bool = False) -> str:
+    """
+    Write `df` as out_dir/name.<ext>. index=True stores the index as a column (named
+    'time' if unnamed). Copies of the same table in other formats are removed so
+    readers never pick up a stale file.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown artifact format {fmt!r}; choose from {list(FORMATS)}")
+    path = os.path.join(out_dir, name + FORMATS[fmt])
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if index:
+        df = df.rename_axis(df.index.name or 'time').reset_index()
+    if fmt == 'parquet':
+        # row groups carry min/max stats, so time-range reads skip most of a long run
+        df.to_parquet(path, index=False, row_group_size=PARQUET_ROW_GROUP)
+    elif fmt == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
+    for other in FORMATS.values():
+        stale = os.path.join(out_dir, name + other)
+        if stale != path and os.path.exists(stale):
+            os.remove(stale)
+    return path
+
+class ArtifactWriter:
+    """
+    Writes run tables in one format, by default on a single background thread so
+    plotting/analytics can continue while files are serialized. Callers must not
+    mutate a frame after handing it to write(). close() waits for every pending
+    write and re-raises the first failure.
+    """
+    def __init__(self, out_dir: str, fmt: str = 'csv', background: bool = True):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown artifact format {fmt!r}; choose from {list(FORMATS)}")
+        if fmt in ('parquet', 'feather'):
+            _require_arrow(fmt)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='artifacts') if background else None
+        self._pending: Dict[str, Future] = {}
+        self.paths: Dict[str, str] = {}
+
+    def write(self, name: str, df: pd.DataFrame, index: bool = False):
+        if df is None:
+            return
+        if self._pool is None:
+            self.paths[name] = write_table(df, self.out_dir, name, self.fmt, index)
+        else:
+            self._pending[name] = self._pool.submit(write_table, df, self.out_dir, name, self.fmt, index)
+
+    def close(self) -> Dict[str, str]:
+        err = None
+        for name, fut in self._pending.items():
+            try:
+                self.paths[name] = fut.result()
+            except Exception as e:
+                err = err or e
+        self._pending = {}
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if err is not None:
+            raise err
+        return self.paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
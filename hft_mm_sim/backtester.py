@@ -1,42 +1,175 @@
+import os, pickle
+from time import perf_counter
 import pandas as pd
 from .config import MMConfig
 from .features import add_features
-from .strategy import MarketMakerStrategy
-from .execution import ExecutionSimulator
+from .strategy import Quotes, make_strategy
+from .execution import make_execution
 from .risk import RiskManager
 from .execution_lob import ExecutionLOB
+from .profiling import StageProfiler
+from .memory import MemoryTracker, RecordSpool
+
+CHECKPOINT_VERSION = 4
+
+def _append_records(path: str, offset: int, frame: pd.DataFrame) -> int:
+    """Cut `path` back to `offset` (rows of a save that never committed) and append one chunk."""
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(offset)
+        f.truncate()
+        if len(frame):
+            pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return f.tell()
+
+def _read_records(path: str, offset: int) -> list:
+    parts = []
+    if offset:
+        with open(path, 'rb') as f:
+            while f.tell() < offset:
+                parts.append(pickle.load(f))
+    if not parts:
+        return []
+    return pd.concat(parts, ignore_index=True).to_dict('records')
 
 class Backtester:
-    def __init__(self, cfg: MMConfig):
+    # attributes saved by save_checkpoint (plus the _RECORDS lists)
+    _RECORDS = ('logs', 'trades', 'costs')
+    _STATE = ('cfg', 'strategy', 'exec', 'exec_lob', 'risk', 'inventory', 'cash', '_hist', '_next_bar')
+
+    def __init__(self, cfg: MMConfig, profiler: StageProfiler | None = None,
+                 memory: MemoryTracker | None = None):
         self.exec_lob = ExecutionLOB(cfg)
         self.cfg = cfg
-        self.strategy = MarketMakerStrategy(cfg)
-        self.exec = ExecutionSimulator(cfg)
+        self.strategy = make_strategy(cfg)
+        self.exec = make_execution(cfg)
         self.risk = RiskManager(cfg)
+        self.attach_profiler(profiler)
+        self.attach_journal(None)
+        self.memory = memory
         self.reset()
 
+    def attach_profiler(self, profiler: StageProfiler | None):
+        """Enable (or with None, disable) per-stage timing for subsequent run()/extend() calls."""
+        self.profiler = profiler
+        self.exec_lob.profiler = profiler
+
+    def attach_recorder(self, recorder):
+        """Capture LOB snapshots into `recorder` (a BookRecorder; None to stop). LOB path only."""
+        self.exec_lob.recorder = recorder
+
+    def attach_journal(self, journal):
+        """Write every decision of subsequent run()/extend() calls to `journal` (an EventJournal; None to stop)."""
+        self.journal = journal
+        self.exec_lob.journal = journal
+
     def reset(self):
         self.inventory = 0.0
         self.cash = 0.0
         self.logs = []   # per-bar logs
         self.trades = [] # per-trade logs
+        self.costs = []  # non-fill costs (cancel penalties) when cfg.compact_ledger is on
+        self._hist = None   # raw bars ending at the first bar not yet simulated (for extend)
+        self._next_bar = 0  # global index of that bar
+        self._spools = None  # RecordSpools once logs/trades have been spilled to disk
+        self._ck_path = None  # checkpoint whose record sidecars hold our rows so far
+        self._ck_marks = {}   # kind -> (rows, byte offset) already in that sidecar
 
     def _finalize(self):
         # Build outputs robustly even if no logs/trades
-        logs_df = pd.DataFrame(self.logs)
+        logs_df = self._records_frame('logs')
         if not logs_df.empty and ('time' in logs_df.columns):
             logs_df = logs_df.set_index('time')
         else:
             logs_df = pd.DataFrame(
                 columns=['price_ref','inventory','cash','equity','reason']
             )
-        trades_df = pd.DataFrame(self.trades) if self.trades else pd.DataFrame(
+        trades_df = self._records_frame('trades')
+        trades_df = trades_df if not trades_df.empty else pd.DataFrame(
         columns=['time','side','price','qty','fee','liquidity']  # <-- add liquidity   
        )
 
-        return {'logs': logs_df, 'trades': trades_df}
+        costs_df = self._records_frame('costs')
+        if costs_df.empty:
+            costs_df = pd.DataFrame(columns=['time', 'kind', 'cost'])
+
+        return {'logs': logs_df, 'trades': trades_df, 'costs': costs_df, 'risk_blocks': dict(self.risk.blocks)}
+
+    def _net_fill(self, netted: dict, trade_time, f, liq: str):
+        if f.qty <= 0:
+            # zero-quantity LOB 'fills' only carry cancel penalties
+            self.costs.append({'time': trade_time, 'kind': 'cancel', 'cost': f.fee})
+            return
+        key = (trade_time, f.side, f.price, liq)
+        agg = netted.get(key)
+        if agg is None:
+            netted[key] = [f.qty, f.fee, 1]
+        else:
+            agg[0] += f.qty
+            agg[1] += f.fee
+            agg[2] += 1
+
+    def _account_fills(self, fills, t, compact: bool, netted: dict):
+        """Apply one bar's fills to cash/inventory and the trade ledger."""
+        for f in fills:
+            if f.side == 'buy':
+                self.cash -= f.price * f.qty
+                self.inventory += f.qty
+            else:
+                self.cash += f.price * f.qty
+                self.inventory -= f.qty
+            self.cash -= f.fee
+            # ensure trades log has liquidity if from LOB, else mark as 'maker' by default
+            liq = getattr(f, 'liquidity', 'maker')
+            trade_time = getattr(f, 'time', t)
+            if compact:
+                self._net_fill(netted, trade_time, f, liq)
+            else:
+                self.trades.append({
+                        'time': trade_time,
+                        'side': f.side,
+                        'price': f.price,
+                        'qty': f.qty,
+                        'fee': f.fee,
+                        'liquidity': liq
+})
+        if compact and netted:
+            for (trade_time, side, price, liq), (qty, fee, n) in netted.items():
+                self.trades.append({'time': trade_time, 'side': side, 'price': price, 'qty': qty,
+                                    'fee': fee, 'liquidity': liq, 'n_fills': n})
+            netted.clear()
+
+    def _records_frame(self, kind: str, start: int = 0) -> pd.DataFrame:
+        records = getattr(self, kind)
+        if self._spools is None:
+            return pd.DataFrame(records[start:] if start else records)
+        return self._spools[kind].frame(records, start)
+
+    def _n_records(self, kind: str) -> int:
+        n = len(getattr(self, kind))
+        return n + self._spools[kind].rows if self._spools is not None else n
 
-    def run(self, df: pd.DataFrame) -> dict:
+    def _spill(self):
+        """Move buffered log/trade records to disk chunks (memory budget reached)."""
+        if self._spools is None:
+            d = self.memory.spill_dir
+            self._spools = {k: RecordSpool(d, k) for k in self._RECORDS}
+        for k in self._RECORDS:
+            self._spools[k].spill(getattr(self, k))
+        self.memory.mark_spill()
+
+    def discard_spill(self):
+        """Delete spilled record chunks (after the results have been written out)."""
+        if self._spools is not None:
+            for spool in self._spools.values():
+                spool.cleanup()
+            self._spools = None
+
+    def _memory_check(self, where: str):
+        if self.memory.should_spill():
+            self._spill()
+        self.memory.check(where)
+
+    def _check_input(self, df: pd.DataFrame) -> pd.DataFrame:
         # Keep only the core market columns for NA filtering
         required = ['open','high','low','close','volume']
         missing = [c for c in required if c not in df.columns]
@@ -44,17 +177,140 @@ class Backtester:
             raise ValueError(f"Input DataFrame missing required columns: {missing}")
 
         # Only drop rows that have NA in the required columns
-        df = df.dropna(subset=required).copy()
+        return df.dropna(subset=required).copy()
+
+    def run(self, df: pd.DataFrame, checkpoint_path: str | None = None, checkpoint_every: int = 0,
+            first_bar: int = 0) -> dict:
+        """`first_bar` is the global index of df's first bar when df is a slice of a longer history."""
+        if self.memory is not None:
+            self.memory.begin('backtest;check_input')
+        df = self._check_input(df)
         if len(df) < 3:
             # Not enough bars to simulate next-bar fills
             return self._finalize()
+        return self._simulate(df, start=0, base=first_bar,
+                              checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+
+    def extend(self, df: pd.DataFrame, checkpoint_path: str | None = None, checkpoint_every: int = 0) -> dict:
+        """
+        Continue the current run over the bars of `df` newer than the last bar already seen.
+        Works after run()/extend() and on an instance restored with load_checkpoint(), and
+        gives the same logs/trades as one uninterrupted run over the full history.
+        """
+        if self._hist is None:
+            return self.run(df, checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+        if self.memory is not None:
+            self.memory.begin('backtest;check_input')
+        df = self._check_input(df)
+        new = df[df.index > self._hist.index[-1]]
+        if new.empty:
+            return self._finalize()
+        # history tail supplies the feature windows; its last bar is the first one not yet simulated
+        full = pd.concat([self._hist, new])
+        start = len(self._hist) - 1
+        return self._simulate(full, start=start, base=self._next_bar - start,
+                              checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+
+    def save_checkpoint(self, path: str):
+        """
+        Pickle the engine state (book, resting/pending orders, RNGs, risk) atomically.
+        Logs/trades/costs go to append-only sidecars `<path>.logs` etc.: each save appends
+        only the rows recorded since the previous one, and the snapshot stores how far
+        each sidecar is valid, so a crash mid-save leaves the last checkpoint consistent.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self._ck_path != path:
+            self._ck_path, self._ck_marks = path, {}
+        marks = {}
+        for k in self._RECORDS:
+            rows, offset = self._ck_marks.get(k, (0, 0))
+            n = self._n_records(k)
+            marks[k] = (n, _append_records(f"{path}.{k}", offset, self._records_frame(k, rows)))
+        state = {k: getattr(self, k) for k in self._STATE}
+        state['records'] = marks
+        if self.journal is not None:
+            # a resumed run cuts the journal back to this point (EventJournal truncate_to)
+            self.journal.flush()
+            state['journal_records'] = self.journal.n_records
+        state['version'] = CHECKPOINT_VERSION
+        tmp = path + ".tmp"
+        # profilers, snapshot recorders and journals are not part of the state
+        prof, self.exec_lob.profiler = self.exec_lob.profiler, None
+        rec, self.exec_lob.recorder = self.exec_lob.recorder, None
+        jr, self.exec_lob.journal = self.exec_lob.journal, None
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            self.exec_lob.profiler, self.exec_lob.recorder, self.exec_lob.journal = prof, rec, jr
+        os.replace(tmp, path)
+        self._ck_marks = marks
+
+    @classmethod
+    def load_checkpoint(cls, path: str) -> "Backtester":
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        version = state.pop('version', None)
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {path} has version {version}, expected {CHECKPOINT_VERSION}")
+        bt = cls.__new__(cls)
+        marks = state.pop('records')
+        bt.journal_records = state.pop('journal_records', None)   # None: no journal was attached
+        for k in cls._RECORDS:
+            setattr(bt, k, _read_records(f"{path}.{k}", marks[k][1]))
+        for k, v in state.items():
+            setattr(bt, k, v)
+        bt._ck_path, bt._ck_marks = path, marks
+        bt.attach_profiler(None)
+        bt.attach_recorder(None)
+        bt.attach_journal(None)
+        bt.memory = None
+        bt._spools = None
+        return bt
+
+    def _simulate(self, df: pd.DataFrame, start: int, base: int,
+                  checkpoint_path: str | None, checkpoint_every: int) -> dict:
+        """Simulate bars start..len(df)-2 of `df`; bar i has global index base + i."""
+        raw = df
+        window = max(self.cfg.vol_lookback, self.cfg.mom_lookback) + 2
+        prof = self.profiler
+        mem = self.memory
+        jr = self.journal
+        if prof is not None:
+            t_run = tp = perf_counter()
+        if mem is not None:
+            mem.begin('backtest;features')
 
         df = add_features(df, vol_lookback=self.cfg.vol_lookback, mom_lookback=self.cfg.mom_lookback)
+        if prof is not None:
+            tp = prof.add('run;features', tp)
+        if mem is not None:
+            mem.begin('backtest;bars')
         # Do NOT dropna() blindly here; features already handle NaNs
 
         ref = self.cfg.ref_price if self.cfg.ref_price in df.columns else 'close'
 
-        for i in range(len(df)-1):  # use next bar for fills
+        # Plain float arrays for the strategy's per-bar call
+        close_arr = df['close'].to_numpy(dtype=float)
+        mid_arr = df['mid'].to_numpy(dtype=float)
+        vol_arr = df['vol'].to_numpy(dtype=float)
+        mom_arr = df['mom_sign'].to_numpy(dtype=float)
+        # feature-only risk rules for every bar at once; blocked bars skip their per-bar checks
+        gate = self.risk.pregate(vol_arr).tolist()
+        # inventory-free strategies are quoted for all bars in one call
+        batch = None
+        if not self.cfg.use_lob and not self.strategy.uses_inventory:
+            batch = self.strategy.quote_batch(close_arr, mid_arr, vol_arr, mom_arr, 0.0)
+
+        # ledger compaction: net this bar's fills by (time, side, price, liquidity);
+        # cash/inventory are still updated fill by fill, so accounting is unchanged
+        compact = self.cfg.compact_ledger
+        netted = {}
+
+        for i in range(start, len(df)-1):  # use next bar for fills
+            g = base + i
+            if prof is not None:
+                tp = perf_counter()
             t = df.index[i]
             row = df.iloc[i]
             next_row = df.iloc[i+1]
@@ -62,13 +318,25 @@ class Backtester:
            # pre-trade equity
             p_ref_now = float(row[ref])
             equity_now = self.cash + self.inventory * p_ref_now
+            if prof is not None:
+                tp = prof.add('run;bar;row_access', tp)
+
+            allowed = self.risk.allow_new_orders(self.inventory, vol_arr[i], equity_now, bar_i=g,
+                                                 price=p_ref_now, blocked_by=gate[i])
+            if prof is not None:
+                tp = prof.add('run;bar;risk', tp)
+            if jr is not None:
+                jr.begin_bar(g, t, self.inventory, self.cash)
+                if not allowed:
+                    jr.risk_block(self.risk.last_block)
 
             if self.cfg.use_lob:
     # LOB path
                 bid = ask = None
-                if self.risk.allow_new_orders(self.inventory, row.get('vol', 0.0), equity_now):
+                if allowed:
                     mid = float(row.get('mid', p_ref_now))
-                    fills = self.exec_lob.run_bar(t, row, mid=mid, tick=self.cfg.tick_size, inventory=self.inventory)
+                    fills = self.exec_lob.run_bar(t, row, mid=mid, tick=self.cfg.tick_size, inventory=self.inventory,
+                                                  bar_idx=g)
                     # 👇 ADD THIS: record top-of-book so bid/ask columns aren’t NaN
                     if self.exec_lob.book is not None:
                         bb = self.exec_lob.book.best_bid()[0]
@@ -78,39 +346,43 @@ class Backtester:
                 else:
                     fills = []
                     reason = "risk_block"
+                if prof is not None:
+                    tp = prof.add('run;bar;lob', tp)
 
             else:
                 # Original OHLC next-bar path
                 bid = ask = None
-                if self.risk.allow_new_orders(self.inventory, row.get('vol', 0.0), equity_now):
-                    q = self.strategy.compute_quotes(row, self.inventory)
+                if allowed:
+                    if batch is not None:
+                        q = Quotes(float(batch[0][i]), float(batch[1][i]), float(batch[2][i]),
+                                   float(batch[3][i]), self.strategy.name)
+                    else:
+                        q = self.strategy.quote(close_arr[i], mid_arr[i], vol_arr[i], mom_arr[i], self.inventory)
                     bid, ask = q.bid, q.ask
-                    self.exec.submit_quotes(i, q.bid, q.ask, q.size_bid, q.size_ask)
+                    self.exec.submit_quotes(g, q.bid, q.ask, q.size_bid, q.size_ask)
                     reason = q.reason
+                    if jr is not None:
+                        jr.quote(q.bid, q.ask, q.size_bid, q.size_ask)
+                        for o in self.exec.active_orders[-2:]:
+                            jr.place(o.side, o.price, o.qty, o.activate_at_idx)
                 else:
                     reason = "risk_block"
-                fills = self.exec.process_bar(i+1, df.index[i+1], row, next_row)
-            
-            for f in fills:
-                if f.side == 'buy':
-                    self.cash -= f.price * f.qty
-                    self.inventory += f.qty
-                else:
-                    self.cash += f.price * f.qty
-                    self.inventory -= f.qty
-                self.cash -= f.fee
-                # ensure trades log has liquidity if from LOB, else mark as 'maker' by default
-                liq = getattr(f, 'liquidity', 'maker')
-                trade_time = getattr(f, 'time', t)
-                self.trades.append({
-                            'time': trade_time,
-                            'side': f.side,
-                            'price': f.price,
-                            'qty': f.qty,
-                            'fee': f.fee,
-                            'liquidity': liq
-})
+                if prof is not None:
+                    tp = prof.add('run;bar;quote', tp)
+                fills = self.exec.process_bar(g+1, df.index[i+1], row, next_row)
+                if prof is not None:
+                    tp = prof.add('run;bar;ohlc_fills', tp)
 
+            if jr is not None:
+                jr.fills(fills)
+            self._account_fills(fills, t, compact, netted)
+            self.risk.on_fills(fills)
+            if prof is not None:
+                tp = prof.add('run;bar;fill_accounting', tp)
+                prof.count('bars')
+                prof.count('fills', sum(1 for f in fills if f.qty > 0))
+                if reason == 'risk_block':
+                    prof.count('risk_blocks')
 
             # 3) Mark-to-market
             p_ref = float(df.iloc[i][ref])
@@ -127,6 +399,36 @@ class Backtester:
                 'equity': equity,
                 'reason': reason
             })
+            if jr is not None:
+                jr.end_bar(p_ref, self.inventory, self.cash, equity, reason)
+            if prof is not None:
+                tp = prof.add('run;bar;log_append', tp)
+
+            if mem is not None and (g + 1) % mem.check_every == 0:
+                self._memory_check('backtest;bars')
 
+            if checkpoint_path and checkpoint_every > 0 and (g + 1) % checkpoint_every == 0:
+                self._hist = raw.iloc[max(0, i + 2 - window):i + 2]
+                self._next_bar = g + 1
+                self.save_checkpoint(checkpoint_path)
+                if prof is not None:
+                    tp = prof.add('run;bar;checkpoint', tp)
 
-        return self._finalize()
+        # Keep the raw tail (ending at the first unsimulated bar) so extend() can continue
+        self._hist = raw.iloc[max(0, len(raw) - window):]
+        self._next_bar = base + len(raw) - 1
+        if jr is not None:
+            jr.flush()
+        if checkpoint_path:
+            self.save_checkpoint(checkpoint_path)
+        if mem is not None:
+            mem.begin('backtest;finalize')
+        if prof is not None:
+            tp = perf_counter()
+        out = self._finalize()
+        if prof is not None:
+            prof.add('run;finalize', tp)
+            prof.add('run', t_run)
+        if mem is not None:
+            mem.end()
+        return out
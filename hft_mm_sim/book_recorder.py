@@ -0,0 +1,152 @@
+import mmap, os, struct
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+MAGIC = b'HFTBOOK1'
+# magic, depth, max_ours, capacity, records written, ns per micro-tick
+_HEADER = struct.Struct('<8sIIQQQ')
+HEADER_SIZE = 64
+MO_NONE, MO_BUY, MO_SELL = 0, 1, -1
+
+def record_dtype(depth: int, max_ours: int) -> np.dtype:
+    """Packed little-endian layout of one snapshot (matches BookRecorder's struct format)."""
+    return np.dtype([('t', '<i8'), ('bar', '<i8'), ('tick', '<f4'), ('mo_side', 'i1'), ('n_ours', 'u1'),
+                     ('mo_qty', '<f4'), ('our_fill', '<f4'),
+                     ('bid_px', '<f8', (depth,)), ('bid_sz', '<f4', (depth,)),
+                     ('ask_px', '<f8', (depth,)), ('ask_sz', '<f4', (depth,)),
+                     ('our_side', 'i1', (max_ours,)), ('our_level', 'i1', (max_ours,)),
+                     ('our_queue', '<f4', (max_ours,)), ('our_qty', '<f4', (max_ours,))])
+
+class BookRecorder:
+    """
+    Fixed-size, memory-mapped ring buffer of LOB snapshots for post-mortems.
+
+    ExecutionLOB writes one record after quoting (mo_side 0) and one after every market
+    order of the bar: micro-tick timestamp, MO side/size, how much of it hit our orders,
+    the top `depth` levels per side and the level / queue-ahead / size of up to
+    `max_ours` of our resting orders. Records are packed with one struct call straight
+    into the mapped file, so capture costs about a microsecond; once `capacity` records
+    are written the oldest are overwritten. Read back with BookReader.
+    """
+    def __init__(self, path: str, capacity: int = 1 << 20, depth: int = 5, max_ours: int = 8,
+                 ns_per_tick: int = 600_000_000):
+        if capacity < 1 or depth < 1 or not 0 <= max_ours <= 127:
+            raise ValueError("capacity and depth must be >= 1 and max_ours in 0..127")
+        self.path, self.capacity, self.depth, self.max_ours = path, capacity, depth, max_ours
+        self.ns_per_tick = int(ns_per_tick)
+        self.count = 0
+        fmt = '<qqfbBff' + f'{depth}d{depth}f' * 2 + f'{max_ours}b{max_ours}b{max_ours}f{max_ours}f'
+        self._rec = struct.Struct(fmt)
+        assert self._rec.size == record_dtype(depth, max_ours).itemsize
+        self._pad_i = (0,) * max_ours
+        self._pad_f = (0.0,) * max_ours
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        size = HEADER_SIZE + capacity * self._rec.size
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        self._f = open(path, 'r+b')
+        self._mm = mmap.mmap(self._f.fileno(), size)
+        self._write_header()
+
+    def _write_header(self):
+        _HEADER.pack_into(self._mm, 0, MAGIC, self.depth, self.max_ours, self.capacity, self.count,
+                          self.ns_per_tick)
+
+    def record(self, t_ns: int, bar: int, tick: float, book, mo_side: int = MO_NONE,
+               mo_qty: float = 0.0, our_fill: float = 0.0):
+        """Snapshot `book` (a LimitOrderBook) at micro-tick `tick` of bar `bar`."""
+        d, m = self.depth, self.max_ours
+        bids, asks = book.bids[:d], book.asks[:d]
+        if len(bids) < d:   # shallower book than the recording depth
+            bids = bids + [(0.0, 0.0)] * (d - len(bids))
+            asks = asks + [(0.0, 0.0)] * (d - len(asks))
+        ours = list(book._ours.values())[:m]
+        k = len(ours)
+        pi, pf = self._pad_i[k:], self._pad_f[k:]
+        self._rec.pack_into(
+            self._mm, HEADER_SIZE + (self.count % self.capacity) * self._rec.size,
+            t_ns + int(tick * self.ns_per_tick), bar, tick, mo_side, k, mo_qty, our_fill,
+            *[p for p, _ in bids], *[s for _, s in bids], *[p for p, _ in asks], *[s for _, s in asks],
+            *[1 if o.side == 'buy' else -1 for o in ours], *pi, *[o.level_idx for o in ours], *pi,
+            *[o.queue_ahead for o in ours], *pf, *[o.qty for o in ours], *pf)
+        self.count += 1
+
+    def flush(self):
+        self._write_header()
+        self._mm.flush()
+
+    def close(self):
+        if self._mm is None:
+            return
+        self.flush()
+        self._mm.close()
+        self._f.close()
+        self._mm = self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        raise TypeError("BookRecorder is bound to an open file and cannot be pickled")
+
+class BookReader:
+    """
+    Read side of a BookRecorder file. The ring is mapped read-only and split into its
+    two time-ordered runs, so slice()/bars() binary-search each run and copy only the
+    matching records.
+    """
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            magic, depth, max_ours, capacity, count, ns_per_tick = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a book snapshot file")
+        self.depth, self.max_ours, self.capacity, self.count = depth, max_ours, capacity, count
+        self.ns_per_tick = ns_per_tick
+        recs = np.memmap(path, dtype=record_dtype(depth, max_ours), mode='r', offset=HEADER_SIZE, shape=(capacity,))
+        n = min(count, capacity)
+        head = count % capacity if count > capacity else 0
+        # oldest-first runs; each is sorted by time (and bar)
+        self._runs = [r for r in (recs[head:n], recs[:head]) if len(r)]
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _select(self, field: str, lo, hi) -> np.ndarray:
+        parts = []
+        for r in self._runs:
+            col = r[field]
+            i = 0 if lo is None else np.searchsorted(col, lo, side='left')
+            j = len(r) if hi is None else np.searchsorted(col, hi, side='right')
+            if j > i:
+                parts.append(np.asarray(r[i:j]))
+        if not parts:
+            return np.empty(0, dtype=self._runs[0].dtype if self._runs else record_dtype(self.depth, self.max_ours))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def slice(self, start=None, end=None) -> np.ndarray:
+        """Records with start <= time <= end (timestamps or anything pd.Timestamp accepts)."""
+        lo = None if start is None else pd.Timestamp(start).value
+        hi = None if end is None else pd.Timestamp(end).value
+        return self._select('t', lo, hi)
+
+    def bars(self, first: int, last: Optional[int] = None) -> np.ndarray:
+        """Records of global bars first..last (inclusive)."""
+        return self._select('bar', first, first if last is None else last)
+
+    def frame(self, recs: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Flatten records (default: the whole ring) to one column per level / order slot."""
+        recs = self.slice() if recs is None else recs
+        cols = {'time': pd.to_datetime(recs['t']), 'bar': recs['bar'], 'tick': recs['tick'],
+                'mo_side': recs['mo_side'], 'mo_qty': recs['mo_qty'], 'our_fill': recs['our_fill'],
+                'n_ours': recs['n_ours']}
+        for name in ('bid_px', 'bid_sz', 'ask_px', 'ask_sz'):
+            for lvl in range(self.depth):
+                cols[f'{name}_{lvl}'] = recs[name][:, lvl]
+        for name in ('our_side', 'our_level', 'our_queue', 'our_qty'):
+            for k in range(self.max_ours):
+                cols[f'{name}_{k}'] = recs[name][:, k]
+        return pd.DataFrame(cols)
@@ -0,0 +1,114 @@
+import json, os, threading
+from typing import Dict, List, Optional, Sequence
+import pandas as pd
+
+INDEX_FILE = '_index.json'
+
+def _require_parquet():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("The dataset catalog stores Parquet files and needs pyarrow: pip install pyarrow")
+
+def _symbol_dir(symbol: str) -> str:
+    return 'symbol=' + symbol.replace('/', '-').replace(os.sep, '-')
+
+class BarCatalog:
+    """
+    Bars stored as one Parquet file per symbol and UTC day:
+        <root>/symbol=BTC-USDT/date=2024-01-01.parquet
+    plus <root>/_index.json with rows and first/last timestamp per partition, so
+    range loads open only the partitions they need and read only the requested columns.
+    """
+    def __init__(self, root: str):
+        _require_parquet()
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._index = self._read_index()
+
+    def _read_index(self) -> Dict[str, Dict[str, dict]]:
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._index, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    def symbols(self) -> List[str]:
+        return sorted(self._index)
+
+    def days(self, symbol: str) -> List[str]:
+        return sorted(self._index.get(symbol, {}))
+
+    def partition(self, symbol: str, day) -> Optional[dict]:
+        """Index entry (path, rows, start, end) for the partition holding `day`, or None."""
+        return self._index.get(symbol, {}).get(pd.Timestamp(day).strftime('%Y-%m-%d'))
+
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        parts = self._index.get(symbol)
+        if not parts:
+            return None
+        return pd.Timestamp(parts[max(parts)]['end'])
+
+    def write(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        Upsert time-indexed bars for `symbol`. Rows are merged into existing day partitions
+        (duplicate timestamps keep the new row). Returns the number of partitions written.
+        """
+        if df.empty:
+            return 0
+        df = df.sort_index()
+        df.index.name = 'time'
+        days = df.index.normalize()
+        sym_dir = os.path.join(self.root, _symbol_dir(symbol))
+        os.makedirs(sym_dir, exist_ok=True)
+        written = 0
+        with self._lock:
+            parts = self._index.setdefault(symbol, {})
+            for day, chunk in df.groupby(days, sort=True):
+                key = day.strftime('%Y-%m-%d')
+                rel = os.path.join(_symbol_dir(symbol), f'date={key}.parquet')
+                path = os.path.join(self.root, rel)
+                if key in parts and os.path.exists(path):
+                    old = pd.read_parquet(path)
+                    chunk = pd.concat([old, chunk])
+                    chunk = chunk[~chunk.index.duplicated(keep='last')].sort_index()
+                tmp = path + '.tmp'
+                chunk.to_parquet(tmp)
+                os.replace(tmp, path)
+                parts[key] = {'path': rel, 'rows': int(len(chunk)),
+                              'start': str(chunk.index[0]), 'end': str(chunk.index[-1])}
+                written += 1
+            self._write_index()
+        return written
+
+    def load(self, symbol: str, start=None, end=None, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Bars for `symbol` with start <= time <= end, reading only overlapping partitions/columns."""
+        parts = self._index.get(symbol)
+        if not parts:
+            raise KeyError(f"Symbol {symbol!r} not in catalog {self.root} (have: {self.symbols()})")
+        # '' (an unset CLI flag) means unbounded, like None; pd.Timestamp('') would be NaT
+        start = pd.Timestamp(start) if start is not None and start != '' else None
+        end = pd.Timestamp(end) if end is not None and end != '' else None
+        frames = []
+        for key in sorted(parts):
+            meta = parts[key]
+            if start is not None and pd.Timestamp(meta['end']) < start:
+                continue
+            if end is not None and pd.Timestamp(meta['start']) > end:
+                continue
+            frames.append(pd.read_parquet(os.path.join(self.root, meta['path']),
+                                          columns=list(columns) if columns else None))
+        if not frames:
+            return pd.DataFrame(columns=list(columns) if columns else None)
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+        if start is not None or end is not None:
+            df = df.loc[start:end]
+        return df
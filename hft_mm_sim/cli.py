@@ -0,0 +1,63 @@
+import importlib, os, sys
+
+# `hftsim <command> [args]`: one entry point over the existing scripts. Only the module
+# behind the chosen command is imported (and with it pandas / matplotlib only if that
+# command needs them), so `hftsim --help` and headless runs start quickly.
+
+# command -> (module whose main() parses sys.argv, one-line help)
+COMMANDS = {
+    'run': ('run_backtest', "single backtest with artifacts and (optional) plots"),
+    'sweep': ('scripts.grid_search', "parameter grid search (local or SQLite-queue workers)"),
+    'walk-forward': ('scripts.walk_forward', "walk-forward optimisation"),
+    'stress': ('hft_mm_sim.stress_test', "fee / latency / slippage stress grid"),
+    'report': ('scripts.report', "summary report of a finished run"),
+    'plots': ('scripts.render_plots', "render deferred plots from saved artifacts"),
+    'portfolio': ('scripts.portfolio_backtest', "multi-symbol backtest with portfolio risk"),
+    'paper': ('scripts.paper_trade', "paper trading against a live or replayed feed"),
+    'serve': ('scripts.job_service', "local HTTP backtest job service"),
+    'replay': ('scripts.replay_journal', "rebuild / verify state from a run's event journal"),
+    'book': ('scripts.book_snapshots', "slice recorded LOB snapshots by time or bar"),
+    'calibrate': ('scripts.calibrate_surrogate', "fit the surrogate fill table from LOB simulations"),
+    'bench': ('scripts.benchmark', "benchmarks of the hot paths"),
+    'download': (None, "download bars: hftsim download {binance,yf,generic} ..."),
+}
+DOWNLOADERS = {
+    'binance': 'scripts.download_binance',
+    'yf': 'scripts.download_yf',
+    'generic': 'scripts.download_data',
+}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = ["usage: hftsim <command> [args]   (hftsim <command> --help for its options)", "", "commands:"]
+    lines += [f"  {name:<{width}}  {text}" for name, (_, text) in COMMANDS.items()]
+    return "\n".join(lines)
+
+def resolve(argv):
+    """(module name, prog, remaining args) for a command line; raises SystemExit on bad input."""
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        raise SystemExit(0 if argv else 2)
+    cmd, rest = argv[0], list(argv[1:])
+    if cmd not in COMMANDS:
+        print(f"hftsim: unknown command {cmd!r}\n\n{usage()}", file=sys.stderr)
+        raise SystemExit(2)
+    module = COMMANDS[cmd][0]
+    prog = f"hftsim {cmd}"
+    if cmd == 'download':
+        if not rest or rest[0] not in DOWNLOADERS:
+            print(f"usage: hftsim download {{{','.join(DOWNLOADERS)}}} [args]", file=sys.stderr)
+            raise SystemExit(0 if rest and rest[0] in ('-h', '--help') else 2)
+        module, prog, rest = DOWNLOADERS[rest[0]], f"{prog} {rest[0]}", rest[1:]
+    return module, prog, rest
+
+def main(argv=None):
+    module, prog, rest = resolve(sys.argv[1:] if argv is None else argv)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)  # run_backtest.py and scripts/ live next to the package
+    sys.argv = [prog] + rest
+    return importlib.import_module(module).main()
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, fields
 from typing import Tuple
 
 @dataclass
 class MMConfig:
     # --- strategy & features ---
+    strategy: str = "market_maker"  # name registered in hft_mm_sim.strategy.STRATEGIES
     k_vol: float = 0.05
     vol_lookback: int = 30
     k_inv: float = 0.002
@@ -14,6 +15,11 @@ class MMConfig:
     vol_brake_mult: float = 3.0
     inv_cap: float = 50.0
     dd_stop: float = 0.8
+    dd_warmup_bars: int = 0       # bars before the drawdown stop is armed
+    dd_capital: float = 100.0     # account capital the drawdown stop measures against (equity = capital + PnL)
+    max_notional: float = 0.0     # |inventory * price| cap in quote currency (0 = off)
+    max_fills: int = 0            # fill-rate throttle: max fills per fill_window_bars (0 = off)
+    fill_window_bars: int = 60
 
     # --- execution/frictions ---
     tick_size: float = 0.01
@@ -24,10 +30,13 @@ class MMConfig:
     adverse_bias: float = 0.5
     vol_cap_frac: float = 0.1
     ref_price: str = "close"
+    fill_model: str = "touch"     # OHLC path: 'touch' (next-bar high/low) or 'surrogate' (LOB-calibrated table)
+    surrogate_table: str = ""     # fill table JSON for fill_model='surrogate' (scripts/calibrate_surrogate.py)
     seed: int = 42
 
     # --- analytics ---
     markout_horizons: Tuple[int, ...] = (1, 5, 10)
+    compact_ledger: bool = False  # net fills per bar/side/price/liquidity; cancel costs go to a cost ledger
 
     # --- LOB / queue sim ---
     use_lob: bool = True          # turn it on (only once)
@@ -36,6 +45,10 @@ class MMConfig:
     lob_base_depth: float = 8.0
     lob_depth_decay: float = 0.75
     mo_frac: float = 1.0
+    mo_flow: str = "uniform"      # 'uniform' (one MO per micro-tick) or 'hawkes' (self-exciting)
+    hawkes_branching: float = 0.7 # expected child MOs per MO; must be < 1
+    hawkes_cross_frac: float = 0.2  # share of excitation spilling to the opposite side
+    hawkes_decay: float = 0.5     # kernel decay rate per micro-tick
 
     # maker/taker econ
     maker_rebate_bps: float = -2.0
@@ -51,6 +64,24 @@ class MMConfig:
     taker_rebalance: bool = True
     taker_rebalance_threshold: float = 0.3
     taker_rebalance_pct: float = 0.5
+
+def config_to_dict(cfg: "MMConfig") -> dict:
+    """JSON-safe dict of every MMConfig field."""
+    d = asdict(cfg)
+    d['markout_horizons'] = list(d['markout_horizons'])
+    return d
+
+def config_from_dict(d: dict) -> "MMConfig":
+    """Inverse of config_to_dict; unknown keys are rejected."""
+    names = {f.name for f in fields(MMConfig)}
+    unknown = set(d) - names
+    if unknown:
+        raise ValueError(f"Unknown MMConfig fields: {sorted(unknown)}")
+    d = dict(d)
+    if 'markout_horizons' in d:
+        d['markout_horizons'] = tuple(d['markout_horizons'])
+    return MMConfig(**d)
+
 def apply_high_activity_preset(cfg: "MMConfig") -> "MMConfig":
     cfg.k_vol = 0.1              # tighter quotes
     cfg.base_size = 2.0          # bigger size
@@ -0,0 +1,111 @@
+import io, os, zipfile
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .artifacts import FORMATS, find_table, read_table, table_columns
+from .analytics import minmax_downsample
+
+# Data access for app.py, kept free of streamlit so it can be tested and reused.
+# Everything reads only the columns/time range it needs; callers cache on fingerprint().
+
+RUN_TABLES = ('logs', 'trades', 'costs', 'plots/trades_with_markouts', 'plots/attribution_summary')
+
+def fingerprint(run_dir: str, names=RUN_TABLES) -> Tuple:
+    """(name, file, size, mtime_ns) for each table present: changes whenever a run is rewritten."""
+    out = []
+    for name in names:
+        path = find_table(run_dir, name)
+        if path is not None:
+            st = os.stat(path)
+            out.append((name, os.path.basename(path), st.st_size, st.st_mtime_ns))
+    return tuple(out)
+
+def list_runs(root: str) -> List[str]:
+    """Run directories in a results store: `root` itself and its subdirectories that hold a logs table."""
+    if not os.path.isdir(root):
+        return []
+    dirs = [root] + sorted(os.path.join(root, d) for d in os.listdir(root)
+                           if os.path.isdir(os.path.join(root, d)) and d != 'plots')
+    return [d for d in dirs if find_table(d, 'logs') is not None]
+
+def time_bounds(run_dir: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+    t = read_table(run_dir, 'logs', columns=['time'])
+    if t is None or t.empty:
+        return None
+    return t['time'].min(), t['time'].max()
+
+def load_series(run_dir: str, columns: List[str], start=None, end=None,
+                max_points: int = 2000) -> pd.DataFrame:
+    """Time-indexed log columns over [start, end], min/max-downsampled to ~max_points rows."""
+    df = read_table(run_dir, 'logs', columns=['time'] + [c for c in columns if c != 'time'],
+                    start=start, end=end)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=columns)
+    return minmax_downsample(df.set_index('time'), max_points)
+
+def run_summary(run_dir: str) -> dict:
+    """Headline numbers for the run comparison table (reads equity + trade times only)."""
+    eq = read_table(run_dir, 'logs', columns=['equity'])
+    trades = read_table(run_dir, 'trades', columns=['time'])
+    out = {'run': os.path.basename(os.path.normpath(run_dir)), 'path': run_dir,
+           'bars': 0, 'trades': 0 if trades is None else len(trades),
+           'final_equity': np.nan, 'max_drawdown': np.nan}
+    if eq is not None and len(eq):
+        e = eq['equity'].astype(float)
+        out.update(bars=len(e), final_equity=float(e.iloc[-1]), max_drawdown=float((e.cummax() - e).max()))
+    return out
+
+def trade_activity(run_dir: str, start=None, end=None, freq: str = '1h') -> pd.DataFrame:
+    """Maker/taker trade counts and fees per time bucket, aggregated here rather than in the browser."""
+    have = table_columns(run_dir, 'trades')
+    if 'time' not in have:
+        return pd.DataFrame()
+    cols = [c for c in ('time', 'fee', 'liquidity') if c in have]
+    df = read_table(run_dir, 'trades', columns=cols, start=start, end=end)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if 'liquidity' not in df.columns:
+        df['liquidity'] = 'maker'
+    g = df.set_index('time').groupby([pd.Grouper(freq=freq), 'liquidity'])
+    out = g.size().unstack(fill_value=0).add_suffix('_trades')
+    if 'fee' in df.columns:
+        out['fees'] = g['fee'].sum().groupby(level=0).sum()
+    return out
+
+def attribution_series(run_dir: str, start=None, end=None, freq: str = '1h') -> pd.DataFrame:
+    """Spread / mark-out / fee PnL per bucket from the per-trade mark-out table."""
+    have = table_columns(run_dir, 'plots/trades_with_markouts')
+    if not {'time', 'spread_edge', 'fee'} <= set(have):
+        return pd.DataFrame()
+    mo = 'markout_5' if 'markout_5' in have else next((c for c in have if c.startswith('markout_')), None)
+    m = read_table(run_dir, 'plots/trades_with_markouts', columns=['time', 'spread_edge', 'fee'] + ([mo] if mo else []),
+                   start=start, end=end)
+    if m.empty:
+        return pd.DataFrame()
+    contrib = pd.DataFrame({'spread': m['spread_edge'].to_numpy(),
+                            'markout': m[mo].to_numpy() if mo else 0.0,
+                            'fees': -m['fee'].to_numpy()}, index=pd.DatetimeIndex(m['time']))
+    return contrib.resample(freq).sum()
+
+def build_zip(run_dir: str) -> bytes:
+    """Zip every table of a run as stored (no re-encoding). Meant to be called on demand."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name in RUN_TABLES:
+            path = find_table(run_dir, name)
+            if path is not None:
+                zf.write(path, arcname=os.path.relpath(path, run_dir))
+    return buf.getvalue()
+
+def table_names(run_dir: str, sub: str = 'plots') -> List[str]:
+    """Table names (without extension) stored under run_dir/sub."""
+    d = os.path.join(run_dir, sub)
+    if not os.path.isdir(d):
+        return []
+    names = set()
+    for f in os.listdir(d):
+        for ext in FORMATS.values():
+            if f.endswith(ext):
+                names.add(f[:-len(ext)])
+                break
+    return sorted(names)
@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import numpy as np
 
@@ -27,7 +28,8 @@ def _coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
                 df[c] = pd.to_numeric(df[c], errors='coerce')
     return df
 
-def load_csv(path: str) -> pd.DataFrame:
+def _load_csv_legacy(path: str, sort: bool = True) -> pd.DataFrame:
+    """Tolerant reader for messy CSVs (thousands separators, duplicate close columns, text nulls)."""
     df = pd.read_csv(path, low_memory=False)
 
     # Ensure time column exists (fallback if first column is time-like)
@@ -37,7 +39,9 @@ def load_csv(path: str) -> pd.DataFrame:
 
     # Parse time and set index
     df['time'] = pd.to_datetime(df['time'], errors='coerce', utc=False)
-    df = df.dropna(subset=['time']).set_index('time').sort_index()
+    df = df.dropna(subset=['time']).set_index('time')
+    if sort:
+        df = df.sort_index()
 
     # Normalize headers & dedupe close
     df = _normalize_columns(df)
@@ -48,7 +52,203 @@ def load_csv(path: str) -> pd.DataFrame:
         raise ValueError(f"CSV {path} missing required columns: {missing}")
 
     # Coerce to numeric robustly
-    df = _coerce_numeric(df)
+    return _coerce_numeric(df)
+
+def _fast_layout(path: str):
+    """
+    Map the header onto the canonical schema for the typed fast path.
+    Returns {raw_name: normalized_name} or None if the header needs the legacy path.
+    """
+    header = list(pd.read_csv(path, nrows=0).columns)
+    norm = [str(c).strip().lower() for c in header]
+    if len(set(norm)) != len(norm):
+        return None
+    if any(c.startswith('close') and c != 'close' for c in norm):
+        return None  # duplicate close columns, consolidated by the legacy path
+    if 'time' not in norm:
+        norm[0] = 'time'
+    if any(c not in norm for c in REQUIRED_COLS):
+        return None
+    return dict(zip(header, norm))
+
+def _pick_engine(engine):
+    if engine is not None:
+        return engine
+    try:
+        import pyarrow  # noqa: F401  (multithreaded CSV parser)
+        return 'pyarrow'
+    except ImportError:
+        return 'c'
+
+def _finish_chunk(df: pd.DataFrame, rename: dict) -> pd.DataFrame:
+    df = df.rename(columns=rename)
+    df['time'] = pd.to_datetime(df['time'], errors='coerce', utc=False)
+    return df.dropna(subset=['time']).set_index('time')
+
+def iter_csv(path: str, chunksize: int = 1_000_000, validator: "ChunkValidator | None" = None):
+    """
+    Stream a bar CSV in cleaned, typed chunks (for files larger than RAM).
+    Chunks are in file order; callers that need global sorting must do it themselves.
+    A ChunkValidator passed as `validator` sees every chunk before rows with missing
+    fields are dropped, so its report() covers the raw file.
+    """
+    rename = _fast_layout(path)
+    if rename is None:
+        raise ValueError(f"CSV {path} needs the tolerant loader (non-standard header); use load_csv")
+    dtypes = {raw: 'float64' for raw, n in rename.items() if n in REQUIRED_COLS}
+    for chunk in pd.read_csv(path, dtype=dtypes, chunksize=chunksize, engine='c'):
+        chunk = _finish_chunk(chunk, rename)
+        if validator is not None:
+            validator.add(chunk)
+        yield chunk.dropna(subset=REQUIRED_COLS)
+
+def validate_bars(df: pd.DataFrame, freq: str | None = None) -> dict:
+    """
+    Vectorized data-quality checks on a time-indexed OHLCV frame.
+    `freq` is the expected bar spacing (e.g. '1min'); defaults to the median spacing.
+    """
+    rep = {'rows': int(len(df))}
+    if len(df) == 0:
+        return rep
+    idx = df.index
+    rep['start'] = str(idx[0])
+    rep['end'] = str(idx[-1])
+    rep['monotonic_time'] = bool(idx.is_monotonic_increasing)
+    rep['duplicate_times'] = int(idx.duplicated().sum())
+
+    # asi8 is in the index's own unit (seconds for pyarrow-parsed times): compare in ns
+    t = pd.DatetimeIndex(idx).as_unit('ns').asi8
+    dt = np.diff(np.sort(t))
+    dt = dt[dt > 0]
+    if len(dt):
+        step = pd.Timedelta(freq).value if freq else int(np.median(dt))
+        gaps = dt[dt > step]
+        rep['bar_spacing'] = str(pd.Timedelta(step))
+        rep['gaps'] = int(len(gaps))
+        rep['missing_bars'] = int((gaps // step - 1).sum())
+        rep['largest_gap'] = str(pd.Timedelta(int(gaps.max()))) if len(gaps) else '0s'
+
+    o, h, l, c = (df[k].to_numpy(dtype=float) for k in ('open', 'high', 'low', 'close'))
+    v = df['volume'].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        rep['nan_rows'] = int(np.isnan(np.column_stack([o, h, l, c, v])).any(axis=1).sum())
+        rep['high_below_low'] = int((h < l).sum())
+        rep['high_below_open_close'] = int((h < np.maximum(o, c)).sum())
+        rep['low_above_open_close'] = int((l > np.minimum(o, c)).sum())
+        rep['non_positive_price'] = int(((o <= 0) | (h <= 0) | (l <= 0) | (c <= 0)).sum())
+        rep['negative_volume'] = int((v < 0).sum())
+        rep['zero_volume'] = int((v == 0).sum())
+    return rep
+
+_COUNTS = ('duplicate_times', 'nan_rows', 'high_below_low', 'high_below_open_close',
+           'low_above_open_close', 'non_positive_price', 'negative_volume', 'zero_volume')
+
+class ChunkValidator:
+    """
+    Merge validate_bars() reports over a file read in chunks (see iter_csv).
+    Each chunk is also checked against the last timestamp of the previous one, so order
+    breaks, duplicates and gaps that straddle a chunk boundary are counted. The bar
+    spacing is `freq`, or the first chunk's median spacing when omitted.
+    """
+    def __init__(self, freq: str | None = None):
+        self.step = pd.Timedelta(freq).value if freq else None
+        self.rows = 0
+        self.start = self.end = None
+        self.monotonic = True
+        self.counts = dict.fromkeys(_COUNTS, 0)
+        self.gaps = self.missing = self.largest = 0
+        self._last = None
+
+    def add(self, chunk: pd.DataFrame) -> dict:
+        """Validate one chunk, fold it into the running totals and return its own report."""
+        rep = validate_bars(chunk, freq=pd.Timedelta(self.step) if self.step else None)
+        if not len(chunk):
+            return rep
+        if self.step is None and 'bar_spacing' in rep:
+            self.step = pd.Timedelta(rep['bar_spacing']).value
+        t = pd.DatetimeIndex(chunk.index).as_unit('ns').asi8
+        if self._last is not None:
+            d = int(t[0]) - self._last
+            if d < 0:
+                self.monotonic = False
+            elif d == 0:
+                self.counts['duplicate_times'] += 1
+            elif self.step and d > self.step:
+                self.gaps += 1
+                self.missing += d // self.step - 1
+                self.largest = max(self.largest, d)
+        self._last = int(t[-1])
+        self.rows += rep['rows']
+        self.start = self.start or rep['start']
+        self.end = rep['end']
+        self.monotonic &= rep['monotonic_time']
+        for k in _COUNTS:
+            self.counts[k] += rep[k]
+        self.gaps += rep.get('gaps', 0)
+        self.missing += rep.get('missing_bars', 0)
+        self.largest = max(self.largest, pd.Timedelta(rep.get('largest_gap', '0s')).value)
+        return rep
+
+    def report(self) -> dict:
+        """The merged report, with the same keys as validate_bars() on the whole file."""
+        rep = {'rows': self.rows}
+        if not self.rows:
+            return rep
+        rep.update(start=self.start, end=self.end, monotonic_time=self.monotonic,
+                   duplicate_times=self.counts['duplicate_times'])
+        if self.step:
+            rep.update(bar_spacing=str(pd.Timedelta(self.step)), gaps=int(self.gaps),
+                       missing_bars=int(self.missing),
+                       largest_gap=str(pd.Timedelta(int(self.largest))) if self.gaps else '0s')
+        rep.update({k: self.counts[k] for k in _COUNTS[1:]})
+        return rep
+
+def ingest_csv(path: str, catalog: str, symbol: str, chunksize: int = 1_000_000,
+               freq: str | None = None) -> dict:
+    """
+    Stream a bar CSV into a dataset catalog one chunk at a time, so files larger than
+    RAM never have to be loaded whole. Returns the merged data-quality report.
+    """
+    from .catalog import BarCatalog
+    cat = BarCatalog(catalog)
+    val = ChunkValidator(freq)
+    for chunk in iter_csv(path, chunksize, validator=val):
+        chunk['volume'] = chunk['volume'].clip(lower=0.0)
+        cat.write(symbol, chunk)
+    return val.report()
+
+def load_csv(path: str, engine: str | None = None, chunksize: int | None = None,
+             return_report: bool = False):
+    """
+    Load a bar CSV into a time-indexed frame with float64 OHLCV columns.
+
+    Standard headers go through a typed fast path (pyarrow's multithreaded parser when
+    installed, else the C parser; `chunksize` parses the file in pieces, validating each
+    one, but still returns the whole frame: use iter_csv/ingest_csv to stay out of RAM).
+    Headers or values it cannot type fall back to the tolerant legacy parser.
+    With return_report=True, also returns the validate_bars() report of the raw rows,
+    taken in file order before sorting and before incomplete rows are dropped.
+    """
+    df = report = None
+    rename = _fast_layout(path)
+    if rename is not None:
+        try:
+            if chunksize:
+                val = ChunkValidator() if return_report else None
+                df = pd.concat(list(iter_csv(path, chunksize, validator=val)))
+                report = val.report() if val else None
+            else:
+                dtypes = {raw: 'float64' for raw, n in rename.items() if n in REQUIRED_COLS}
+                df = _finish_chunk(pd.read_csv(path, dtype=dtypes, engine=_pick_engine(engine)),
+                                   rename)
+                report = validate_bars(df) if return_report else None
+        except (ValueError, TypeError):
+            df = None  # e.g. thousands separators or text in numeric columns
+    if df is None:
+        df = _load_csv_legacy(path, sort=False)
+        report = validate_bars(df) if return_report else None
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
 
     # Drop rows missing any required field
     before = len(df)
@@ -66,7 +266,7 @@ def load_csv(path: str) -> pd.DataFrame:
     if (df['volume'] < 0).any():
         df.loc[df['volume'] < 0, 'volume'] = 0.0
 
-    return df
+    return (df, report) if return_report else df
 
 def synthetic_minute(start='2024-01-01', minutes=600, seed=42, start_price=100.0) -> pd.DataFrame:
     rng = np.random.default_rng(seed)
@@ -86,3 +286,23 @@ def synthetic_minute(start='2024-01-01', minutes=600, seed=42, start_price=100.0
     df = pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volu}, index=idx)
     df.index.name = 'time'
     return df
+
+def load_bars(csv: str = '', catalog: str = '', symbol: str = '', start=None, end=None, columns=None):
+    """
+    Load bars from a dataset catalog (symbol + optional time range) or a CSV path.
+    Returns None when neither source is available so callers can fall back to synthetic data.
+    An empty start/end ('') means unbounded, like None.
+    """
+    start = None if start is None or start == '' else start
+    end = None if end is None or end == '' else end
+    if catalog:
+        from .catalog import BarCatalog
+        if not symbol:
+            raise ValueError("--symbol is required with --catalog")
+        return BarCatalog(catalog).load(symbol, start=start, end=end, columns=columns)
+    if csv and os.path.exists(csv):
+        df = load_csv(csv)
+        if start is not None or end is not None:
+            df = df.loc[pd.Timestamp(start) if start else None:pd.Timestamp(end) if end else None]
+        return df
+    return None
@@ -0,0 +1,146 @@
+import threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+import pandas as pd
+from .catalog import BarCatalog
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+_UNIT_MS = {'s': 1000, 'm': 60 * 1000, 'h': 60 * 60 * 1000, 'd': MS_PER_DAY, 'w': 7 * MS_PER_DAY}
+
+def timeframe_ms(timeframe: str) -> int:
+    """ccxt-style timeframe ('1m', '15m', '1h', '1d') -> milliseconds."""
+    try:
+        return int(timeframe[:-1]) * _UNIT_MS[timeframe[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Unsupported timeframe {timeframe!r}")
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests/sec sustained, bursts of up to `burst`."""
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.t_last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.t_last) * self.rate)
+                self.t_last = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def _to_frame(rows: list) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=['time', 'open', 'high', 'low', 'close', 'volume'])
+    df['time'] = pd.to_datetime(df['time'], unit='ms')
+    for c in ['open', 'high', 'low', 'close', 'volume']:
+        df[c] = pd.to_numeric(df[c], errors='coerce')
+    df = df.dropna().set_index('time').sort_index()
+    return df[~df.index.duplicated(keep='last')]
+
+class IncrementalDownloader:
+    """
+    Fetch OHLCV bars from a ccxt-like exchange (anything with
+    fetch_ohlcv(symbol, timeframe=, since=, limit=) returning [[ms, o, h, l, c, v], ...])
+    straight into a BarCatalog.
+
+    - the requested range is cut into UTC days (one catalog partition each); days already
+      stored are skipped and a partially stored day resumes one bar after its last row,
+      so reruns only fetch what is missing, including days lost to a failed earlier run
+    - days are fetched concurrently; all requests share one token bucket so the
+      exchange rate limit holds across threads
+    - each day is written as soon as it completes (upsert + dedupe in the catalog),
+      so memory is bounded by one day per worker
+    """
+    def __init__(self, exchange, catalog: BarCatalog, timeframe: str = '1m', rate: float = 5.0,
+                 burst: int = 5, workers: int = 4, limit: int = 1000,
+                 max_retries: int = 3, retry_sleep: float = 1.0):
+        self.exchange = exchange
+        self.catalog = catalog
+        self.timeframe = timeframe
+        self.step = timeframe_ms(timeframe)
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = max(1, workers)
+        self.limit = limit
+        self.max_retries = max_retries
+        self.retry_sleep = retry_sleep
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    def _fetch_page(self, symbol: str, since: int) -> list:
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            with self._count_lock:
+                self.requests += 1
+            try:
+                return self.exchange.fetch_ohlcv(symbol, timeframe=self.timeframe, since=since, limit=self.limit)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"[WARN] fetch_ohlcv {symbol} since={since} failed ({e}); retrying")
+                time.sleep(self.retry_sleep * 2 ** attempt)
+
+    def fetch_window(self, symbol: str, start_ms: int, end_ms: int) -> int:
+        """Page through [start_ms, end_ms) and write it to the catalog; returns rows written."""
+        rows, since = [], start_ms
+        while since < end_ms:
+            batch = self._fetch_page(symbol, since)
+            if not batch:
+                break
+            rows += [r for r in batch if start_ms <= r[0] < end_ms]
+            nxt = batch[-1][0] + self.step
+            if nxt <= since or nxt >= end_ms:
+                break
+            since = nxt
+        if not rows:
+            return 0
+        df = _to_frame(rows)
+        self.catalog.write(symbol, df)
+        return len(df)
+
+    def plan(self, symbol: str, since_ms: int, until_ms: int) -> List[Tuple[str, int, int]]:
+        """(symbol, start_ms, end_ms) day windows in [since_ms, until_ms) not yet in the catalog."""
+        out = []
+        t = since_ms // self.step * self.step
+        while t < until_ms:
+            nxt = min(until_ms, (t // MS_PER_DAY + 1) * MS_PER_DAY)
+            meta = self.catalog.partition(symbol, pd.Timestamp(t, unit='ms'))
+            start = t
+            if meta is not None:
+                start = max(t, int(pd.Timestamp(meta['end']).value // 1_000_000) + self.step)
+            if start < nxt:
+                out.append((symbol, start, nxt))
+            t = nxt
+        return out
+
+    def sync(self, symbols: Iterable[str], since_ms: int, until_ms: Optional[int] = None) -> dict:
+        """
+        Bring every symbol up to `until_ms` (default: now). Returns rows written per symbol.
+        A failing day does not stop the others; failures are raised together at the end
+        and a rerun picks the missing days up again.
+        """
+        symbols = list(symbols)
+        if until_ms is None:
+            until_ms = int(time.time() * 1000)
+        until_ms = until_ms // self.step * self.step  # skip the still-open bar
+        jobs = [job for s in symbols for job in self.plan(s, since_ms, until_ms)]
+        written = {s: 0 for s in symbols}
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futs = [(job, pool.submit(self.fetch_window, *job)) for job in jobs]
+            for job, f in futs:
+                try:
+                    written[job[0]] += f.result()
+                except Exception as e:
+                    failed.append((job, e))
+        if failed:
+            detail = "; ".join(f"{s} {pd.Timestamp(a, unit='ms')}: {e}" for (s, a, _), e in failed[:5])
+            raise RuntimeError(f"{len(failed)} of {len(jobs)} windows failed ({detail}); rerun to resume")
+        return written
@@ -17,6 +17,18 @@ class Fill:
     qty: float
     fee: float
 
+def make_execution(cfg) -> "ExecutionSimulator":
+    """OHLC-path fill model selected by cfg.fill_model ('touch' or 'surrogate')."""
+    kind = cfg.fill_model
+    if kind == 'touch':
+        return ExecutionSimulator(cfg)
+    if kind == 'surrogate':
+        if cfg.use_lob:
+            raise ValueError("fill_model='surrogate' replaces the LOB path; set use_lob=False")
+        from .surrogate import SurrogateExecution
+        return SurrogateExecution(cfg)
+    raise ValueError(f"Unknown fill_model: {kind!r} (expected 'touch' or 'surrogate')")
+
 class ExecutionSimulator:
     def __init__(self, cfg):
         self.cfg = cfg
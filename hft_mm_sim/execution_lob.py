@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from typing import List
 import math, random
+from time import perf_counter
 import pandas as pd
 from .lob import LimitOrderBook, MakerFill  # MakerFill may be used by your LOB
+from .hawkes import HawkesFlow
 
 @dataclass
 class FillEx:
@@ -13,6 +15,15 @@ class FillEx:
     fee: float
     liquidity: str      # 'maker' or 'taker'
 
+def make_flow(cfg):
+    """Build the MO flow source selected by cfg.mo_flow ('uniform' or 'hawkes')."""
+    kind = cfg.mo_flow
+    if kind == 'uniform':
+        return None
+    if kind == 'hawkes':
+        return HawkesFlow(cfg.hawkes_branching, cfg.hawkes_cross_frac, cfg.hawkes_decay, cfg.seed)
+    raise ValueError(f"Unknown mo_flow: {kind!r} (expected 'uniform' or 'hawkes')")
+
 class ExecutionLOB:
     """Persistent LOB across bars; multi-level quoting; queue modeling; maker/taker econ."""
     def __init__(self, cfg):
@@ -20,6 +31,10 @@ class ExecutionLOB:
         self.rng = random.Random(cfg.seed)
         self.book: LimitOrderBook | None = None
         self.ours: List[int] = []  # our resting order IDs
+        self.flow = make_flow(cfg)  # None -> uniform per-micro-tick flow
+        self.profiler = None        # optional StageProfiler, set by Backtester
+        self.recorder = None        # optional BookRecorder, set by Backtester
+        self.journal = None         # optional EventJournal, set by Backtester
 
     def _ensure_book(self, mid: float, tick: float):
         if self.book is None:
@@ -41,6 +56,8 @@ class ExecutionLOB:
 
         # capture how many we really cancel right now
         n_orders = len(self.ours)
+        if self.profiler is not None:
+            self.profiler.count('cancels', n_orders)
 
         # cancel them on the book
         for oid in list(self.ours):
@@ -52,6 +69,8 @@ class ExecutionLOB:
         ba, _ = self.book.best_ask()
         mid = (bb + ba) / 2.0
         cost = n_orders * (mid * self.cfg.base_size) * (self.cfg.cancel_penalty_bps / 1e4)
+        if self.journal is not None:
+            self.journal.cancel(n_orders, cost)
         return float(cost)
 
     def _place_quotes(self, mid: float, tick: float) -> None:
@@ -68,6 +87,9 @@ class ExecutionLOB:
             ra = self.book.place_limit('sell', ask_p, size)
             if rb: self.ours.append(rb.order_id)
             if ra: self.ours.append(ra.order_id)
+            if self.journal is not None:
+                for ro in (rb, ra):
+                    if ro: self.journal.place(ro.side, ro.price, ro.qty, ro.queue_ahead)
 
     def _taker_rebalance(self, inventory: float, ref_time) -> List[FillEx]:
         if not (self.cfg.taker_rebalance and self.book):
@@ -92,25 +114,48 @@ class ExecutionLOB:
             self.book.asks[0] = (p, max(0.0, s - qty))
         return [FillEx(time=ref_time, side=side, price=px, qty=qty, fee=fee, liquidity='taker')]
 
-def run_bar(self, idx: int, t_start: any, row: pd.Series, next_row: pd.Series, inventory: float) -> List[FillEx]:
-    fills: List[FillEx] = []
-    mid = float(row.get('mid', row['close']))
-    tick = self.cfg.tick_size
-    self._ensure_book(mid, tick)
-    # Only cancel if not carrying orders
-    if not self.cfg.carry_orders or (self.ours and not self.cfg.carry_orders):
-        cancel_cost = self._cancel_all(t_start)
-        if cancel_cost > 0.0:
-            fills.append(FillEx(time=t_start, side='buy', price=mid, qty=0.0, fee=cancel_cost, liquidity='maker'))
-    # ... rest of the function ...
-    # Remove end-of-bar cancel or conditionalize similarly
-    if not self.cfg.carry_orders:
-        cancel_cost = self._cancel_all(t_start)
-        if cancel_cost > 0.0:
-            fills.append(FillEx(time=t_start, side='buy', price=mid, qty=0.0, fee=cancel_cost, liquidity='maker'))
+    def _uniform_orders(self, mean_per_tick: float, mom_sign: float, latency_ticks: int):
+        """One MO per micro-tick after the latency gate, side biased by momentum, exponential size."""
+        for k in range(self.cfg.lob_ticks_per_bar):
+            # latency gate: our newly placed orders start interacting only after latency elapses
+            if k >= latency_ticks:
+                prob_buy = 0.5 + 0.2 * mom_sign
+                prob_buy = max(0.0, min(1.0, prob_buy))
+                side = 'buy' if self.rng.random() < prob_buy else 'sell'
+                # exponential MO size
+                lam = 1.0 / max(1e-6, mean_per_tick)
+                mo_qty = max(0.0, self.rng.expovariate(lam))
+                yield k, side, mo_qty
+
+    def _hawkes_orders(self, mean_per_tick: float, mom_sign: float, latency_ticks: int):
+        """Clustered MO flow; events before the latency gate still excite the process."""
+        is_buy, sizes = self.flow.simulate_bar(self.cfg.lob_ticks_per_bar, mean_per_tick,
+                                               mom_sign=mom_sign, start_tick=latency_ticks)
+        for k, b, q in zip(self.flow.last_times.tolist(), is_buy.tolist(), sizes.tolist()):
+            yield k, ('buy' if b else 'sell'), q
+
+    def run_bar(self, t_start: any, row: pd.Series, mid: float, tick: float, inventory: float,
+                bar_idx: int = -1) -> List[FillEx]:
+        fills: List[FillEx] = []
+        prof = self.profiler
+        rec = self.recorder
+        jr = self.journal
+        if prof is not None:
+            tp = perf_counter()
+        self._ensure_book(mid, tick)
+        # Only cancel if not carrying orders
+        if not self.cfg.carry_orders:
+            cancel_cost = self._cancel_all(t_start)
+            if cancel_cost > 0.0:
+                fills.append(FillEx(time=t_start, side='buy', price=mid, qty=0.0, fee=cancel_cost, liquidity='maker'))
 
         # Place quotes for this bar
         self._place_quotes(mid, tick)
+        if rec is not None:
+            t_ns = pd.Timestamp(t_start).value
+            rec.record(t_ns, bar_idx, 0.0, self.book)
+        if prof is not None:
+            tp = prof.add('run;bar;lob;cancel_place', tp)
 
         # Convert latency seconds to micro-ticks
         latency_ticks = max(0, math.ceil(self.cfg.latency_sec / (60.0 / max(1, self.cfg.lob_ticks_per_bar))))
@@ -121,30 +166,42 @@ def run_bar(self, idx: int, t_start: any, row: pd.Series, next_row: pd.Series, i
         mean_per_tick = mo_total / max(1, self.cfg.lob_ticks_per_bar)
         mom_sign = float(row.get('mom_sign', 0.0))
 
-        for k in range(self.cfg.lob_ticks_per_bar):
-            # latency gate: our newly placed orders start interacting only after latency elapses
-            if k >= latency_ticks:
-                prob_buy = 0.5 + 0.2 * mom_sign
-                prob_buy = max(0.0, min(1.0, prob_buy))
-                side = 'buy' if self.rng.random() < prob_buy else 'sell'
-                # exponential MO size
-                lam = 1.0 / max(1e-6, mean_per_tick)
-                mo_qty = max(0.0, self.rng.expovariate(lam))
-                maker_fills = self.book.process_market_order(side, mo_qty, t=t_start)
-                for mf in maker_fills:
-                    # maker economics: rebate is negative bps → negative fee means +PnL
-                    fee = abs(mf.price * mf.qty) * (self.cfg.maker_rebate_bps / 1e4)
-                    fills.append(FillEx(time=mf.time, side=mf.side, price=mf.price,
-                                        qty=mf.qty, fee=fee, liquidity='maker'))
+        if self.flow is not None:
+            orders = self._hawkes_orders(mean_per_tick, mom_sign, latency_ticks)
+        else:
+            orders = self._uniform_orders(mean_per_tick, mom_sign, latency_ticks)
+
+        n_mo = 0
+        for k, side, mo_qty in orders:
+            n_mo += 1
+            maker_fills = self.book.process_market_order(side, mo_qty, t=t_start)
+            for mf in maker_fills:
+                # maker economics: rebate is negative bps → negative fee means +PnL
+                fee = abs(mf.price * mf.qty) * (self.cfg.maker_rebate_bps / 1e4)
+                fills.append(FillEx(time=mf.time, side=mf.side, price=mf.price,
+                                    qty=mf.qty, fee=fee, liquidity='maker'))
+            if rec is not None or jr is not None:
+                ours = sum(mf.qty for mf in maker_fills)
+                if rec is not None:
+                    rec.record(t_ns, bar_idx, k, self.book, 1 if side == 'buy' else -1, mo_qty, ours)
+                if jr is not None:
+                    jr.market_order(side, mo_qty, k, ours)
+
+        if prof is not None:
+            tp = prof.add('run;bar;lob;market_orders', tp)
+            prof.count('micro_ticks', self.cfg.lob_ticks_per_bar)
+            prof.count('market_orders', n_mo)
 
         # Optional taker rebalance near bar end
         fills.extend(self._taker_rebalance(inventory, ref_time=t_start))
 
-        # 🚫 FIX: only end-of-bar cancel if carry_orders is False
+        # only end-of-bar cancel if carry_orders is False
         if not self.cfg.carry_orders:
             cancel_cost = self._cancel_all(t_start)
             if cancel_cost > 0.0:
                 fills.append(FillEx(time=t_start, side='buy', price=mid, qty=0.0,
                                     fee=cancel_cost, liquidity='maker'))
+        if prof is not None:
+            prof.add('run;bar;lob;rebalance_cancel', tp)
 
         return fills
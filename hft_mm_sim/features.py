@@ -1,3 +1,4 @@
+import math
 import pandas as pd
 import numpy as np
 
@@ -13,3 +14,79 @@ def add_features(df: pd.DataFrame, vol_lookback: int, mom_lookback: int) -> pd.D
     out['mom_sign'] = np.sign(out['mom']).fillna(0.0)
 
     return out
+
+class OnlineFeatures:
+    """
+    Per-bar, O(1) version of add_features for streaming / live / chunked runs.
+
+    Keeps ring buffers of the last vol_lookback returns and mom_lookback + 1 closes;
+    the rolling std is a Welford mean/M2 with add/remove, re-summed from the buffer
+    every `resync_every` updates so floating-point drift stays bounded. Values match
+    add_features over the same bars (same min_periods, ddof=1, NaN -> 0 rules).
+    """
+    COLUMNS = ('mid', 'vol', 'mom', 'mom_sign')
+
+    def __init__(self, vol_lookback: int, mom_lookback: int, resync_every: int = 4096):
+        self.vol_lookback = vol_lookback
+        self.mom_lookback = mom_lookback
+        self.min_periods = max(2, vol_lookback // 2)
+        self.resync_every = resync_every
+        self._rets = [0.0] * vol_lookback
+        self._closes = [0.0] * (mom_lookback + 1)
+        self.n_bars = 0
+        self._n_rets = 0      # returns currently in the window
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    def _push_ret(self, r: float):
+        if self._n_rets == self.vol_lookback:
+            old = self._rets[self._updates % self.vol_lookback]
+            n = self._n_rets - 1
+            d = old - self._mean
+            self._mean -= d / n
+            self._m2 -= d * (old - self._mean)
+            self._n_rets = n
+        self._rets[self._updates % self.vol_lookback] = r
+        self._updates += 1
+        self._n_rets += 1
+        d = r - self._mean
+        self._mean += d / self._n_rets
+        self._m2 += d * (r - self._mean)
+        if self._updates % self.resync_every == 0:
+            window = self._rets if self._n_rets == self.vol_lookback else self._rets[:self._n_rets]
+            self._mean = math.fsum(window) / self._n_rets
+            self._m2 = math.fsum((x - self._mean) ** 2 for x in window)
+
+    def update(self, high: float, low: float, close: float):
+        """Add one bar; returns (mid, vol, mom, mom_sign) for it."""
+        i = self.n_bars
+        if i > 0:
+            prev = self._closes[(i - 1) % len(self._closes)]
+            self._push_ret(close / prev - 1.0)
+        self._closes[i % len(self._closes)] = close
+        self.n_bars = i + 1
+
+        if self._n_rets >= self.min_periods:
+            vol = math.sqrt(max(self._m2, 0.0) / (self._n_rets - 1))
+        else:
+            vol = 0.0
+        if i >= self.mom_lookback:
+            mom = close - self._closes[(i - self.mom_lookback) % len(self._closes)]
+            mom_sign = 1.0 if mom > 0 else (-1.0 if mom < 0 else 0.0)
+        else:
+            mom, mom_sign = float('nan'), 0.0
+        return (high + low) / 2.0, vol, mom, mom_sign
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """add_features for the next chunk of bars, continuing from the bars already seen."""
+        out = df.copy()
+        h = df['high'].to_numpy(dtype=float)
+        lo = df['low'].to_numpy(dtype=float)
+        c = df['close'].to_numpy(dtype=float)
+        vals = np.empty((len(df), 4))
+        for k in range(len(df)):
+            vals[k] = self.update(h[k], lo[k], c[k])
+        for j, name in enumerate(self.COLUMNS):
+            out[name] = vals[:, j]
+        return out
@@ -0,0 +1,329 @@
+import hashlib, json, os, shutil, threading, time, traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import unquote
+from .config import config_from_dict, config_to_dict
+
+# Local backtest job service: POST an MMConfig + dataset reference, get a job id back,
+# follow its progress, fetch its artifacts. Jobs are keyed by a hash of the full config
+# and the dataset (including the data file's size/mtime), so an identical request maps to
+# the same job and a finished one is answered from <root>/<job id>/ without rerunning.
+
+DATASET_KEYS = ('csv', 'catalog', 'symbol', 'start', 'end', 'minutes', 'seed')
+PROGRESS_FILE = 'progress.jsonl'
+RESULT_FILE = 'result.json'
+TERMINAL = ('done', 'failed')
+
+def _dataset_version(ds: dict):
+    """Cheap change marker of the referenced data, so edits to a CSV/catalog invalidate cached jobs."""
+    if ds.get('catalog'):
+        path = os.path.join(ds['catalog'], '_index.json')
+    elif ds.get('csv'):
+        path = ds['csv']
+    else:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise ValueError(f"dataset not found: {path}")
+    return [st.st_size, st.st_mtime_ns]
+
+def normalize_request(body: dict) -> dict:
+    """Validate a submitted job and fill defaults; raises ValueError on bad input."""
+    if not isinstance(body, dict):
+        raise ValueError("request body must be a JSON object")
+    unknown = set(body) - {'config', 'dataset', 'artifact_format', 'progress_every'}
+    if unknown:
+        raise ValueError(f"Unknown request fields: {sorted(unknown)}")
+    cfg = config_to_dict(config_from_dict(body.get('config') or {}))
+    ds = body.get('dataset') or {}
+    bad = set(ds) - set(DATASET_KEYS)
+    if bad:
+        raise ValueError(f"Unknown dataset fields: {sorted(bad)}")
+    if ds.get('catalog') and not ds.get('symbol'):
+        raise ValueError("dataset.symbol is required with dataset.catalog")
+    ds = {k: ds[k] for k in DATASET_KEYS if ds.get(k) not in (None, '')}
+    if not (ds.get('csv') or ds.get('catalog')):
+        ds.setdefault('minutes', 600)
+        ds.setdefault('seed', 42)
+    from .artifacts import FORMATS
+    fmt = body.get('artifact_format', 'csv')
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown artifact format {fmt!r}; choose from {list(FORMATS)}")
+    return {'config': cfg, 'dataset': ds, 'artifact_format': fmt,
+            'progress_every': int(body.get('progress_every', 20)), 'version': _dataset_version(ds)}
+
+def job_key(req: dict) -> str:
+    """Content hash of a normalized request (progress_every does not change results)."""
+    ident = {k: req[k] for k in ('config', 'dataset', 'artifact_format', 'version')}
+    return hashlib.sha256(json.dumps(ident, sort_keys=True).encode()).hexdigest()[:20]
+
+def run_job(req: dict, job_dir: str) -> dict:
+    """
+    Worker side: load the data, run the backtest in `progress_every` slices via
+    Backtester.extend (same result as one run) appending a progress line after each,
+    write artifacts and result.json into job_dir. Returns the metrics.
+    """
+    from .backtester import Backtester
+    from .data import load_bars, synthetic_minute
+    from .analytics import compute_metrics
+    from .artifacts import ArtifactWriter
+
+    def progress(**kw):
+        kw['ts'] = time.time()
+        with open(os.path.join(job_dir, PROGRESS_FILE), 'a') as f:
+            f.write(json.dumps(kw, default=str) + '\n')
+
+    ds = req['dataset']
+    df = load_bars(csv=ds.get('csv', ''), catalog=ds.get('catalog', ''), symbol=ds.get('symbol', ''),
+                   start=ds.get('start'), end=ds.get('end'))
+    if df is None:
+        df = synthetic_minute(minutes=ds.get('minutes', 600), seed=ds.get('seed', 42))
+    n = len(df)
+    progress(stage='loaded', bars=n)
+
+    bt = Backtester(config_from_dict(req['config']))
+    step = max(3, -(-n // max(1, req['progress_every'])))
+    for end in list(range(step, n, step)) + [n]:
+        res = bt.extend(df.iloc[:end])
+        last = float(df['close'].iloc[end - 1])
+        progress(stage='running', bars_done=end, bars=n, inventory=bt.inventory, cash=bt.cash,
+                 equity=bt.cash + bt.inventory * last)
+
+    metrics = compute_metrics(res['logs']['equity']) if len(res['logs']) else {}
+    metrics.update(bars=len(res['logs']), trades=len(res['trades']), risk_blocks=res['risk_blocks'])
+    with ArtifactWriter(job_dir, fmt=req['artifact_format']) as w:
+        w.write('logs', res['logs'], index=True)
+        w.write('trades', res['trades'])
+        w.write('costs', res['costs'])
+    tmp = os.path.join(job_dir, RESULT_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump({'request': req, 'metrics': metrics}, f, indent=1, default=str)
+    os.replace(tmp, os.path.join(job_dir, RESULT_FILE))
+    progress(stage='done', **metrics)
+    return metrics
+
+class JobService:
+    """
+    Queue + bounded process pool behind the HTTP handler. Submitted jobs wait in a
+    FIFO; at most `processes` run at once, so hundreds of queued jobs cost only their
+    small request dicts. Finished jobs live on disk under root/<id>/ and are reloaded
+    on restart; submitting a finished or in-flight request returns the existing job.
+    """
+    def __init__(self, root: str = 'artifacts/jobs', processes: int = 2, max_queued: int = 1000):
+        self.root = root
+        self.processes = max(1, processes)
+        self.max_queued = max_queued
+        os.makedirs(root, exist_ok=True)
+        self.jobs: Dict[str, dict] = {}
+        self._queue: deque = deque()
+        self._running = 0
+        self._lock = threading.RLock()   # re-entered if a future is already done at add_done_callback
+        self._pool: Optional[ProcessPoolExecutor] = None
+        for d in sorted(os.listdir(root)):
+            path = os.path.join(root, d, RESULT_FILE)
+            if os.path.exists(path):
+                with open(path) as f:
+                    r = json.load(f)
+                self.jobs[d] = {'id': d, 'status': 'done', 'request': r['request'],
+                                'metrics': r['metrics'], 'error': None, 'submitted': None, 'finished': None}
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def submit(self, body: dict) -> tuple:
+        """-> (job, created). Raises ValueError for a bad request, OverflowError when the queue is full."""
+        req = normalize_request(body)
+        key = job_key(req)
+        with self._lock:
+            job = self.jobs.get(key)
+            if job is not None and job['status'] != 'failed':
+                return job, False
+            if len(self._queue) >= self.max_queued:
+                raise OverflowError(f"queue full ({self.max_queued} jobs)")
+            shutil.rmtree(self.job_dir(key), ignore_errors=True)
+            os.makedirs(self.job_dir(key))
+            job = {'id': key, 'status': 'queued', 'request': req, 'metrics': None, 'error': None,
+                   'submitted': time.time(), 'finished': None}
+            self.jobs[key] = job
+            self._queue.append(key)
+            self._dispatch()
+        return job, True
+
+    def _dispatch(self):
+        # caller holds self._lock
+        while self._queue and self._running < self.processes:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes)
+            key = self._queue.popleft()
+            job = self.jobs[key]
+            job['status'] = 'running'
+            self._running += 1
+            fut = self._pool.submit(run_job, job['request'], self.job_dir(key))
+            fut.add_done_callback(lambda f, key=key: self._finished(key, f))
+
+    def _finished(self, key: str, fut):
+        with self._lock:
+            job = self.jobs[key]
+            try:
+                job['metrics'] = fut.result()
+                job['status'] = 'done'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = f"{type(e).__name__}: {e}"
+                with open(os.path.join(self.job_dir(key), 'error.txt'), 'w') as f:
+                    f.write(''.join(traceback.format_exception(e)))
+            job['finished'] = time.time()
+            self._running -= 1
+            self._dispatch()
+
+    def progress(self, job_id: str, since: int = 0) -> list:
+        """Progress lines of a job from line `since` on."""
+        path = os.path.join(self.job_dir(job_id), PROGRESS_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            lines = f.readlines()
+        # a line still being written has no trailing newline yet
+        return [json.loads(l) for l in lines[since:] if l.endswith('\n')]
+
+    def status(self, job_id: str) -> Optional[dict]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        out = {k: job[k] for k in ('id', 'status', 'metrics', 'error', 'submitted', 'finished')}
+        if job['status'] == 'queued':
+            with self._lock:
+                out['queue_position'] = list(self._queue).index(job_id) if job_id in self._queue else None
+        last = self.progress(job_id)[-1:] if job['status'] == 'running' else []
+        out['progress'] = last[0] if last else None
+        return out
+
+    def counts(self) -> dict:
+        out = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for job in list(self.jobs.values()):
+            out[job['status']] += 1
+        return out
+
+    def artifacts(self, job_id: str) -> list:
+        d = self.job_dir(job_id)
+        return sorted(os.path.relpath(os.path.join(r, f), d) for r, _, fs in os.walk(d) for f in fs)
+
+    def artifact_path(self, job_id: str, name: str) -> Optional[str]:
+        """Path of a file inside the job directory; None if missing or outside it."""
+        d = os.path.realpath(self.job_dir(job_id))
+        path = os.path.realpath(os.path.join(d, name))
+        if not path.startswith(d + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def close(self):
+        with self._lock:
+            self._queue.clear()
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    POST /jobs                         {"config": {...MMConfig fields}, "dataset": {...}} -> job
+    GET  /jobs                         counts + every job's status
+    GET  /jobs/<id>                    status, last progress line, metrics
+    GET  /jobs/<id>/events             progress as newline-delimited JSON until the job ends
+    GET  /jobs/<id>/artifacts[/<file>] list / download files written by the job
+    """
+    service: JobService = None
+    poll_sec = 0.2
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, code: int, obj):
+        data = json.dumps(obj, default=str).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            return self._json(404, {'error': 'not found'})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            job, created = self.service.submit(body)
+        except (ValueError, TypeError) as e:
+            return self._json(400, {'error': str(e)})
+        except OverflowError as e:
+            return self._json(503, {'error': str(e)})
+        self._json(202 if created else 200, dict(self.service.status(job['id']), cached=not created))
+
+    def do_GET(self):
+        parts = [unquote(p) for p in self.path.split('?')[0].strip('/').split('/')]
+        if parts[0] != 'jobs':
+            return self._json(404, {'error': 'not found'})
+        svc = self.service
+        if len(parts) == 1:
+            return self._json(200, {'counts': svc.counts(),
+                                    'jobs': [svc.status(k) for k in list(svc.jobs)]})
+        job_id = parts[1]
+        if svc.status(job_id) is None:
+            return self._json(404, {'error': f'unknown job {job_id}'})
+        if len(parts) == 2:
+            return self._json(200, svc.status(job_id))
+        if parts[2] == 'events':
+            return self._stream(job_id)
+        if parts[2] == 'artifacts':
+            if len(parts) == 3:
+                return self._json(200, svc.artifacts(job_id))
+            path = svc.artifact_path(job_id, '/'.join(parts[3:]))
+            if path is None:
+                return self._json(404, {'error': 'no such artifact'})
+            return self._file(path)
+        self._json(404, {'error': 'not found'})
+
+    def _file(self, path: str):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json' if path.endswith('.json') else 'application/octet-stream')
+        self.send_header('Content-Length', str(os.path.getsize(path)))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def _chunk(self, obj):
+        data = (json.dumps(obj, default=str) + '\n').encode()
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def _stream(self, job_id: str):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        sent = 0
+        try:
+            while True:
+                st = self.service.status(job_id)
+                for line in self.service.progress(job_id, sent):
+                    self._chunk(line)
+                    sent += 1
+                if st['status'] in TERMINAL:
+                    # lines written between the read above and the job finishing
+                    for line in self.service.progress(job_id, sent):
+                        self._chunk(line)
+                    self._chunk({k: st[k] for k in ('id', 'status', 'metrics', 'error')})
+                    break
+                time.sleep(self.poll_sec)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def make_server(service: JobService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """HTTP server bound to host:port (port 0 = any free port) serving `service`."""
+    handler = type('JobHandler', (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,310 @@
+import os, struct
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+MAGIC = b'HFTJRNL1'
+VERSION = 1
+# kind, flag (side / liquidity / chunk), aux (reason code), bar, time ns, 4 payload doubles
+_REC = struct.Struct('<BbxxIqqdddd')
+REC_SIZE = _REC.size
+_HEADER = struct.Struct(f'<8sII{REC_SIZE - 16}x')   # one record long, so records stay aligned
+_IDX = struct.Struct('<qqdd')                      # bar, record number of its BAR event, inventory, cash
+
+# event kinds and their payload (a, b, c, d)
+BAR = 1       # bar start: inventory, cash
+QUOTE = 2     # OHLC quotes: bid, ask, size_bid, size_ask
+PLACE = 3     # flag side: price, qty, activate bar (OHLC) or queue ahead (LOB), -
+CANCEL = 4    # our resting orders cancelled: count, penalty cost
+MO = 5        # flag side: qty, micro-tick, qty that hit our orders
+FILL = 6      # flag side * (1 maker, 2 taker): price, qty, fee
+RISK = 7      # aux reason: quotes blocked this bar
+END = 8       # aux reason: price_ref, inventory, cash, equity
+REASON = 9    # aux code, flag chunk: 32 bytes of the utf-8 reason string per record
+KINDS = {BAR: 'bar', QUOTE: 'quote', PLACE: 'place', CANCEL: 'cancel', MO: 'mo', FILL: 'fill',
+         RISK: 'risk_block', END: 'end', REASON: 'reason'}
+
+RECORD_DTYPE = np.dtype([('kind', 'u1'), ('flag', 'i1'), ('pad', '<u2'), ('aux', '<u4'), ('bar', '<i8'),
+                         ('t', '<i8'), ('a', '<f8'), ('b', '<f8'), ('c', '<f8'), ('d', '<f8')])
+assert RECORD_DTYPE.itemsize == REC_SIZE
+
+def _side(side: str) -> int:
+    return 1 if side == 'buy' else -1
+
+def _reason_chunks(text: str) -> list:
+    raw = text.encode('utf-8')[:32 * 127] or b'\0'
+    raw = raw.ljust(-(-len(raw) // 32) * 32, b'\0')
+    return [struct.unpack('<4d', raw[i:i + 32]) for i in range(0, len(raw), 32)]
+
+def _unpack_reason(chunks) -> str:
+    return b''.join(struct.pack('<4d', *c) for c in chunks).rstrip(b'\0').decode('utf-8', 'replace')
+
+class EventJournal:
+    """
+    Append-only binary journal of one run's decisions, written by Backtester (see
+    attach_journal): per bar a BAR event, the quotes / order placements / cancels /
+    market orders / fills / risk blocks in the order they happened, and an END event
+    with the bar's accounting. Records are fixed-size (56 bytes), buffered and written
+    in blocks. Every `index_every` bars the record number and the starting
+    inventory/cash go to the sparse index `<path>.idx`, so JournalReader can rebuild
+    the state at any bar by replaying fills from the nearest entry.
+    `append=True` continues an existing journal (resumed or extended runs); with
+    `truncate_to` (the n_records a checkpoint saved, see Backtester.save_checkpoint)
+    it first drops the records written after that checkpoint.
+    """
+    def __init__(self, path: str, index_every: int = 256, append: bool = False, buffer_records: int = 4096,
+                 truncate_to: Optional[int] = None):
+        if index_every < 1:
+            raise ValueError("index_every must be >= 1")
+        self.path, self.index_path = path, path + '.idx'
+        self.index_every = index_every
+        self.buffer_records = buffer_records
+        self._reasons: Dict[str, int] = {}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if append and os.path.exists(path):
+            n = (os.path.getsize(path) - _HEADER.size) // REC_SIZE
+            if truncate_to is not None:
+                n = min(n, truncate_to)
+            # cut back to whole records (and the checkpoint) so appends stay aligned
+            with open(path, 'r+b') as f:
+                f.truncate(_HEADER.size + n * REC_SIZE)
+            reader = JournalReader(path)
+            with open(self.index_path, 'wb') as f:
+                reader.index.tofile(f)   # entries past the cut would break the bar ordering
+            self._reasons = {r: i for i, r in enumerate(reader.reasons)}
+            self.n_records = len(reader)
+            self._f = open(path, 'ab')
+        else:
+            self._f = open(path, 'wb')
+            self._f.write(_HEADER.pack(MAGIC, VERSION, REC_SIZE))
+            self.n_records = 0
+            open(self.index_path, 'wb').close()
+        self._idx = open(self.index_path, 'ab')
+        self._buf = bytearray()
+        self._pending = 0
+        self.bar, self.t = -1, 0
+        self._indexed = False
+
+    def _emit(self, kind: int, flag: int = 0, aux: int = 0, a=0.0, b=0.0, c=0.0, d=0.0):
+        self._buf += _REC.pack(kind, flag, aux, self.bar, self.t, a, b, c, d)
+        self.n_records += 1
+        self._pending += 1
+        if self._pending >= self.buffer_records:
+            self.flush()
+
+    def _reason(self, reason: str) -> int:
+        code = self._reasons.get(reason)
+        if code is None:
+            code = self._reasons[reason] = len(self._reasons)
+            for i, chunk in enumerate(_reason_chunks(reason)):
+                self._emit(REASON, i, code, *chunk)
+        return code
+
+    def begin_bar(self, bar: int, t, inventory: float, cash: float):
+        self.bar, self.t = bar, pd.Timestamp(t).value
+        if bar % self.index_every == 0 or not self._indexed:   # always index where this writer starts
+            self._idx.write(_IDX.pack(bar, self.n_records, inventory, cash))
+            self._indexed = True
+        self._emit(BAR, 0, 0, inventory, cash)
+
+    def quote(self, bid: float, ask: float, size_bid: float, size_ask: float):
+        self._emit(QUOTE, 0, 0, bid, ask, size_bid, size_ask)
+
+    def place(self, side: str, price: float, qty: float, where: float):
+        self._emit(PLACE, _side(side), 0, price, qty, where)
+
+    def cancel(self, n_orders: int, cost: float):
+        self._emit(CANCEL, 0, 0, n_orders, cost)
+
+    def market_order(self, side: str, qty: float, tick: float, our_fill: float):
+        self._emit(MO, _side(side), 0, qty, tick, our_fill)
+
+    def fills(self, fills):
+        for f in fills:
+            liq = 2 if getattr(f, 'liquidity', 'maker') == 'taker' else 1
+            self._emit(FILL, _side(f.side) * liq, 0, f.price, f.qty, f.fee)
+
+    def risk_block(self, reason: str):
+        self._emit(RISK, 0, self._reason(reason))
+
+    def end_bar(self, price_ref: float, inventory: float, cash: float, equity: float, reason: str):
+        self._emit(END, 0, self._reason(reason), price_ref, inventory, cash, equity)
+
+    def flush(self):
+        if self._buf:
+            self._f.write(self._buf)
+            self._buf = bytearray()
+            self._pending = 0
+        self._f.flush()
+        self._idx.flush()
+
+    def close(self):
+        if self._f is None:
+            return
+        self.flush()
+        self._f.close()
+        self._idx.close()
+        self._f = self._idx = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        raise TypeError("EventJournal is bound to an open file and cannot be pickled")
+
+def build_index(path: str, index_every: int = 256) -> np.ndarray:
+    """Rebuild `<path>.idx` from a sequential pass (e.g. after the index was lost)."""
+    reader = JournalReader(path, use_index=False)
+    rows = []
+    for rec_no in np.flatnonzero(reader.records['kind'] == BAR):
+        r = reader.records[rec_no]
+        if r['bar'] % index_every == 0 or not rows:
+            rows.append((int(r['bar']), int(rec_no), float(r['a']), float(r['b'])))
+    with open(path + '.idx', 'wb') as f:
+        for row in rows:
+            f.write(_IDX.pack(*row))
+    return JournalReader(path).index
+
+class JournalReader:
+    """
+    Read side of an EventJournal. The records are memory-mapped as one structured
+    array, so a sparse-index seek touches only the records after the chosen entry.
+    state_at() replays fills with the same float operations as Backtester, so its
+    inventory/cash match the run bit for bit; verify() checks that for every bar.
+    """
+    def __init__(self, path: str, use_index: bool = True):
+        with open(path, 'rb') as f:
+            magic, version, rec_size = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an event journal")
+        if version != VERSION or rec_size != REC_SIZE:
+            raise ValueError(f"{path}: journal version {version}/{rec_size}, expected {VERSION}/{REC_SIZE}")
+        n = (os.path.getsize(path) - _HEADER.size) // REC_SIZE   # ignore a torn trailing record
+        self.path = path
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=_HEADER.size, shape=(n,)) \
+            if n else np.empty(0, dtype=RECORD_DTYPE)
+        rr = self.records[self.records['kind'] == REASON]
+        chunks: Dict[int, list] = {}
+        for code, a, b, c, d in zip(rr['aux'].tolist(), rr['a'].tolist(), rr['b'].tolist(),
+                                    rr['c'].tolist(), rr['d'].tolist()):
+            chunks.setdefault(code, []).append((a, b, c, d))
+        self.reasons: List[str] = [_unpack_reason(chunks[k]) for k in range(len(chunks))]
+        self.index = np.empty(0, dtype=[('bar', '<i8'), ('rec', '<i8'), ('inventory', '<f8'), ('cash', '<f8')])
+        if use_index and os.path.exists(path + '.idx'):
+            raw = np.fromfile(path + '.idx', dtype=self.index.dtype)
+            self.index = raw[raw['rec'] < n]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _seek(self, bar: int):
+        """(record number, inventory, cash) of the latest indexed bar <= `bar`, else the start."""
+        k = np.searchsorted(self.index['bar'], bar, side='right') - 1 if len(self.index) else -1
+        if k < 0:
+            return 0, 0.0, 0.0
+        e = self.index[k]
+        return int(e['rec']), float(e['inventory']), float(e['cash'])
+
+    def _bar_span(self, bar: int, start: int):
+        """[first, last) record numbers of bar `bar`, scanning forward from `start`."""
+        bars = self.records['bar'][start:]
+        i = start + np.searchsorted(bars, bar, side='left')
+        j = start + np.searchsorted(bars, bar, side='right')
+        return int(i), int(j)
+
+    def events(self, bar: int) -> pd.DataFrame:
+        """All events of one bar, decoded."""
+        rec, _, _ = self._seek(bar)
+        i, j = self._bar_span(bar, rec)
+        return self.frame(self.records[i:j])
+
+    def frame(self, recs: Optional[np.ndarray] = None) -> pd.DataFrame:
+        recs = self.records if recs is None else recs
+        out = pd.DataFrame({k: np.asarray(recs[k]) for k in RECORD_DTYPE.names if k != 'pad'})
+        out['kind'] = out['kind'].map(KINDS)
+        out['time'] = pd.to_datetime(out.pop('t'))
+        return out
+
+    @staticmethod
+    def _apply_fills(recs: np.ndarray, inventory: float, cash: float):
+        """Backtester._account_fills on FILL records, in order."""
+        f = recs[recs['kind'] == FILL]
+        for flag, price, qty, fee in zip(f['flag'].tolist(), f['a'].tolist(), f['b'].tolist(), f['c'].tolist()):
+            if flag > 0:
+                cash -= price * qty
+                inventory += qty
+            else:
+                cash += price * qty
+                inventory -= qty
+            cash -= fee
+        return inventory, cash
+
+    def state_at(self, bar: int) -> dict:
+        """Engine state at the end of `bar`, rebuilt from fills after the nearest index entry."""
+        rec, inv, cash = self._seek(bar)
+        i, j = self._bar_span(bar, rec)
+        if i == j:
+            raise ValueError(f"bar {bar} is not in {self.path}")
+        inv, cash = self._apply_fills(self.records[rec:j], inv, cash)
+        end = self.records[i:j]
+        end = end[end['kind'] == END]
+        out = {'bar': bar, 'time': pd.Timestamp(int(self.records[i]['t'])), 'inventory': inv, 'cash': cash}
+        if len(end):
+            e = end[-1]
+            out.update(price_ref=float(e['a']), equity=cash + inv * float(e['a']),
+                       reason=self.reasons[int(e['aux'])],
+                       matches_journal=(inv == float(e['b']) and cash == float(e['c'])))
+        return out
+
+    def verify(self) -> dict:
+        """
+        Sequential determinism check: replay every fill and compare inventory/cash with
+        each END event, and each index entry with the replayed state at its bar start.
+        """
+        recs = self.records
+        kinds, flags = recs['kind'].tolist(), recs['flag'].tolist()
+        a, b, c = recs['a'].tolist(), recs['b'].tolist(), recs['c'].tolist()
+        bars = recs['bar'].tolist()
+        index = {int(e['rec']): (float(e['inventory']), float(e['cash'])) for e in self.index}
+        inv = cash = 0.0
+        n_bars = 0
+        first_bad = None
+        for k in range(len(kinds)):
+            kind = kinds[k]
+            if kind == FILL:
+                if flags[k] > 0:
+                    cash -= a[k] * b[k]
+                    inv += b[k]
+                else:
+                    cash += a[k] * b[k]
+                    inv -= b[k]
+                cash -= c[k]
+            elif kind == BAR:
+                if n_bars == 0:   # a journal of a resumed run starts mid-run
+                    inv, cash = a[k], b[k]
+                elif (a[k], b[k]) != (inv, cash):
+                    first_bad = first_bad or {'bar': bars[k], 'what': 'bar_start'}
+                if k in index and index[k] != (inv, cash):
+                    first_bad = first_bad or {'bar': bars[k], 'what': 'index'}
+                n_bars += 1
+            elif kind == END and (b[k], c[k]) != (inv, cash):
+                first_bad = first_bad or {'bar': bars[k], 'what': 'end'}
+        return {'ok': first_bad is None, 'bars': n_bars, 'records': len(kinds), 'first_mismatch': first_bad}
+
+def diff_journals(path_a: str, path_b: str) -> Optional[dict]:
+    """First record where two journals differ (None if identical): decoded events of both."""
+    ra, rb = JournalReader(path_a, use_index=False).records, JournalReader(path_b, use_index=False).records
+    n = min(len(ra), len(rb))
+    bad = np.flatnonzero(ra[:n] != rb[:n])
+    if len(bad) == 0 and len(ra) == len(rb):
+        return None
+    k = int(bad[0]) if len(bad) else n
+    def pick(recs):
+        if k >= len(recs):
+            return None
+        r = recs[k]
+        return {'kind': KINDS.get(int(r['kind'])), 'bar': int(r['bar']), **{f: float(r[f]) for f in 'abcd'}}
+    return {'record': k, 'a': pick(ra), 'b': pick(rb)}
@@ -0,0 +1,178 @@
+import os, resource, sys, tracemalloc
+from contextlib import contextmanager
+from typing import List, Optional
+import pandas as pd
+
+MB = 1024.0 * 1024.0
+
+def current_rss_bytes() -> int:
+    """Resident set size now (Linux /proc); falls back to the peak where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+def peak_rss_bytes() -> int:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # KiB on Linux
+
+class MemoryBudgetExceeded(MemoryError):
+    pass
+
+class MemoryTracker:
+    """
+    Opt-in memory instrumentation for a backtest pipeline.
+
+    - begin(name)/end() or stage(name): records RSS before/after, process peak RSS and
+      (with trace=True) the tracemalloc peak inside the stage plus its top allocation sites.
+    - budget_mb: when RSS passes spill_frac * budget, should_spill() turns True and the
+      Backtester moves its in-memory log/trade records to disk; check() raises
+      MemoryBudgetExceeded if RSS is still above the full budget after that.
+      RSS rarely drops after a spill (the allocator keeps the freed pages, and new
+      records reuse them), so once spilling has started the next spill waits until RSS
+      grows past its level at the last spill.
+      The budget covers the simulation loop only: the run's result frames are built
+      from the spilled chunks at finalize, so a run that spilled reaches roughly the
+      same peak there. Spilling bounds memory while bars are simulated, not end to end.
+    """
+    def __init__(self, budget_mb: Optional[float] = None, spill_frac: float = 0.8,
+                 trace: bool = False, top_n: int = 5, check_every: int = 1000,
+                 spill_dir: str = 'artifacts/spill'):
+        self.budget = budget_mb * MB if budget_mb else None
+        self.spill_frac = spill_frac
+        self.trace = trace
+        self.top_n = top_n
+        self.check_every = max(1, check_every)
+        self.spill_dir = spill_dir
+        self.spills = 0
+        self._spill_rss = None   # RSS right after the last spill
+        self.rows: List[dict] = []
+        self._started_trace = False
+        self._open = None
+
+    def start(self):
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_trace = True
+
+    def stop(self):
+        self.end()
+        if self._started_trace:
+            tracemalloc.stop()
+            self._started_trace = False
+
+    def begin(self, name: str):
+        """Open a stage (closing any open one)."""
+        self.end()
+        self._open = (name, current_rss_bytes(), None)
+        if self.trace and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._open = (name, self._open[1], tracemalloc.take_snapshot())
+
+    def end(self):
+        if self._open is None:
+            return
+        name, rss0, snap0 = self._open
+        self._open = None
+        row = {'stage': name, 'rss_before_mb': rss0 / MB, 'rss_after_mb': current_rss_bytes() / MB,
+               'peak_rss_mb': peak_rss_bytes() / MB}
+        if snap0 is not None:
+            row['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / MB
+            diff = tracemalloc.take_snapshot().compare_to(snap0, 'lineno')[:self.top_n]
+            row['top_allocations'] = "; ".join(
+                f"{s.traceback[0].filename.rsplit(os.sep, 1)[-1]}:{s.traceback[0].lineno} "
+                f"{s.size_diff / MB:+.1f}MB" for s in diff)
+        self.rows.append(row)
+
+    @contextmanager
+    def stage(self, name: str):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def should_spill(self) -> bool:
+        if self.budget is None:
+            return False
+        rss = current_rss_bytes()
+        if rss < self.spill_frac * self.budget:
+            return False
+        return self._spill_rss is None or rss > self._spill_rss
+
+    def mark_spill(self):
+        """Count a spill and remember the RSS it left behind (see should_spill)."""
+        self.spills += 1
+        self._spill_rss = current_rss_bytes()
+
+    def check(self, where: str = ''):
+        if self.budget is not None:
+            rss = current_rss_bytes()
+            if rss > self.budget:
+                raise MemoryBudgetExceeded(
+                    f"RSS {rss / MB:.0f}MB over budget {self.budget / MB:.0f}MB at {where or 'unknown stage'} "
+                    f"after {self.spills} spills")
+
+    def report(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows)
+
+    def save(self, out_dir: str):
+        os.makedirs(out_dir, exist_ok=True)
+        self.report().to_csv(os.path.join(out_dir, 'memory_report.csv'), index=False)
+
+class RecordSpool:
+    """
+    Per-bar log / per-trade record buffers that can be moved to disk.
+    spill() writes the buffered dicts as one pickled DataFrame chunk and clears them;
+    frame() concatenates every chunk with whatever is still buffered.
+    """
+    def __init__(self, spill_dir: str, name: str):
+        self.spill_dir = spill_dir
+        self.name = name
+        self.chunks: List[str] = []
+        self.sizes: List[int] = []
+
+    def spill(self, records: list):
+        if not records:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir,
+                            f"{self.name}_{os.getpid()}_{id(self):x}_{len(self.chunks):05d}.pkl")
+        pd.DataFrame(records).to_pickle(path)
+        self.chunks.append(path)
+        self.sizes.append(len(records))
+        records.clear()
+
+    @property
+    def rows(self) -> int:
+        return sum(self.sizes)
+
+    def frame(self, records: list, start: int = 0) -> pd.DataFrame:
+        """Rows from position `start` on; chunks wholly before it are not read."""
+        parts, pos = [], 0
+        for p, n in zip(self.chunks, self.sizes):
+            if pos + n > start:
+                parts.append(pd.read_pickle(p).iloc[max(0, start - pos):])
+            pos += n
+        if records and len(records) > start - pos:
+            parts.append(pd.DataFrame(records[max(0, start - pos):]))
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+
+    def cleanup(self):
+        for p in self.chunks:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        self.chunks = []
+        self.sizes = []
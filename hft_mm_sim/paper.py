@@ -0,0 +1,200 @@
+import asyncio, json, math
+from time import perf_counter_ns
+import numpy as np
+import pandas as pd
+from .config import MMConfig
+from .stepper import BarStepper
+
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# ---------------------------------------------------------------------------
+# wire format: one JSON object per line, {"time": ISO-8601, "open": .., ..., "volume": ..};
+# the stream ends when the server closes the connection
+# ---------------------------------------------------------------------------
+def encode_bar(t, row) -> bytes:
+    msg = {'time': pd.Timestamp(t).isoformat()}
+    msg.update({k: float(row[k]) for k in BAR_FIELDS})
+    return (json.dumps(msg) + '\n').encode()
+
+def decode_bar(line: bytes) -> dict:
+    msg = json.loads(line)
+    bar = {k: float(msg[k]) for k in BAR_FIELDS}
+    bar['time'] = pd.Timestamp(msg['time'])
+    return bar
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (10 buckets per decade, 1us .. 100s) with percentiles."""
+    def __init__(self, lo_us: float = 1.0, hi_us: float = 1e8, per_decade: int = 10):
+        n = int(round(math.log10(hi_us / lo_us) * per_decade))
+        self.edges_us = lo_us * 10.0 ** (np.arange(n + 1) / per_decade)
+        self.counts = np.zeros(n + 2, dtype=np.int64)  # [underflow, buckets..., overflow]
+        self.n = 0
+        self.max_us = 0.0
+        self.sum_us = 0.0
+
+    def add_ns(self, ns: int):
+        us = ns / 1e3
+        self.counts[int(np.searchsorted(self.edges_us, us, side='right'))] += 1
+        self.n += 1
+        self.sum_us += us
+        self.max_us = max(self.max_us, us)
+
+    def percentile(self, q: float) -> float:
+        """Upper bucket edge (us) below which q% of samples fall."""
+        if self.n == 0:
+            return float('nan')
+        k = int(np.searchsorted(np.cumsum(self.counts), math.ceil(self.n * q / 100.0)))
+        if k == 0:
+            return float(self.edges_us[0])
+        return float(self.edges_us[k]) if k < len(self.edges_us) else self.max_us
+
+    def summary(self) -> dict:
+        return {'count': self.n, 'mean_us': self.sum_us / self.n if self.n else float('nan'),
+                'p50_us': self.percentile(50), 'p90_us': self.percentile(90),
+                'p99_us': self.percentile(99), 'max_us': self.max_us}
+
+    def to_frame(self) -> pd.DataFrame:
+        lo = np.concatenate([[0.0], self.edges_us])
+        hi = np.concatenate([self.edges_us, [np.inf]])
+        df = pd.DataFrame({'lo_us': lo, 'hi_us': hi, 'count': self.counts})
+        return df[df['count'] > 0].reset_index(drop=True)
+
+# ---------------------------------------------------------------------------
+# local replay feed
+# ---------------------------------------------------------------------------
+class ReplayServer:
+    """
+    Streams recorded bars to every client that connects, pacing them at `speed` x the
+    recorded bar spacing (speed=0: as fast as the client reads).
+    """
+    def __init__(self, df: pd.DataFrame, host: str = '127.0.0.1', port: int = 0, speed: float = 60.0):
+        self.df = df
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self._server = None
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        idx = self.df.index
+        rows = self.df[list(BAR_FIELDS)].to_numpy(dtype=float)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        try:
+            for i in range(len(rows)):
+                if self.speed > 0 and i > 0:
+                    due = t0 + (idx[i] - idx[0]).total_seconds() / self.speed
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                writer.write(encode_bar(idx[i], dict(zip(BAR_FIELDS, rows[i]))))
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+# ---------------------------------------------------------------------------
+# paper trader
+# ---------------------------------------------------------------------------
+class PaperTrader(BarStepper):
+    """
+    Live (paper) driver: a BarStepper fed one bar at a time from a socket.
+
+    Two coroutines share an asyncio.Queue: the reader only parses lines and stamps
+    their arrival time, so a slow or bursty feed never sits in the quoting path; the
+    quoter steps the engine (settle the previous bar, quote the new one). A replayed
+    stream therefore reproduces the offline Backtester run.
+
+    Latency is measured from arrival of a bar to its quotes being decided
+    (tick_to_quote), split into arrival -> dequeue (queue_wait) and dequeue -> quotes
+    (compute). A bar that has already waited longer than latency_budget_ms is settled
+    but not quoted (reason 'stale'), so a backlog is drained instead of quoting on
+    old prices.
+    """
+    def __init__(self, cfg: MMConfig, latency_budget_ms: float = 50.0, **kw):
+        super().__init__(cfg, **kw)
+        self.latency_budget_ns = int(latency_budget_ms * 1e6)
+        self.tick_to_quote = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+        self.compute = LatencyHistogram()
+        self.budget_misses = 0
+        self.stale_bars = 0
+
+    def on_bar(self, bar: dict, recv_ns: int):
+        stale = perf_counter_ns() - recv_ns > self.latency_budget_ns
+        self.step(bar, block='stale' if stale else None)
+        took = perf_counter_ns() - recv_ns
+        self.tick_to_quote.add_ns(took)
+        if stale:
+            self.stale_bars += 1
+        elif took > self.latency_budget_ns:
+            self.budget_misses += 1
+
+    async def _read(self, reader: asyncio.StreamReader, queue: asyncio.Queue):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    await queue.put((decode_bar(line), perf_counter_ns()))
+        finally:
+            await queue.put(None)
+
+    async def _quote_loop(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            bar, recv_ns = item
+            t_deq = perf_counter_ns()
+            self.queue_wait.add_ns(t_deq - recv_ns)
+            self.on_bar(bar, recv_ns)
+            self.compute.add_ns(perf_counter_ns() - t_deq)
+
+    async def run_stream(self, host: str, port: int) -> dict:
+        """Consume the feed at host:port until it closes; returns the usual logs/trades/costs."""
+        reader, writer = await asyncio.open_connection(host, port)
+        queue: asyncio.Queue = asyncio.Queue()
+        try:
+            await asyncio.gather(self._read(reader, queue), self._quote_loop(queue))
+        finally:
+            writer.close()
+        return self._finalize()
+
+    def latency_report(self) -> pd.DataFrame:
+        rows = [{'metric': name, **getattr(self, name).summary()}
+                for name in ('tick_to_quote', 'queue_wait', 'compute')]
+        out = pd.DataFrame(rows)
+        out['budget_ms'] = self.latency_budget_ns / 1e6
+        out['budget_misses'] = self.budget_misses
+        out['stale_bars'] = self.stale_bars
+        return out
+
+async def paper_trade_replay(cfg: MMConfig, df: pd.DataFrame, speed: float = 0.0,
+                             latency_budget_ms: float = 50.0):
+    """Run a PaperTrader against an in-process ReplayServer streaming `df`; returns (trader, results)."""
+    server = ReplayServer(df, speed=speed)
+    port = await server.start()
+    trader = PaperTrader(cfg, latency_budget_ms=latency_budget_ms)
+    try:
+        res = await trader.run_stream('127.0.0.1', port)
+    finally:
+        await server.close()
+    return trader, res
@@ -0,0 +1,196 @@
+import heapq, itertools
+import multiprocessing as mp
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from .config import MMConfig
+from .risk import PortfolioRiskManager
+from .stepper import BarStepper
+
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+def merge_bars(data: Dict[str, pd.DataFrame]) -> Iterator[tuple]:
+    """
+    k-way merge of per-symbol bar frames into one time-ordered stream of
+    (time, [(symbol, bar dict), ...]) groups; ties keep the symbol order of `data`.
+    """
+    def stream(rank, sym, df):
+        times = df.index
+        vals = df[list(BAR_FIELDS)].to_numpy(dtype=float)
+        for t, v in zip(times, vals):
+            bar = dict(zip(BAR_FIELDS, v.tolist()))
+            bar['time'] = t
+            yield t, rank, sym, bar
+    merged = heapq.merge(*(stream(r, s, df) for r, (s, df) in enumerate(data.items())))
+    for t, grp in itertools.groupby(merged, key=lambda e: e[0]):
+        yield t, [(sym, bar) for _, _, sym, bar in grp]
+
+class _Shard:
+    """The symbols owned by one worker: one BarStepper each."""
+    def __init__(self, cfgs: Dict[str, MMConfig]):
+        self.engines = {s: BarStepper(c) for s, c in cfgs.items()}
+
+    def step(self, blocks: List[tuple]) -> Dict[str, tuple]:
+        """blocks: [(block_reason, [(symbol, bar), ...]), ...] -> {symbol: (inventory, cash)}."""
+        touched = {}
+        for block, events in blocks:
+            for sym, bar in events:
+                eng = self.engines[sym]
+                eng.step(bar, block=block)
+                touched[sym] = eng
+        return {s: (e.inventory, e.cash) for s, e in touched.items()}
+
+    def results(self) -> Dict[str, dict]:
+        return {s: e.results() for s, e in self.engines.items()}
+
+def _worker(conn, cfgs):
+    shard = _Shard(cfgs)
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            conn.send(shard.results())
+            conn.close()
+            return
+        conn.send(shard.step(msg))
+
+class PortfolioBacktester:
+    """
+    Many symbols, one book. Bars of all symbols are k-way merged by time; each symbol
+    runs its own strategy/execution (a BarStepper, so per-symbol logs match a solo
+    Backtester run while the portfolio gate is open), and a PortfolioRiskManager sees
+    the aggregate position before every step.
+
+    Symbols are sharded over `processes` worker processes (0 = in-process). Workers
+    only exchange per-symbol (inventory, cash) with the coordinator, which marks the
+    book with the latest prices and decides the gate. With risk_every=k the gate is
+    re-evaluated every k timestamps and bars are shipped to workers in blocks of k,
+    trading gate freshness for fewer round trips; risk_every=1 gates every timestamp.
+    The portfolio log has one row per gate evaluation.
+    """
+    def __init__(self, cfgs, symbols: Optional[List[str]] = None,
+                 risk: Optional[PortfolioRiskManager] = None, processes: int = 0, risk_every: int = 1):
+        if isinstance(cfgs, MMConfig):
+            if not symbols:
+                raise ValueError("symbols are required with a single shared MMConfig")
+            cfgs = {s: cfgs for s in symbols}
+        self.cfgs: Dict[str, MMConfig] = dict(cfgs)
+        self.risk = risk or PortfolioRiskManager()
+        self.processes = processes
+        self.risk_every = max(1, risk_every)
+
+    def _shards(self, symbols: List[str]) -> List[List[str]]:
+        k = max(1, min(self.processes or 1, len(symbols)))
+        return [symbols[i::k] for i in range(k)]
+
+    def run(self, data: Dict[str, pd.DataFrame]) -> dict:
+        missing = set(data) - set(self.cfgs)
+        if missing:
+            raise ValueError(f"No config for symbols: {sorted(missing)}")
+        data = {s: df.dropna(subset=list(BAR_FIELDS)) for s, df in data.items()}
+        symbols = list(data)
+        shards = self._shards(symbols)
+        owner = {s: i for i, shard in enumerate(shards) for s in shard}
+
+        procs, conns, local = [], [], None
+        if self.processes:
+            ctx = mp.get_context()
+            for shard in shards:
+                parent, child = ctx.Pipe()
+                p = ctx.Process(target=_worker, args=(child, {s: self.cfgs[s] for s in shard}), daemon=True)
+                p.start()
+                child.close()
+                procs.append(p)
+                conns.append(parent)
+        else:
+            local = _Shard({s: self.cfgs[s] for s in symbols})
+
+        inv = dict.fromkeys(symbols, 0.0)
+        cash = dict.fromkeys(symbols, 0.0)
+        last_px = dict.fromkeys(symbols, np.nan)
+        rows = []
+        ref = {s: (self.cfgs[s].ref_price if self.cfgs[s].ref_price in BAR_FIELDS else 'close') for s in symbols}
+
+        def mark(events):
+            for sym, bar in events:
+                last_px[sym] = bar[ref[sym]]
+
+        def book(t, reason):
+            px = np.array([last_px[s] for s in symbols])
+            q = np.array([inv[s] for s in symbols])
+            live = ~np.isnan(px)
+            notional = q[live] * px[live]
+            equity = sum(cash.values()) + float(notional.sum())
+            return {'time': t, 'gross_notional': float(np.abs(notional).sum()),
+                    'net_notional': float(notional.sum()), 'cash': sum(cash.values()),
+                    'equity': equity, 'reason': reason or 'ok'}
+
+        def dispatch(blocks):
+            per_shard = [[] for _ in shards]
+            for block, events in blocks:
+                split = [[] for _ in shards]
+                for sym, bar in events:
+                    split[owner[sym]].append((sym, bar))
+                for i, ev in enumerate(split):
+                    if ev:
+                        per_shard[i].append((block, ev))
+            if local is not None:
+                states = local.step([b for part in per_shard for b in part])
+            else:
+                busy = [i for i, part in enumerate(per_shard) if part]
+                for i in busy:
+                    conns[i].send(per_shard[i])
+                states = {}
+                for i in busy:
+                    states.update(conns[i].recv())
+            for s, (q, c) in states.items():
+                inv[s], cash[s] = q, c
+
+        try:
+            stream = merge_bars(data)
+            while True:
+                chunk = list(itertools.islice(stream, self.risk_every))
+                if not chunk:
+                    break
+                # gate on positions marked at the block's first prices, then ship the block
+                mark(chunk[0][1])
+                pre = book(chunk[0][0], None)
+                block = self.risk.check(pre['gross_notional'], pre['net_notional'], pre['equity'])
+                reason = None if block is None else f"portfolio_{block}"
+                dispatch([(reason, events) for _, events in chunk])
+                for _, events in chunk[1:]:
+                    mark(events)
+                rows.append(book(chunk[-1][0], reason))
+            if local is not None:
+                per_symbol = local.results()
+            else:
+                per_symbol = {}
+                for c in conns:
+                    c.send(None)
+                for c in conns:
+                    per_symbol.update(c.recv())
+                per_symbol = {s: per_symbol[s] for s in symbols}
+        finally:
+            for p in procs:
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.terminate()
+
+        logs = pd.DataFrame(rows)
+        if not logs.empty:
+            logs = logs.set_index('time')
+        return {'logs': logs, 'symbols': per_symbol,
+                'breakdown': self.breakdown(per_symbol), 'risk_blocks': dict(self.risk.blocks)}
+
+    @staticmethod
+    def breakdown(per_symbol: Dict[str, dict]) -> pd.DataFrame:
+        out = []
+        for s, res in per_symbol.items():
+            logs, trades = res['logs'], res['trades']
+            last = logs.iloc[-1] if len(logs) else None
+            out.append({'symbol': s, 'bars': len(logs), 'trades': len(trades),
+                        'fees': float(trades['fee'].sum()) if len(trades) else 0.0,
+                        'final_inventory': float(last['inventory']) if last is not None else 0.0,
+                        'final_equity': float(last['equity']) if last is not None else 0.0,
+                        'blocked_bars': int(logs['reason'].astype(str).str.startswith('portfolio_').sum())
+                                        if len(logs) else 0})
+        return pd.DataFrame(out)
@@ -0,0 +1,69 @@
+import json, os
+from collections import defaultdict
+from time import perf_counter
+import pandas as pd
+
+class StageProfiler:
+    """
+    Opt-in per-stage timers and event counters for a backtest.
+
+    Stages are ';'-separated paths (e.g. 'run;bar;lob;market_orders') so nested time can
+    be exported as folded stacks for flamegraph tools. Call sites do
+        t0 = perf_counter(); ...; prof.add('run;bar;risk', t0)
+    and guard with `if prof is not None`, so a disabled profiler costs one None check.
+    """
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def add(self, stage: str, t0: float) -> float:
+        """Charge perf_counter() - t0 to `stage`; returns the current time for chaining."""
+        now = perf_counter()
+        self.seconds[stage] += now - t0
+        self.calls[stage] += 1
+        return now
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def _self_seconds(self) -> dict:
+        # charge each stage's time off its nearest recorded ancestor
+        out = dict(self.seconds)
+        for stage, s in self.seconds.items():
+            parent = stage.rpartition(';')[0]
+            while parent and parent not in out:
+                parent = parent.rpartition(';')[0]
+            if parent:
+                out[parent] -= s
+        return out
+
+    def report(self) -> pd.DataFrame:
+        total = self.seconds.get('run', 0.0) or sum(self.seconds.values())
+        own = self._self_seconds()
+        rows = [{'stage': st, 'calls': self.calls[st], 'total_s': s, 'self_s': own[st],
+                 'pct_of_run': 100.0 * s / total if total else 0.0,
+                 'us_per_call': 1e6 * s / max(1, self.calls[st])}
+                for st, s in sorted(self.seconds.items())]
+        return pd.DataFrame(rows, columns=['stage', 'calls', 'total_s', 'self_s', 'pct_of_run', 'us_per_call'])
+
+    def to_text(self) -> str:
+        lines = [f"{'stage':<36}{'calls':>10}{'total_s':>11}{'self_s':>10}{'%run':>7}{'us/call':>10}"]
+        for r in self.report().itertuples(index=False):
+            lines.append(f"{r.stage:<36}{r.calls:>10}{r.total_s:>11.4f}{r.self_s:>10.4f}"
+                         f"{r.pct_of_run:>7.1f}{r.us_per_call:>10.2f}")
+        lines.append("counters: " + ", ".join(f"{k}={v}" for k, v in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+    def save(self, out_dir: str):
+        """Write profile.csv, profile.json (stages + counters) and profile.folded (flamegraph.pl input)."""
+        os.makedirs(out_dir, exist_ok=True)
+        rep = self.report()
+        rep.to_csv(os.path.join(out_dir, 'profile.csv'), index=False)
+        with open(os.path.join(out_dir, 'profile.json'), 'w') as f:
+            json.dump({'stages': rep.to_dict('records'), 'counters': dict(self.counters)}, f, indent=2)
+        with open(os.path.join(out_dir, 'profile.folded'), 'w') as f:
+            for stage, s in sorted(self._self_seconds().items()):
+                us = int(round(s * 1e6))
+                if us > 0:
+                    f.write(f"{stage} {us}\n")
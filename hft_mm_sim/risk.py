@@ -1,29 +1,211 @@
+from collections import deque
+from typing import List, Optional, Sequence
+import numpy as np
+
+class RiskRule:
+    """
+    One composable pre-trade check. Rules keep O(1) incremental state:
+    - observe(equity, bar_i): called every bar before any check, even when an earlier
+      rule blocks (running peaks etc. must not skip bars).
+    - blocks(...): True when new quotes are not allowed this bar.
+    - on_fills(n): called after each bar's fills are booked.
+    Rules with `static = True` depend only on the bar's features; batch(vol) evaluates
+    them for a whole frame at once (RiskManager.pregate).
+    """
+    name = 'rule'
+    static = False
+
+    def observe(self, equity: float, bar_i: Optional[int]):
+        pass
+
+    def blocks(self, inventory: float, vol: float, equity: float, price: Optional[float], bar_i: Optional[int]) -> bool:
+        raise NotImplementedError
+
+    def on_fills(self, n_fills: int):
+        pass
+
+    def batch(self, vol: np.ndarray) -> np.ndarray:
+        raise NotImplementedError(f"{self.name} is not a static rule")
+
+class VolBrake(RiskRule):
+    """No quotes while rolling vol (per-bar return std) is above max_vol."""
+    name = 'vol_brake'
+    static = True
+
+    def __init__(self, max_vol: float):
+        self.max_vol = max_vol
+
+    def blocks(self, inventory, vol, equity, price, bar_i):
+        return vol is not None and vol > self.max_vol
+
+    def batch(self, vol):
+        return np.asarray(vol, dtype=float) > self.max_vol
+
+class InventoryCap(RiskRule):
+    name = 'inventory_cap'
+
+    def __init__(self, cap: float):
+        self.cap = cap
+
+    def blocks(self, inventory, vol, equity, price, bar_i):
+        return abs(inventory) >= self.cap
+
+class DrawdownStop(RiskRule):
+    """
+    Account value below (1 - dd_stop) x its running peak, once warmup_bars bars have
+    passed. The engine's equity is PnL (it starts at 0), so the account value is
+    capital + equity; the peak starts at the first value observed.
+    """
+    name = 'drawdown'
+
+    def __init__(self, dd_stop: float, warmup_bars: int = 0, capital: float = 100.0):
+        self.dd_stop = dd_stop
+        self.warmup_bars = warmup_bars
+        self.capital = capital
+        self.equity_peak = None
+
+    def observe(self, equity, bar_i):
+        if equity is None:
+            return
+        value = self.capital + equity
+        if self.equity_peak is None or value > self.equity_peak:
+            self.equity_peak = float(value)
+
+    def blocks(self, inventory, vol, equity, price, bar_i):
+        if bar_i is not None and bar_i < self.warmup_bars:
+            return False
+        return self.capital + equity < self.equity_peak * (1.0 - self.dd_stop)
+
+class NotionalLimit(RiskRule):
+    """|inventory x price| at or above max_notional (quote currency)."""
+    name = 'notional'
+
+    def __init__(self, max_notional: float):
+        self.max_notional = max_notional
+
+    def blocks(self, inventory, vol, equity, price, bar_i):
+        return price is not None and abs(inventory * price) >= self.max_notional
+
+class FillRateThrottle(RiskRule):
+    """At most max_fills fills over the last window_bars bars (running sum over a ring)."""
+    name = 'fill_rate'
+
+    def __init__(self, max_fills: int, window_bars: int):
+        self.max_fills = max_fills
+        self.window = deque([0] * max(1, window_bars), maxlen=max(1, window_bars))
+        self.total = 0
+
+    def on_fills(self, n_fills):
+        self.total += n_fills - self.window[0]
+        self.window.append(n_fills)
+
+    def blocks(self, inventory, vol, equity, price, bar_i):
+        return self.total >= self.max_fills
+
+def default_rules(cfg) -> List[RiskRule]:
+    """The config's rule chain: vol brake, inventory cap, drawdown stop, then the optional limits."""
+    rules = [VolBrake(cfg.vol_brake_mult * 1e-3), InventoryCap(cfg.inv_cap),
+             DrawdownStop(cfg.dd_stop, cfg.dd_warmup_bars, cfg.dd_capital)]
+    if cfg.max_notional > 0:
+        rules.append(NotionalLimit(cfg.max_notional))
+    if cfg.max_fills > 0:
+        rules.append(FillRateThrottle(cfg.max_fills, cfg.fill_window_bars))
+    return rules
+
 class RiskManager:
-    def __init__(self, cfg):
+    """
+    Ordered chain of RiskRules; the first rule that blocks a bar is charged for it in
+    `blocks` (per-rule counters) and named in `last_block`. pregate() evaluates the
+    leading static rules for a whole frame so the engine can skip their per-bar checks.
+    """
+    def __init__(self, cfg, rules: Optional[Sequence[RiskRule]] = None):
         self.cfg = cfg
-        self.equity_peak = 100.0
-    def update_equity(self, equity: float):
-            if equity is None:
-                return
-            if self.equity_peak is None or equity > self.equity_peak:
-                self.equity_peak = equity
+        self.rules = list(default_rules(cfg) if rules is None else rules)
+        names = [r.name for r in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate risk rule names: {names}")
+        self.blocks = {n: 0 for n in names}
+        self.last_block = None
+        self._observers = [r for r in self.rules if type(r).observe is not RiskRule.observe]
+        self._fill_hooks = [r for r in self.rules if type(r).on_fills is not RiskRule.on_fills]
+        self._n_static = next((i for i, r in enumerate(self.rules) if not r.static), len(self.rules))
+
+    @property
+    def equity_peak(self) -> Optional[float]:
+        dd = next((r for r in self.rules if isinstance(r, DrawdownStop)), None)
+        return dd.equity_peak if dd is not None else None
 
-    def allow_new_orders(self, inventory: float, rolling_vol: float, equity: float, bar_i: int | None = None) -> bool:
-        # Update peak
+    def update_equity(self, equity: float):
         if equity is not None:
-            self.equity_peak = max(self.equity_peak, float(equity))
+            for r in self._observers:
+                r.observe(equity, None)
 
-        # Volatility brake
-        if rolling_vol is not None and rolling_vol > self.cfg.vol_brake_mult * 1e-3:
-            return False
+    def pregate(self, vol: np.ndarray) -> np.ndarray:
+        """
+        Per bar, the index of the leading static rule that blocks it, else -1. Only the
+        static prefix of the chain is evaluated, so counters match the per-bar path.
+        """
+        out = np.full(len(vol), -1, dtype=np.int64)
+        for k in range(self._n_static - 1, -1, -1):
+            out[self.rules[k].batch(vol)] = k
+        return out
 
-        # Inventory cap
-        if abs(inventory) >= self.cfg.inv_cap:
-            return False
+    def allow_new_orders(self, inventory: float, rolling_vol: float, equity: float, bar_i: int | None = None,
+                         price: float | None = None, blocked_by: int | None = None) -> bool:
+        """
+        True if no rule blocks new quotes. `blocked_by` is this bar's pregate() result:
+        the static rule that blocks it, or -1 when the static rules already passed (their
+        checks are skipped); None evaluates the whole chain.
+        """
+        for r in self._observers:
+            r.observe(equity, bar_i)
+        if blocked_by is not None and blocked_by >= 0:
+            rule = self.rules[blocked_by]
+        else:
+            rule = None
+            for r in self.rules[0 if blocked_by is None else self._n_static:]:
+                if r.blocks(inventory, rolling_vol, equity, price, bar_i):
+                    rule = r
+                    break
+        self.last_block = rule.name if rule is not None else None
+        if rule is None:
+            return True
+        self.blocks[rule.name] += 1
+        return False
+
+    def on_fills(self, fills):
+        """Feed one bar's fills (cancel-cost rows with qty 0 are not fills) to the rules that track them."""
+        if self._fill_hooks:
+            n = sum(1 for f in fills if f.qty > 0)
+            for r in self._fill_hooks:
+                r.on_fills(n)
 
-        # Drawdown stop (after warmup only)
-        if bar_i is None or bar_i >= self.warmup_bars:
-            if equity < self.equity_peak * (1.0 - self.cfg.dd_stop):
-                return False
+class PortfolioRiskManager:
+    """
+    Book-level gate over all symbols: blocks new quotes everywhere when gross or net
+    notional (sum of |inventory * price| / inventory * price) reaches its cap, or when
+    aggregate equity has fallen max_drawdown below its running peak. Caps are in quote
+    currency; None disables a check.
+    """
+    def __init__(self, max_gross_notional: float | None = None, max_net_notional: float | None = None,
+                 max_drawdown: float | None = None):
+        self.max_gross_notional = max_gross_notional
+        self.max_net_notional = max_net_notional
+        self.max_drawdown = max_drawdown
+        self.equity_peak = None
+        self.blocks = {'gross_notional': 0, 'net_notional': 0, 'drawdown': 0}
 
-        return True
+    def check(self, gross: float, net: float, equity: float) -> str | None:
+        """None if new orders are allowed, else the name of the limit that blocks them."""
+        if self.equity_peak is None or equity > self.equity_peak:
+            self.equity_peak = equity
+        reason = None
+        if self.max_gross_notional is not None and gross >= self.max_gross_notional:
+            reason = 'gross_notional'
+        elif self.max_net_notional is not None and abs(net) >= self.max_net_notional:
+            reason = 'net_notional'
+        elif self.max_drawdown is not None and self.equity_peak - equity > self.max_drawdown:
+            reason = 'drawdown'
+        if reason is not None:
+            self.blocks[reason] += 1
+        return reason
@@ -0,0 +1,309 @@
+import itertools, os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .config import MMConfig, config_from_dict, config_to_dict
+
+# ---------------------------------------------------------------------------
+# Shocks: pure transforms of a bar frame. Each works in log-price space on numpy
+# arrays and is located by fractions of the series, so one spec fits any dataset.
+# ---------------------------------------------------------------------------
+SHOCKS: Dict[str, Callable] = {}
+
+def register_shock(name: str):
+    """Class decorator: make a Shock selectable by name (scenario grids / stress_test CLI)."""
+    def deco(cls):
+        SHOCKS[name] = cls
+        cls.name = name
+        return cls
+    return deco
+
+def _window(n: int, start: float, end: float) -> slice:
+    i0 = int(np.clip(round(start * n), 0, n))
+    i1 = int(np.clip(round(end * n), i0, n))
+    return slice(i0, i1)
+
+class Shock:
+    """
+    apply(px, vol) -> None, in place on:
+      px  (n, 4) log prices, columns open/high/low/close
+      vol (n,)   volumes
+    The neutral parameter value of every shock leaves the bars unchanged.
+    """
+    def apply(self, px: np.ndarray, vol: np.ndarray):
+        raise NotImplementedError
+
+    def is_identity(self) -> bool:
+        return False
+
+@register_shock('vol')
+@dataclass(frozen=True)
+class VolMultiplier(Shock):
+    """Scale close-to-close returns and intrabar ranges by `mult` inside [start, end)."""
+    mult: float = 1.0
+    start: float = 0.0
+    end: float = 1.0
+
+    def is_identity(self):
+        return self.mult == 1.0
+
+    def apply(self, px, vol):
+        w = _window(len(px), self.start, self.end)
+        close = px[:, 3]
+        r = np.diff(close, prepend=close[0])
+        extra = np.zeros(len(px))
+        extra[w] = (self.mult - 1.0) * r[w]
+        shift = np.cumsum(extra)          # keeps returns after the window, level carried over
+        dev = px[w] - close[w, None]      # open/high/low relative to close
+        px += shift[:, None]
+        px[w] += (self.mult - 1.0) * dev
+
+@register_shock('gap')
+@dataclass(frozen=True)
+class PriceGap(Shock):
+    """Jump all prices by `pct` (e.g. -0.05) from bar `at` on; that bar opens at the gapped level."""
+    pct: float = 0.0
+    at: float = 0.5
+
+    def is_identity(self):
+        return self.pct == 0.0
+
+    def apply(self, px, vol):
+        i = _window(len(px), self.at, 1.0).start
+        px[i:] += np.log1p(self.pct)
+
+@register_shock('drought')
+@dataclass(frozen=True)
+class VolumeDrought(Shock):
+    """Multiply volume by `mult` (< 1 dries up liquidity) inside [start, end)."""
+    mult: float = 1.0
+    start: float = 0.0
+    end: float = 1.0
+
+    def is_identity(self):
+        return self.mult == 1.0
+
+    def apply(self, px, vol):
+        vol[_window(len(px), self.start, self.end)] *= self.mult
+
+@register_shock('spread')
+@dataclass(frozen=True)
+class SpreadBlowout(Shock):
+    """Widen intrabar ranges (open/high/low around close) by `mult` inside [start, end) without moving closes."""
+    mult: float = 1.0
+    start: float = 0.0
+    end: float = 1.0
+
+    def is_identity(self):
+        return self.mult == 1.0
+
+    def apply(self, px, vol):
+        w = _window(len(px), self.start, self.end)
+        px[w] += (self.mult - 1.0) * (px[w] - px[w, 3:4])
+
+@register_shock('crash')
+@dataclass(frozen=True)
+class FlashCrash(Shock):
+    """
+    Drop prices by `depth` (fraction) at bar `at`, then recover linearly over
+    `recover_bars`; volume in the crash window is multiplied by `volume_mult`.
+    """
+    depth: float = 0.0
+    at: float = 0.5
+    recover_bars: int = 30
+    volume_mult: float = 3.0
+
+    def is_identity(self):
+        return self.depth == 0.0
+
+    def apply(self, px, vol):
+        n = len(px)
+        i = _window(n, self.at, 1.0).start
+        if i >= n:
+            return
+        k = max(1, int(self.recover_bars))
+        shape = np.zeros(n)
+        seg = slice(i, min(n, i + k + 1))
+        shape[seg] = 1.0 - np.arange(seg.stop - seg.start) / k
+        px += np.log1p(-self.depth) * shape[:, None]
+        # the crash bar trades through the whole drop from the previous close
+        if i > 0:
+            px[i, 0] = px[i - 1, 3]
+            px[i, 1] = max(px[i, 1], px[i, 0])
+        vol[seg] *= self.volume_mult
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Scenario:
+    """A named set of shocks plus MMConfig overrides (frictions, risk knobs)."""
+    name: str
+    shocks: Tuple[Shock, ...] = ()
+    overrides: Tuple[Tuple[str, object], ...] = ()
+    params: Tuple[Tuple[str, object], ...] = ()   # grid coordinates, for reporting
+
+    def build(self, base: pd.DataFrame) -> pd.DataFrame:
+        """Shocked copy of `base` (OHLCV); the base frame is never modified."""
+        shocks = [s for s in self.shocks if not s.is_identity()]
+        if not shocks:
+            return base
+        px = np.log(base[['open', 'high', 'low', 'close']].to_numpy(dtype=float))
+        vol = base['volume'].to_numpy(dtype=float).copy()
+        for s in shocks:
+            s.apply(px, vol)
+        # shocks scale each bar's open/high/low around its close, so bars that were
+        # consistent (low <= open, close <= high) stay consistent; nothing else is repaired,
+        # keeping every scenario comparable with the unshocked run
+        px = np.exp(px)
+        return pd.DataFrame({'open': px[:, 0], 'high': px[:, 1], 'low': px[:, 2], 'close': px[:, 3],
+                             'volume': vol}, index=base.index)
+
+    def config(self, cfg: MMConfig) -> MMConfig:
+        if not self.overrides:
+            return cfg
+        d = config_to_dict(cfg)
+        d.update(dict(self.overrides))
+        return config_from_dict(d)
+
+def scenario_grid(axes: Dict[str, Iterable], fixed: Optional[Dict[str, Dict]] = None) -> Iterator[Scenario]:
+    """
+    Lazily yield the Cartesian product of `axes`, e.g.
+        {'vol.mult': [1, 2, 4], 'crash.depth': [0, 0.1], 'latency_sec': [0, 30]}
+    '<shock>.<field>' keys vary a shock parameter (other fields from `fixed[shock]` or
+    defaults); plain keys vary an MMConfig field. Nothing is materialised until a worker
+    builds the scenario.
+    """
+    fixed = fixed or {}
+    keys = list(axes)
+    cfg_fields = set(config_to_dict(MMConfig()))
+    for k in keys:
+        if '.' in k:
+            name, fld = k.split('.', 1)
+            if name not in SHOCKS:
+                raise ValueError(f"Unknown shock {name!r} (registered: {sorted(SHOCKS)})")
+            if fld not in {f.name for f in fields(SHOCKS[name])}:
+                raise ValueError(f"Shock {name!r} has no parameter {fld!r}")
+        elif k not in cfg_fields:
+            raise ValueError(f"Unknown MMConfig field {k!r} in scenario axes")
+    return _grid(axes, keys, fixed)
+
+def _grid(axes, keys, fixed) -> Iterator[Scenario]:
+    for values in itertools.product(*(list(axes[k]) for k in keys)):
+        shock_kw: Dict[str, dict] = {}
+        overrides = []
+        for k, v in zip(keys, values):
+            if '.' in k:
+                name, fld = k.split('.', 1)
+                shock_kw.setdefault(name, dict(fixed.get(name, {})))[fld] = v
+            else:
+                overrides.append((k, v))
+        shocks = tuple(SHOCKS[name](**kw) for name, kw in shock_kw.items())
+        params = tuple(zip(keys, values))
+        yield Scenario(name=','.join(f'{k}={v}' for k, v in params) or 'base',
+                       shocks=shocks, overrides=tuple(overrides), params=params)
+
+# ---------------------------------------------------------------------------
+# Parallel runner
+# ---------------------------------------------------------------------------
+_BASE = {}
+
+def _init_worker(base: pd.DataFrame, cfg: MMConfig):
+    # base bars are shipped once per worker, scenarios are small specs
+    _BASE['df'], _BASE['cfg'] = base, cfg
+
+def summarize_run(res: dict) -> dict:
+    from .analytics import compute_metrics
+    logs, trades = res['logs'], res['trades']
+    out = {'final_equity': np.nan, 'sharpe': np.nan, 'sortino': np.nan, 'max_drawdown': np.nan}
+    if len(logs):
+        out.update(compute_metrics(logs['equity'].astype(float)))
+        out['max_abs_inventory'] = float(logs['inventory'].abs().max())
+        out['blocked_frac'] = float((logs['reason'] == 'risk_block').mean())
+    out['trades'] = len(trades)
+    out['fees'] = float(trades['fee'].sum()) if len(trades) else 0.0
+    return out
+
+def run_scenario(sc: Scenario, base: Optional[pd.DataFrame] = None, cfg: Optional[MMConfig] = None) -> dict:
+    """Build one shocked dataset, backtest it, return its summary row (the dataset is dropped)."""
+    from .backtester import Backtester
+    base = _BASE['df'] if base is None else base
+    cfg = _BASE['cfg'] if cfg is None else cfg
+    df = sc.build(base)
+    row = {'scenario': sc.name, **dict(sc.params)}
+    row['close_min'] = float(df['close'].min())
+    row.update(summarize_run(Backtester(sc.config(cfg)).run(df)))
+    return row
+
+def run_scenarios(cfg: MMConfig, base: pd.DataFrame, scenarios: Iterable[Scenario],
+                  processes: int = 0, max_pending: Optional[int] = None) -> pd.DataFrame:
+    """
+    Backtest every scenario against `base`; one row per scenario, in input order.
+    processes=0 runs in-process. Workers receive the base bars once (pool initializer)
+    and build each shocked variant themselves; at most `max_pending` (default
+    2 x processes) scenarios are in flight, so a long generator is never expanded.
+    """
+    if not processes:
+        return pd.DataFrame([run_scenario(sc, base, cfg) for sc in scenarios])
+    max_pending = max_pending or 2 * processes
+    rows: Dict[int, dict] = {}
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(base, cfg)) as pool:
+        pending = {}
+        it = enumerate(scenarios)
+        for i, sc in it:
+            pending[pool.submit(run_scenario, sc)] = i
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    rows[pending.pop(f)] = f.result()
+        for f in list(pending):
+            rows[pending.pop(f)] = f.result()
+    return pd.DataFrame([rows[i] for i in sorted(rows)])
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+def save_scenario_report(results: pd.DataFrame, axes: List[str], out_dir: str,
+                         metric: str = 'final_equity', writer=None) -> List[str]:
+    """
+    Writes scenario_results (via `writer` if given), a heatmap of `metric` for every
+    pair of axes (averaged over the others; faceted by a third axis when there is
+    one) and scenario_report.md with the per-axis sensitivities and worst scenarios.
+    Returns the written figure paths.
+    """
+    from .analytics import save_heatmap, save_heatmap_facets
+    os.makedirs(out_dir, exist_ok=True)
+    if writer is not None:
+        writer.write('scenario_results', results)
+    else:
+        results.to_csv(os.path.join(out_dir, 'scenario_results.csv'), index=False)
+    axes = [a for a in axes if a in results.columns and results[a].nunique() > 1]
+    figs = []
+    plots_dir = os.path.join(out_dir, 'plots')
+    for x, y in itertools.combinations(axes, 2):
+        rest = [a for a in axes if a not in (x, y)]
+        path = os.path.join(plots_dir, f'heatmap_{metric}_{x}_{y}.png')
+        if rest and results[rest[0]].nunique() <= 6:
+            save_heatmap_facets(results, x, y, metric, rest[0], path)
+        else:
+            save_heatmap(results, x, y, metric, path)
+        figs.append(path)
+
+    lines = [f'# Scenario stress report ({len(results)} scenarios, metric: {metric})', '']
+    if axes:
+        lines += ['## Sensitivity (mean metric per axis value)', '']
+        for a in axes:
+            g = results.groupby(a)[metric].mean()
+            lines.append(f"- **{a}**: " + ', '.join(f'{k}: {v:.3f}' for k, v in g.items())
+                         + f" (range {g.max() - g.min():.3f})")
+        lines.append('')
+    cols = ['scenario', metric] + [c for c in ('max_drawdown', 'trades', 'max_abs_inventory') if c in results.columns]
+    worst = results.nsmallest(min(10, len(results)), metric)[cols]
+    lines += ['## Worst scenarios', '', '| ' + ' | '.join(cols) + ' |', '|' + '---|' * len(cols)]
+    lines += ['| ' + ' | '.join(f'{v:.4g}' if isinstance(v, float) else str(v) for v in r) + ' |'
+              for r in worst.itertuples(index=False)]
+    with open(os.path.join(out_dir, 'scenario_report.md'), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    return figs
@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .config import MMConfig
+from .backtester import Backtester
+from .risk import RiskManager
+
+def split_bounds(n_bars: int, k: int) -> List[Tuple[int, int]]:
+    """Split bar positions [0, n_bars-1) (the simulated bars) into k contiguous [start, end) ranges."""
+    k = max(1, min(k, n_bars - 1))
+    edges = np.linspace(0, n_bars - 1, k + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+def run_segment(cfg: MMConfig, df: pd.DataFrame, start: int, end: int, warmup_bars: int,
+                bar_offset: int = 0) -> dict:
+    """
+    Simulate bars [start, end) of df. The engine first runs `warmup_bars` bars before
+    `start` to warm the book, features and pending orders, then is flattened (zero
+    inventory and cash, fresh risk state, logs cleared) before the segment proper.
+    `bar_offset` is the global index of df's first row when df is a slice of the full
+    history, so bar-count risk rules (dd_warmup_bars) see the same bar numbers as a serial run.
+    """
+    w0 = max(0, start - warmup_bars)
+    bt = Backtester(cfg)
+    if start - w0 >= 2:
+        bt.run(df.iloc[w0:start + 1], first_bar=bar_offset + w0)
+        bt.inventory = 0.0
+        bt.cash = 0.0
+        bt.risk = RiskManager(cfg)
+        bt.logs, bt.trades, bt.costs = [], [], []
+        res = bt.extend(df.iloc[w0:end + 1])
+    else:
+        res = bt.run(df.iloc[start:end + 1], first_bar=bar_offset + start)
+    return res
+
+def _concat_rows(parts: List[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+    # empty segments are left out: pandas is deprecating their say in the result dtypes
+    parts = [p for p in parts if len(p)]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+
+def _stitch(results: List[dict], bounds: List[Tuple[int, int]], df: pd.DataFrame):
+    logs_parts, trade_parts, cost_parts, seg_rows = [], [], [], []
+    risk_blocks = {}
+    offset = 0.0
+    for (s, e), res in zip(bounds, results):
+        logs, trades = res['logs'].copy(), res['trades']
+        pnl = float(logs['equity'].iloc[-1]) if len(logs) else 0.0
+        seg_rows.append({'segment': len(seg_rows), 'start': df.index[s], 'end': df.index[e - 1],
+                         'bars': e - s, 'trades': len(trades), 'pnl': pnl,
+                         'end_inventory': float(logs['inventory'].iloc[-1]) if len(logs) else 0.0})
+        if len(logs):
+            # previous segments' PnL is banked as cash; their open inventory is dropped
+            logs['cash'] += offset
+            logs['equity'] += offset
+            logs['segment'] = seg_rows[-1]['segment']
+        logs_parts.append(logs)
+        trade_parts.append(trades)
+        cost_parts.append(res['costs'])
+        # the warm-up ran under a risk manager that was replaced, so these are segment bars only
+        for k, n in res['risk_blocks'].items():
+            risk_blocks[k] = risk_blocks.get(k, 0) + n
+        offset += pnl
+    logs = pd.concat(logs_parts) if logs_parts else pd.DataFrame()
+    trades = _concat_rows(trade_parts, ['time', 'side', 'price', 'qty', 'fee', 'liquidity'])
+    costs = _concat_rows(cost_parts, ['time', 'kind', 'cost'])
+    return logs, trades, costs, pd.DataFrame(seg_rows), risk_blocks
+
+def divergence_report(stitched: pd.DataFrame, serial: pd.DataFrame, n_trades: int, n_trades_serial: int) -> dict:
+    """How far the stitched approximation drifts from the serial run."""
+    a, b = stitched['equity'].align(serial['equity'], join='inner')
+    diff = a - b
+    pa, pb = a.diff().fillna(0.0), b.diff().fillna(0.0)
+    corr = float(np.corrcoef(pa, pb)[0, 1]) if pa.std() > 0 and pb.std() > 0 else float('nan')
+    return {'final_equity_stitched': float(a.iloc[-1]) if len(a) else 0.0,
+            'final_equity_serial': float(b.iloc[-1]) if len(b) else 0.0,
+            'final_equity_diff': float(diff.iloc[-1]) if len(diff) else 0.0,
+            'max_abs_equity_diff': float(diff.abs().max()) if len(diff) else 0.0,
+            'bar_pnl_corr': corr,
+            'trades_stitched': int(n_trades),
+            'trades_serial': int(n_trades_serial)}
+
+def run_segmented(cfg: MMConfig, df: pd.DataFrame, segments: int, warmup_bars: int = 500,
+                  processes: Optional[int] = None, compare_serial: bool = False) -> dict:
+    """
+    Approximate one long backtest by K independent segments run in parallel processes.
+    Returns logs/trades stitched into one run, a per-segment table, and (with
+    compare_serial=True) a divergence report against the exact serial run.
+    """
+    df = Backtester(cfg)._check_input(df)
+    if len(df) < 3:
+        return Backtester(cfg).run(df) | {'segments': pd.DataFrame(), 'divergence': None}
+    bounds = split_bounds(len(df), segments)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # ship each worker only its warm-up + segment slice, with offsets rebased onto it
+        futs = []
+        for s, e in bounds:
+            w0 = max(0, s - warmup_bars)
+            futs.append(pool.submit(run_segment, cfg, df.iloc[w0:e + 1], s - w0, e - w0, warmup_bars, w0))
+        # the serial reference runs here while the workers do, instead of pickling df once more
+        serial = Backtester(cfg).run(df) if compare_serial else None
+        results = [f.result() for f in futs]
+
+    logs, trades, costs, seg_table, risk_blocks = _stitch(results, bounds, df)
+    divergence = None
+    if serial is not None:
+        divergence = divergence_report(logs, serial['logs'], len(trades), len(serial['trades']))
+    return {'logs': logs, 'trades': trades, 'costs': costs, 'risk_blocks': risk_blocks,
+            'segments': seg_table, 'divergence': divergence}
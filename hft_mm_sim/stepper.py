@@ -0,0 +1,80 @@
+from .config import MMConfig
+from .backtester import Backtester
+from .features import OnlineFeatures
+
+class BarStepper(Backtester):
+    """
+    Bar-at-a-time engine for callers that receive bars one by one (paper trading,
+    portfolio runs). step(bar) settles the previous bar's quotes against the new bar
+    (fills, accounting, log row) and then quotes the new bar, in the same order as
+    Backtester.run, so stepping through a frame reproduces run() on it. Features come
+    from OnlineFeatures. `block` vetoes new quotes for the bar with that reason (an
+    outside risk gate or a stale bar); the bar is still settled and logged.
+    """
+    def __init__(self, cfg: MMConfig, **kw):
+        super().__init__(cfg, **kw)
+        self.features = OnlineFeatures(cfg.vol_lookback, cfg.mom_lookback)
+        self._prev = None   # (bar dict with features, bid, ask, reason, fills-from-LOB)
+        self._g = 0
+        self._compact_netted = {}
+
+    def _features(self, bar: dict) -> dict:
+        row = dict(bar)
+        row['mid'], row['vol'], row['mom'], row['mom_sign'] = self.features.update(bar['high'], bar['low'], bar['close'])
+        return row
+
+    def _quote(self, row: dict, block):
+        """Risk check + quotes for the bar just received (bar g)."""
+        t = row['time']
+        ref = self.cfg.ref_price if self.cfg.ref_price in row else 'close'
+        p_ref_now = float(row[ref])
+        equity_now = self.cash + self.inventory * p_ref_now
+        allowed = self.risk.allow_new_orders(self.inventory, row.get('vol', 0.0), equity_now, bar_i=self._g,
+                                             price=p_ref_now)
+        bid = ask = None
+        lob_fills = []
+        if not allowed or block is not None:
+            return bid, ask, (block if allowed else "risk_block"), lob_fills
+        if self.cfg.use_lob:
+            lob_fills = self.exec_lob.run_bar(t, row, mid=float(row.get('mid', p_ref_now)),
+                                              tick=self.cfg.tick_size, inventory=self.inventory,
+                                              bar_idx=self._g)
+            if self.exec_lob.book is not None:
+                bid, ask = float(self.exec_lob.book.best_bid()[0]), float(self.exec_lob.book.best_ask()[0])
+            reason = "lob_quote"
+        else:
+            q = self.strategy.quote(row['close'], row['mid'], row['vol'], row['mom_sign'], self.inventory)
+            bid, ask = q.bid, q.ask
+            self.exec.submit_quotes(self._g, q.bid, q.ask, q.size_bid, q.size_ask)
+            reason = q.reason
+        return bid, ask, reason, lob_fills
+
+    def _settle(self, next_row: dict):
+        """Fills and log row for the previous bar, now that its successor is known."""
+        row, bid, ask, reason, lob_fills = self._prev
+        t = row['time']
+        if self.cfg.use_lob:
+            fills = lob_fills
+        else:
+            fills = self.exec.process_bar(self._g, next_row['time'], row, next_row)
+        self._account_fills(fills, t, self.cfg.compact_ledger, self._compact_netted)
+        self.risk.on_fills(fills)
+        ref = self.cfg.ref_price if self.cfg.ref_price in row else 'close'
+        p_ref = float(row[ref])
+        self.logs.append({'time': t, 'price_ref': p_ref, 'mid': float(row.get('mid', p_ref)),
+                          'bid': float(bid) if bid is not None else float('nan'),
+                          'ask': float(ask) if ask is not None else float('nan'),
+                          'inventory': self.inventory, 'cash': self.cash,
+                          'equity': self.cash + self.inventory * p_ref, 'reason': reason})
+
+    def step(self, bar: dict, block=None) -> dict:
+        """Advance by one bar ({'time', 'open', 'high', 'low', 'close', 'volume'}); returns it with features."""
+        row = self._features(bar)
+        if self._prev is not None:
+            self._g += 1
+            self._settle(row)
+        self._prev = (row, *self._quote(row, block))
+        return row
+
+    def results(self) -> dict:
+        return self._finalize()
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
+from typing import Callable, Dict
 import math
+import numpy as np
 
 @dataclass
 class Quotes:
@@ -12,16 +14,67 @@ class Quotes:
 def round_to_tick(x: float, tick: float) -> float:
     return math.floor(x / tick) * tick
 
-class MarketMakerStrategy:
+# name -> strategy class; filled by @register_strategy
+STRATEGIES: Dict[str, Callable] = {}
+
+def register_strategy(name: str):
+    """Class decorator: make a Strategy subclass selectable by name (cfg.strategy / --strategy)."""
+    def deco(cls):
+        STRATEGIES[name] = cls
+        cls.name = name
+        return cls
+    return deco
+
+def make_strategy(cfg) -> "Strategy":
+    try:
+        cls = STRATEGIES[cfg.strategy]
+    except KeyError:
+        raise ValueError(f"Unknown strategy: {cfg.strategy!r} (registered: {sorted(STRATEGIES)})")
+    return cls(cfg)
+
+class Strategy:
+    """
+    Quoting strategy interface.
+    - quote(): one bar, plain floats in, Quotes out (used by the bar-by-bar engine).
+    - quote_batch(): aligned numpy arrays in, (bid, ask, size_bid, size_ask) arrays out.
+    Subclasses must implement quote(); the default quote_batch() loops over it, so override
+    it with a vectorized version when the strategy allows.
+    Strategies whose quotes do not depend on inventory set uses_inventory = False: the
+    OHLC engine then quotes every bar with one quote_batch() call up front (the log
+    reason is the strategy name). Otherwise fills feed back into the next bar's quote,
+    so the engine calls quote() bar by bar.
+    """
+    name = "base"
+    uses_inventory = True
+
     def __init__(self, cfg):
         self.cfg = cfg
 
+    def quote(self, price: float, mid: float, vol: float, mom_sign: float, inventory: float) -> Quotes:
+        raise NotImplementedError
+
+    def quote_batch(self, price, mid, vol, mom_sign, inventory):
+        n = len(price)
+        inventory = np.broadcast_to(np.asarray(inventory, dtype=float), (n,))
+        out = np.empty((4, n))
+        for i in range(n):
+            q = self.quote(float(price[i]), float(mid[i]), float(vol[i]), float(mom_sign[i]), float(inventory[i]))
+            out[:, i] = (q.bid, q.ask, q.size_bid, q.size_ask)
+        return out[0], out[1], out[2], out[3]
+
     def compute_quotes(self, row, inventory: float) -> Quotes:
+        """pandas-row adapter kept for existing callers."""
         price = float(row['close'])
-        mid = float(row.get('mid', price))
-        vol = float(row.get('vol', 0.0))  # unitless std of returns
-        mom_sign = float(row.get('mom_sign', 0.0))
+        return self.quote(price,
+                          float(row.get('mid', price)),
+                          float(row.get('vol', 0.0)),
+                          float(row.get('mom_sign', 0.0)),
+                          inventory)
 
+@register_strategy("market_maker")
+class MarketMakerStrategy(Strategy):
+    def quote(self, price: float, mid: float, vol: float, mom_sign: float, inventory: float) -> Quotes:
+        # vol is the unitless std of returns
         # Baseline half-spread scales with price * vol
         half_spread = max(self.cfg.tick_size, self.cfg.k_vol * price * vol)
 
@@ -44,3 +97,21 @@ class MarketMakerStrategy:
 
         reason = f"half={half_spread_adj:.6f}, skew={skew:.6f}, mom={mom_sign:.0f}"
         return Quotes(bid=bid, ask=ask, size_bid=size, size_ask=size, reason=reason)
+
+    def quote_batch(self, price, mid, vol, mom_sign, inventory):
+        cfg = self.cfg
+        price = np.asarray(price, dtype=float)
+        mid = np.asarray(mid, dtype=float)
+        mom_sign = np.asarray(mom_sign, dtype=float)
+        inventory = np.asarray(inventory, dtype=float)
+
+        half_spread = np.maximum(cfg.tick_size, cfg.k_vol * price * np.asarray(vol, dtype=float))
+        half_spread_adj = half_spread + np.abs(cfg.k_mom * mom_sign * half_spread)
+        skew = cfg.k_inv * inventory * cfg.tick_size * 10
+        bid = np.floor((mid - (half_spread_adj + np.maximum(0.0, skew))) / cfg.tick_size) * cfg.tick_size
+        ask = np.floor((mid + (half_spread_adj - np.minimum(0.0, skew))) / cfg.tick_size) * cfg.tick_size
+
+        inv_util = np.minimum(1.0, np.abs(inventory) / max(1e-9, cfg.inv_cap))
+        size = cfg.base_size * np.maximum(0.1, 1.0 - inv_util)
+        size = np.broadcast_to(size, bid.shape).astype(float)
+        return bid, ask, size, size.copy()
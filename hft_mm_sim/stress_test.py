@@ -1,59 +1,77 @@
-import argparse, os, itertools
-import pandas as pd
+import argparse, os
 from hft_mm_sim.config import MMConfig
-from hft_mm_sim.data import load_csv
-from hft_mm_sim.backtester import Backtester
-from hft_mm_sim.analytics import save_heatmap
+from hft_mm_sim.data import load_bars, synthetic_minute
+from hft_mm_sim.scenarios import SHOCKS, run_scenarios, save_scenario_report, scenario_grid
+
+# friction sweeps over the unchanged bars (fees/slippage in bps, latency in seconds)
+FRICTION_GRIDS = {
+    'fee_latency': {'fee_bps': [0, 3, 5, 7, 10], 'latency_sec': [0, 5, 15, 30, 60]},
+    'slip_latency': {'slippage_bps': [0, 1, 2, 3], 'latency_sec': [0, 5, 15, 30, 60]},
+}
+# default market-shock grid (neutral value first)
+SHOCK_AXES = {
+    'vol.mult': [1, 2, 4],
+    'gap.pct': [0, -0.05],
+    'drought.mult': [1, 0.2],
+    'spread.mult': [1, 3],
+    'crash.depth': [0, 0.05, 0.15],
+}
+
+def _value(s: str):
+    v = float(s)
+    return int(v) if v.is_integer() and '.' not in s else v
+
+def parse_axis(spec: str):
+    """'vol.mult=1,2,4' -> ('vol.mult', [1, 2, 4])."""
+    key, _, vals = spec.partition('=')
+    if not vals:
+        raise argparse.ArgumentTypeError(f"expected name=v1,v2,... got {spec!r}")
+    return key.strip(), [_value(v) for v in vals.split(',') if v.strip()]
 
 def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--csv", required=True)
+    ap = argparse.ArgumentParser(description="Friction and market-shock stress tests")
+    ap.add_argument("--csv", default="")
+    ap.add_argument("--catalog", default="")
+    ap.add_argument("--symbol", default="")
+    ap.add_argument("--start", default="")
+    ap.add_argument("--end", default="")
     ap.add_argument("--use_lob", action="store_true")
+    ap.add_argument("--mode", choices=["frictions", "shocks", "both"], default="both")
+    ap.add_argument("--axis", type=parse_axis, action="append", default=[],
+                    help=f"Shock/config axis, repeatable, e.g. --axis vol.mult=1,2,4 --axis latency_sec=0,30 "
+                         f"(shocks: {', '.join(sorted(SHOCKS))}); default: a {len(SHOCK_AXES)}-shock grid")
+    ap.add_argument("--processes", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                    help="Worker processes (0 = run in-process)")
+    ap.add_argument("--metric", default="final_equity")
     ap.add_argument("--outdir", default="artifacts")
     args = ap.parse_args()
 
+    df = load_bars(csv=args.csv, catalog=args.catalog, symbol=args.symbol,
+                   start=args.start or None, end=args.end or None)
+    if df is None:
+        print("[WARN] --csv/--catalog not provided or missing; using synthetic minute data.")
+        df = synthetic_minute(minutes=600, seed=42)
+    cfg = MMConfig(use_lob=args.use_lob)
     os.makedirs(args.outdir, exist_ok=True)
-    plots_dir = os.path.join(args.outdir, "plots")
-    os.makedirs(plots_dir, exist_ok=True)
-
-    df = load_csv(args.csv)
-
-    fees = [0, 3, 5, 7, 10]          # bps
-    lats = [0, 5, 15, 30, 60]        # seconds
-    slips = [0, 1, 2, 3]             # bps
-
-    rows = []
-    for fee, lat in itertools.product(fees, lats):
-        cfg = MMConfig(fee_bps=fee, latency_sec=lat, use_lob=args.use_lob)
-        bt = Backtester(cfg)
-        res = bt.run(df)
-        logs = res["logs"]
-        final_equity = logs["equity"].iloc[-1] if len(logs) else 0.0
-        rows.append({"fee_bps": fee, "latency_sec": lat, "final_equity": final_equity})
-
-    stress = pd.DataFrame(rows)
-    stress.to_csv(os.path.join(args.outdir, "stress_results.csv"), index=False)
-
-    # heatmap (fee vs latency)
-    piv = stress.pivot(index="latency_sec", columns="fee_bps", values="final_equity")
-    save_heatmap(piv, "Final Equity vs Fee/Latency", os.path.join(plots_dir, "heatmap_equity_fee_latency.png"),
-                 xlabel="fee_bps", ylabel="latency_sec")
-
-    # Optional: slippage sweep vs latency
-    rows2 = []
-    for slip, lat in itertools.product(slips, lats):
-        cfg = MMConfig(slippage_bps=slip, latency_sec=lat, use_lob=args.use_lob)
-        bt = Backtester(cfg)
-        res = bt.run(df)
-        logs = res["logs"]
-        final_equity = logs["equity"].iloc[-1] if len(logs) else 0.0
-        rows2.append({"slippage_bps": slip, "latency_sec": lat, "final_equity": final_equity})
-    stress2 = pd.DataFrame(rows2)
-    stress2.to_csv(os.path.join(args.outdir, "stress_results_slip.csv"), index=False)
-
-    piv2 = stress2.pivot(index="latency_sec", columns="slippage_bps", values="final_equity")
-    save_heatmap(piv2, "Final Equity vs Slippage/Latency", os.path.join(plots_dir, "heatmap_equity_slip_latency.png"),
-                 xlabel="slippage_bps", ylabel="latency_sec")
+
+    if args.mode in ("frictions", "both"):
+        plots_dir = os.path.join(args.outdir, "plots")
+        for name, axes in FRICTION_GRIDS.items():
+            res = run_scenarios(cfg, df, scenario_grid(axes), processes=args.processes)
+            res.to_csv(os.path.join(args.outdir, f"stress_{name}.csv"), index=False)
+            x, y = list(axes)
+            from hft_mm_sim.analytics import save_heatmap
+            save_heatmap(res, x, y, "final_equity", os.path.join(plots_dir, f"heatmap_equity_{name}.png"))
+            print(f"[INFO] {name}: {len(res)} runs -> stress_{name}.csv")
+
+    if args.mode in ("shocks", "both"):
+        axes = dict(args.axis) or SHOCK_AXES
+        res = run_scenarios(cfg, df, scenario_grid(axes), processes=args.processes)
+        out = os.path.join(args.outdir, "scenarios")
+        save_scenario_report(res, list(axes), out, metric=args.metric)
+        worst = res.nsmallest(5, args.metric)[["scenario", args.metric]]
+        print(f"[INFO] {len(res)} shock scenarios -> {out}/scenario_report.md; worst:")
+        print(worst.to_string(index=False))
 
 if __name__ == "__main__":
     main()
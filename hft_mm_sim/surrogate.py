@@ -0,0 +1,227 @@
+import json, math, os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .config import MMConfig
+from .execution import ExecutionSimulator
+from .execution_lob import ExecutionLOB, FillEx
+from .features import add_features
+from .lob import LimitOrderBook
+
+TABLE_VERSION = 1
+SIDES = ('buy', 'sell')
+STATS = ('fill_prob', 'fill_frac', 'depletion')
+
+def _backoff(sums: np.ndarray, counts: np.ndarray, min_count: int) -> np.ndarray:
+    """
+    sums/counts per (side, dist, vol_b, volume_b, mom) cell; cells with fewer than
+    min_count samples fall back to the (side, dist, mom) marginal, then to (side, dist).
+    """
+    def ratio(s, n):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n > 0, s / np.maximum(n, 1), np.nan)
+    full = ratio(sums, counts)
+    n1, s1 = counts.sum(axis=(2, 3), keepdims=True), sums.sum(axis=(2, 3), keepdims=True)
+    n2, s2 = counts.sum(axis=(2, 3, 4), keepdims=True), sums.sum(axis=(2, 3, 4), keepdims=True)
+    out = np.where(counts >= min_count, full,
+                   np.where(n1 >= min_count, ratio(s1, n1), ratio(s2, n2)))
+    return np.nan_to_num(np.broadcast_to(out, sums.shape), nan=0.0)
+
+class FillTable:
+    """
+    Per-bar fill statistics of a resting order, calibrated on the LOB simulator and keyed by
+    side x distance from mid (ticks, 1..max_ticks) x vol bucket x volume bucket x momentum
+    sign (-1/0/+1 at quote time):
+      fill_prob  P(any fill during the bar)
+      fill_frac  filled share of the order, given a fill
+      depletion  share of the queue ahead consumed during the bar
+    Orders farther than max_ticks from mid never fill (the ladder ends there).
+    """
+    def __init__(self, max_ticks: int, vol_edges, volume_edges, stats: Dict[str, np.ndarray],
+                 counts: np.ndarray, meta: Optional[dict] = None):
+        self.max_ticks = int(max_ticks)
+        self.vol_edges = np.asarray(vol_edges, dtype=float)
+        self.volume_edges = np.asarray(volume_edges, dtype=float)
+        self.stats = {k: np.asarray(v, dtype=float) for k, v in stats.items()}
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.meta = meta or {}
+
+    def cell(self, side: str, dist_ticks: float, vol: float, volume: float, mom_sign: float):
+        """Index tuple for a lookup, or None when the order is beyond the calibrated ladder."""
+        d = int(round(dist_ticks))
+        if d > self.max_ticks:
+            return None
+        vb = int(np.searchsorted(self.vol_edges, vol, side='right')) if vol == vol else 0
+        qb = int(np.searchsorted(self.volume_edges, volume, side='right')) if volume == volume else 0
+        m = 1 if mom_sign != mom_sign else int(np.sign(mom_sign)) + 1
+        return (0 if side == 'buy' else 1, max(1, d) - 1, vb, qb, m)
+
+    def lookup(self, side: str, dist_ticks: float, vol: float, volume: float, mom_sign: float) -> Tuple[float, float]:
+        """(fill_prob, fill_frac) for one resting order over the next bar."""
+        c = self.cell(side, dist_ticks, vol, volume, mom_sign)
+        if c is None:
+            return 0.0, 0.0
+        return float(self.stats['fill_prob'][c]), float(self.stats['fill_frac'][c])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-format view of the table (one row per cell) for inspection and reports."""
+        idx = pd.MultiIndex.from_product(
+            [list(SIDES), range(1, self.max_ticks + 1), range(len(self.vol_edges) + 1),
+             range(len(self.volume_edges) + 1), (-1, 0, 1)],
+            names=['side', 'dist_ticks', 'vol_bucket', 'volume_bucket', 'mom_sign'])
+        cols = {'n': self.counts.ravel()}
+        cols.update({k: v.ravel() for k, v in self.stats.items()})
+        return pd.DataFrame(cols, index=idx).reset_index()
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        doc = {'version': TABLE_VERSION, 'max_ticks': self.max_ticks,
+               'vol_edges': self.vol_edges.tolist(), 'volume_edges': self.volume_edges.tolist(),
+               'counts': self.counts.tolist(), 'stats': {k: v.tolist() for k, v in self.stats.items()},
+               'meta': self.meta}
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(doc, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "FillTable":
+        with open(path) as f:
+            doc = json.load(f)
+        if doc.get('version') != TABLE_VERSION:
+            raise ValueError(f"{path}: fill table version {doc.get('version')}, expected {TABLE_VERSION}")
+        return cls(doc['max_ticks'], doc['vol_edges'], doc['volume_edges'], doc['stats'],
+                   doc['counts'], doc.get('meta'))
+
+def _edges(x: np.ndarray, k: int) -> np.ndarray:
+    """Inner quantile edges splitting x into k buckets (fewer if x has ties)."""
+    x = x[np.isfinite(x)]
+    if k <= 1 or len(x) == 0:
+        return np.array([])
+    return np.unique(np.quantile(x, np.arange(1, k) / k))
+
+def probe_bar(cfg: MMConfig, ex: ExecutionLOB, volume: float, mom_sign: float, max_ticks: int) -> List[tuple]:
+    """
+    One bar of the LOB simulator against a fresh ladder with a probe order at each of
+    the first max_ticks levels per side (sized like our quotes). Returns
+    (side, dist_ticks, filled, fill_frac, depletion) per probe.
+    """
+    tick = cfg.tick_size
+    book = LimitOrderBook(100.0, tick, cfg.lob_levels, cfg.lob_base_depth, cfg.lob_depth_decay)
+    probes = []
+    for lvl in range(max_ticks):
+        size = cfg.base_size * (cfg.level_size_decay ** min(lvl, max(0, cfg.quote_levels - 1)))
+        for side, ladder in (('buy', book.bids), ('sell', book.asks)):
+            ro = book.place_limit(side, ladder[lvl][0], size)
+            probes.append((side, lvl + 1, ro, size, ro.queue_ahead))
+
+    latency_ticks = max(0, math.ceil(cfg.latency_sec / (60.0 / max(1, cfg.lob_ticks_per_bar))))
+    mean_per_tick = max(0.0, volume * cfg.mo_frac) / max(1, cfg.lob_ticks_per_bar)
+    if ex.flow is not None:
+        orders = ex._hawkes_orders(mean_per_tick, mom_sign, latency_ticks)
+    else:
+        orders = ex._uniform_orders(mean_per_tick, mom_sign, latency_ticks)
+    for _, side, q in orders:
+        book.process_market_order(side, q, t=0)
+
+    out = []
+    for side, dist, ro, size, q0 in probes:
+        frac = min(1.0, max(0.0, (size - ro.qty) / size))
+        depl = 1.0 if q0 <= 0 else min(1.0, max(0.0, (q0 - ro.queue_ahead) / q0))
+        out.append((side, dist, frac > 1e-12, frac, depl))
+    return out
+
+def calibrate_fill_table(cfg: MMConfig, df: pd.DataFrame, max_ticks: Optional[int] = None,
+                         vol_buckets: int = 4, volume_buckets: int = 4, min_count: int = 20,
+                         max_bars: Optional[int] = None) -> FillTable:
+    """
+    Run the LOB simulator offline over the bars of `df` (flow model, depth, latency and
+    quote sizes from cfg) and aggregate per-bar probe outcomes into a FillTable.
+    Every bar starts from a replenished ladder, so the table describes a freshly placed
+    quote; queue priority carried across bars is not modelled.
+    """
+    max_ticks = min(cfg.lob_levels, max_ticks or cfg.lob_levels)
+    feat = add_features(df, vol_lookback=cfg.vol_lookback, mom_lookback=cfg.mom_lookback)
+    feat = feat[feat['vol'] > 0]   # skip the vol warm-up
+    if max_bars is not None and len(feat) > max_bars:
+        feat = feat.iloc[np.linspace(0, len(feat) - 1, max_bars).round().astype(int)]
+    vol = feat['vol'].to_numpy(dtype=float)
+    volume = feat['volume'].to_numpy(dtype=float)
+    mom = np.nan_to_num(feat['mom_sign'].to_numpy(dtype=float))
+    vol_edges, volume_edges = _edges(vol, vol_buckets), _edges(volume, volume_buckets)
+    vb = np.searchsorted(vol_edges, vol, side='right')
+    qb = np.searchsorted(volume_edges, volume, side='right')
+    mb = np.sign(mom).astype(int) + 1
+
+    shape = (2, max_ticks, len(vol_edges) + 1, len(volume_edges) + 1, 3)
+    counts = np.zeros(shape, dtype=np.int64)
+    n_filled = np.zeros(shape, dtype=np.int64)
+    sums = {k: np.zeros(shape) for k in STATS}
+    ex = ExecutionLOB(cfg)   # rng + MO flow source, exactly as the LOB path uses them
+    for i in range(len(feat)):
+        for side, dist, filled, frac, depl in probe_bar(cfg, ex, volume[i], mom[i], max_ticks):
+            c = (SIDES.index(side), dist - 1, vb[i], qb[i], mb[i])
+            counts[c] += 1
+            n_filled[c] += filled
+            sums['fill_prob'][c] += filled
+            sums['fill_frac'][c] += frac
+            sums['depletion'][c] += depl
+    stats = {'fill_prob': _backoff(sums['fill_prob'], counts, min_count),
+             'fill_frac': _backoff(sums['fill_frac'], n_filled, min_count),
+             'depletion': _backoff(sums['depletion'], counts, min_count)}
+    meta = {'bars': int(len(feat)), 'min_count': min_count,
+            'cfg': {k: getattr(cfg, k) for k in ('tick_size', 'base_size', 'latency_sec', 'mo_frac', 'mo_flow',
+                                                  'lob_levels', 'lob_ticks_per_bar', 'lob_base_depth',
+                                                  'lob_depth_decay', 'quote_levels', 'level_size_decay')}}
+    return FillTable(max_ticks, vol_edges, volume_edges, stats, counts, meta)
+
+_TABLES: Dict[str, FillTable] = {}
+
+def load_fill_table(path: str) -> FillTable:
+    """FillTable from `path`, read once per process (sweeps build many Backtesters)."""
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    cached = _TABLES.get(key)
+    if cached is None or cached.meta.get('_mtime_ns') != st.st_mtime_ns:
+        cached = FillTable.load(key)
+        cached.meta['_mtime_ns'] = st.st_mtime_ns
+        _TABLES[key] = cached
+    return cached
+
+class SurrogateExecution(ExecutionSimulator):
+    """
+    OHLC-path execution with LOB-like fills: instead of the next bar's high/low touch
+    rule, each order that goes live draws a fill from the FillTable cell of its distance
+    from mid, the bar's vol / momentum and the fill bar's volume. Fills are maker fills
+    at the order price with the maker rebate, as on the LOB path.
+    """
+    def __init__(self, cfg, table: Optional[FillTable] = None):
+        super().__init__(cfg)
+        if table is None:
+            if not cfg.surrogate_table:
+                raise ValueError("fill_model='surrogate' needs cfg.surrogate_table (see scripts/calibrate_surrogate.py)")
+            table = load_fill_table(cfg.surrogate_table)
+        self.table = table
+
+    def process_bar(self, idx: int, time, row, next_row) -> List[FillEx]:
+        active_now = [o for o in self.active_orders if o.activate_at_idx == idx]
+        self.active_orders = [o for o in self.active_orders if o.activate_at_idx > idx]
+        if not active_now:
+            return []
+        tick = self.cfg.tick_size
+        mid = float(row.get('mid', row['close']))
+        vol = float(row.get('vol', 0.0))
+        mom = float(row.get('mom_sign', 0.0))
+        volume = float(next_row.get('volume', 0.0))
+        rebate = self.cfg.maker_rebate_bps / 1e4
+        fills = []
+        for o in active_now:
+            p, frac = self.table.lookup(o.side, abs(o.price - mid) / tick, vol, volume, mom)
+            if p <= 0.0 or self.rng.random() >= p:
+                continue
+            qty = o.qty * frac
+            if qty <= 0:
+                continue
+            fills.append(FillEx(time=time, side=o.side, price=o.price, qty=qty,
+                                fee=abs(o.price * qty) * rebate, liquidity='maker'))
+        return fills
@@ -0,0 +1,183 @@
+import json, os, socket, sqlite3, threading, time
+from typing import Callable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'queued',   -- queued | running | done | failed
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT,
+    sweep       TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id);
+"""
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class SweepQueue:
+    """
+    Durable sweep job queue in a single SQLite file (local disk or shared storage).
+    The coordinator enqueues JSON payloads; workers on any machine claim them under a lease.
+    A running job whose lease expires (dead worker) becomes claimable again, until it
+    has been leased max_attempts times; then it is marked failed.
+    Jobs carry an optional sweep id so several sweeps can share one file: counts(),
+    results() and wait() take it to look at one sweep only.
+    """
+    def __init__(self, path: str, lease_sec: float = 300.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        with self._connect() as con:
+            con.executescript(SCHEMA)
+            if 'sweep' not in [r[1] for r in con.execute("PRAGMA table_info(jobs)")]:
+                con.execute("ALTER TABLE jobs ADD COLUMN sweep TEXT")   # queue files from before sweep ids
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: we issue BEGIN IMMEDIATE ourselves so claims are atomic across processes
+        return sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+
+    def enqueue(self, payloads: List[dict], sweep: Optional[str] = None) -> int:
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            con.executemany("INSERT INTO jobs(payload, sweep) VALUES (?, ?)",
+                            [(json.dumps(p), sweep) for p in payloads])
+            con.execute("COMMIT")
+        finally:
+            con.close()
+        return len(payloads)
+
+    def _reap(self, con: sqlite3.Connection, now: float):
+        # lease expired on the last allowed attempt: the job keeps killing its workers
+        con.execute("UPDATE jobs SET status = 'failed', lease_until = NULL, "
+                    "error = COALESCE(error, 'lease expired on every attempt') "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, self.max_attempts))
+
+    def claim(self, worker: str) -> Optional[Tuple[int, dict]]:
+        """Atomically lease the oldest queued (or lease-expired) job. Returns (job_id, payload) or None."""
+        now = time.time()
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            self._reap(con, now)
+            row = con.execute(
+                "SELECT id, payload FROM jobs "
+                "WHERE status = 'queued' OR (status = 'running' AND lease_until < ? AND attempts < ?) "
+                "ORDER BY id LIMIT 1", (now, self.max_attempts)).fetchone()
+            if row is None:
+                con.execute("COMMIT")
+                return None
+            con.execute("UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (worker, now + self.lease_sec, row[0]))
+            con.execute("COMMIT")
+        finally:
+            con.close()
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Extend our lease; False if the job was re-leased to someone else."""
+        con = self._connect()
+        try:
+            cur = con.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                              (time.time() + self.lease_sec, job_id, worker))
+            return cur.rowcount == 1
+        finally:
+            con.close()
+
+    def complete(self, job_id: int, worker: str, result: dict) -> bool:
+        """Store the result. Ignored (returns False) if our lease was lost and the job re-leased."""
+        con = self._connect()
+        try:
+            cur = con.execute("UPDATE jobs SET status = 'done', result = ?, lease_until = NULL "
+                              "WHERE id = ? AND worker = ? AND status = 'running'",
+                              (json.dumps(result, default=str), job_id, worker))
+            return cur.rowcount == 1
+        finally:
+            con.close()
+
+    def fail(self, job_id: int, worker: str, error: str):
+        """Requeue the job, or mark it failed once max_attempts is reached."""
+        con = self._connect()
+        try:
+            con.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                        "error = ?, lease_until = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+                        (self.max_attempts, error, job_id, worker))
+        finally:
+            con.close()
+
+    def counts(self, sweep: Optional[str] = None) -> dict:
+        con = self._connect()
+        try:
+            self._reap(con, time.time())
+            rows = con.execute("SELECT status, COUNT(*) FROM jobs WHERE ? IS NULL OR sweep = ? "
+                               "GROUP BY status", (sweep, sweep)).fetchall()
+        finally:
+            con.close()
+        out = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+        out.update(dict(rows))
+        return out
+
+    def results(self, sweep: Optional[str] = None) -> List[dict]:
+        """Payload + result of every finished job (of one sweep, if given), in enqueue order."""
+        con = self._connect()
+        try:
+            rows = con.execute("SELECT id, payload, result FROM jobs WHERE status = 'done' "
+                               "AND (? IS NULL OR sweep = ?) ORDER BY id", (sweep, sweep)).fetchall()
+        finally:
+            con.close()
+        return [{'job_id': i, 'payload': json.loads(p), 'result': json.loads(r)} for i, p, r in rows]
+
+    def wait(self, poll_sec: float = 2.0, timeout: Optional[float] = None, sweep: Optional[str] = None) -> dict:
+        """Block until nothing is queued or running (in `sweep`, if given); returns the final counts."""
+        t0 = time.time()
+        while True:
+            c = self.counts(sweep)
+            if c['queued'] == 0 and c['running'] == 0:
+                return c
+            if timeout is not None and time.time() - t0 > timeout:
+                raise TimeoutError(f"sweep not finished after {timeout}s: {c}")
+            time.sleep(poll_sec)
+
+def run_worker(queue: SweepQueue, job_fn: Callable[[dict], dict], worker: Optional[str] = None,
+               poll_sec: float = 1.0, idle_exit_sec: Optional[float] = 10.0) -> int:
+    """
+    Claim-run-complete loop. job_fn(payload) -> summary dict.
+    A heartbeat thread renews the lease while a job runs. Exits after `idle_exit_sec`
+    with nothing to claim (None = run forever). Returns the number of jobs completed.
+    """
+    worker = worker or default_worker_id()
+    done = 0
+    idle_since = time.time()
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            if idle_exit_sec is not None and time.time() - idle_since >= idle_exit_sec:
+                return done
+            time.sleep(poll_sec)
+            continue
+        job_id, payload = job
+
+        stop = threading.Event()
+        def _beat():
+            while not stop.wait(queue.lease_sec / 3.0):
+                queue.heartbeat(job_id, worker)
+        hb = threading.Thread(target=_beat, daemon=True)
+        hb.start()
+        try:
+            result = job_fn(payload)
+        except Exception as e:
+            queue.fail(job_id, worker, f"{type(e).__name__}: {e}")
+        else:
+            if queue.complete(job_id, worker, result):
+                done += 1
+        finally:
+            stop.set()
+            hb.join()
+        idle_since = time.time()
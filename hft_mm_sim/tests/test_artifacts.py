@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+from hft_mm_sim.artifacts import ArtifactWriter, FORMATS, find_table, read_table, write_table
+from hft_mm_sim.data import synthetic_minute
+
+@pytest.mark.parametrize('fmt', list(FORMATS))
+def test_round_trip_any_format(tmp_path, fmt):
+    if fmt in ('parquet', 'feather'):
+        pytest.importorskip('pyarrow')
+    logs = synthetic_minute(minutes=50, seed=31)
+    with ArtifactWriter(str(tmp_path), fmt=fmt) as w:
+        w.write('logs', logs, index=True)
+        w.write('plots/detail', logs.reset_index().head(5))
+    back = read_table(str(tmp_path), 'logs')
+    assert list(back.columns) == ['time'] + list(logs.columns)
+    pd.testing.assert_frame_equal(back.set_index('time'), logs, check_freq=False)
+    assert len(read_table(str(tmp_path), 'plots/detail')) == 5
+
+def test_rewrite_removes_stale_format(tmp_path):
+    df = pd.DataFrame({'a': [1, 2]})
+    write_table(df, str(tmp_path), 'trades', 'csv')
+    write_table(df.assign(a=[3, 4]), str(tmp_path), 'trades', 'csv.gz')
+    assert find_table(str(tmp_path), 'trades').endswith('.csv.gz')
+    assert list(read_table(str(tmp_path), 'trades')['a']) == [3, 4]
+    assert read_table(str(tmp_path), 'missing') is None
+
+def test_background_errors_surface_on_close(tmp_path):
+    w = ArtifactWriter(str(tmp_path), fmt='csv')
+    w.write('bad', object())
+    with pytest.raises(AttributeError):
+        w.close()
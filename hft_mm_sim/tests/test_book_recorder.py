@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.book_recorder import BookReader, BookRecorder
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+
+def _run(df, recorder=None, **kw):
+    bt = Backtester(MMConfig(**kw))
+    bt.attach_recorder(recorder)
+    return bt.run(df)
+
+def test_recorder_captures_mo_prints_without_changing_the_run(tmp_path):
+    df = synthetic_minute(minutes=150, seed=2)
+    path = str(tmp_path / "book.bin")
+    with BookRecorder(path, capacity=100_000, depth=3) as rec:
+        res = _run(df, rec)
+    base = _run(df)
+    assert res['trades'].equals(base['trades'])
+
+    reader = BookReader(path)
+    assert len(reader) == reader.count == rec.count
+    bar = reader.bars(100)
+    assert (bar['bar'] == 100).all() and bar['mo_side'][0] == 0 and (bar['mo_side'][1:] != 0).all()
+    assert np.all(np.diff(bar['t']) >= 0)
+    assert bar['t'][0] == df.index[100].value
+    # our fills in the snapshots add up to the run's maker trades
+    maker = res['trades'][res['trades']['liquidity'] == 'maker']
+    assert reader.bars(0, 10_000)['our_fill'].sum() == pytest.approx(maker['qty'].sum(), rel=1e-5)
+    assert len(reader.slice(df.index[100], df.index[100] + (df.index[101] - df.index[100]) * 0.999)) == len(bar)
+    frame = reader.frame(bar)
+    assert list(frame.columns[:3]) == ['time', 'bar', 'tick'] and 'ask_sz_2' in frame
+
+def test_ring_keeps_the_newest_records(tmp_path):
+    df = synthetic_minute(minutes=60, seed=3)
+    path = str(tmp_path / "ring.bin")
+    with BookRecorder(path, capacity=500) as rec:
+        _run(df, rec)
+    assert rec.count > 500
+    reader = BookReader(path)
+    recs = reader.slice()
+    assert len(recs) == 500 and np.all(np.diff(recs['t']) >= 0)
+    assert recs['bar'][-1] == df.index.size - 2
+    assert len(reader.bars(0)) == 0   # overwritten
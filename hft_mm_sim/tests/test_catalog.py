@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+from hft_mm_sim.data import synthetic_minute, load_bars
+
+pytest.importorskip('pyarrow')
+from hft_mm_sim.catalog import BarCatalog
+
+def test_partitioned_write_and_range_load(tmp_path):
+    df = synthetic_minute(minutes=3 * 1440, seed=21)
+    cat = BarCatalog(str(tmp_path))
+    assert cat.write('BTC/USDT', df) == 3
+    assert cat.symbols() == ['BTC/USDT'] and len(cat.days('BTC/USDT')) == 3
+    assert cat.last_timestamp('BTC/USDT') == df.index[-1]
+
+    start, end = df.index[1500], df.index[2000]
+    part = BarCatalog(str(tmp_path)).load('BTC/USDT', start=start, end=end, columns=['close', 'volume'])
+    assert list(part.columns) == ['close', 'volume']
+    pd.testing.assert_frame_equal(part, df.loc[start:end, ['close', 'volume']], check_freq=False)
+    via_helper = load_bars(catalog=str(tmp_path), symbol='BTC/USDT', start=start, end=end)
+    pd.testing.assert_frame_equal(via_helper, df.loc[start:end], check_freq=False)
+
+def test_upsert_dedupes_overlap(tmp_path):
+    df = synthetic_minute(minutes=600, seed=22)
+    cat = BarCatalog(str(tmp_path))
+    cat.write('ETH', df.iloc[:400])
+    newer = df.iloc[300:].copy()
+    newer['close'] += 1.0
+    cat.write('ETH', newer)
+    out = cat.load('ETH')
+    assert len(out) == 600 and out.index.is_unique
+    assert (out['close'].iloc[300:] == newer['close']).all()
+    with pytest.raises(KeyError):
+        cat.load('SOL')
+
+def test_catalog_sweep_without_date_range(tmp_path):
+    from scripts.grid_search import run_job
+    from hft_mm_sim.config import MMConfig, config_to_dict
+    df = synthetic_minute(minutes=300, seed=23)
+    BarCatalog(str(tmp_path)).write('X', df)
+    # unset --start/--end reach the loaders as '' and must mean "no bound"
+    assert len(load_bars(catalog=str(tmp_path), symbol='X', start='', end='')) == 300
+    assert len(BarCatalog(str(tmp_path)).load('X', start='', end=df.index[99])) == 100
+    payload = {'csv': '', 'catalog': str(tmp_path), 'symbol': 'X', 'start': '', 'end': '',
+               'cfg': config_to_dict(MMConfig(use_lob=False)), 'params': {}}
+    row = run_job(payload)
+    assert row['final_equity'] == row['final_equity'] and row['trades'] > 0
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.backtester import Backtester
+
+def _cfg(use_lob):
+    return MMConfig(use_lob=use_lob, latency_sec=30)
+
+@pytest.mark.parametrize("use_lob", [False, True])
+def test_extend_matches_single_run(use_lob):
+    df = synthetic_minute(minutes=900, seed=8)
+    full = Backtester(_cfg(use_lob)).run(df)
+    bt = Backtester(_cfg(use_lob))
+    bt.run(df.iloc[:400])
+    res = bt.extend(df)
+    pd.testing.assert_frame_equal(full['logs'], res['logs'])
+    pd.testing.assert_frame_equal(full['trades'], res['trades'])
+
+def test_resume_after_crash(tmp_path, monkeypatch):
+    df = synthetic_minute(minutes=900, seed=9)
+    full = Backtester(_cfg(True)).run(df)
+    path = str(tmp_path / "ck.pkl")
+
+    real_save = Backtester.save_checkpoint
+    calls = []
+    def crashing_save(self, p):
+        real_save(self, p)
+        calls.append(p)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(Backtester, "save_checkpoint", crashing_save)
+    with pytest.raises(KeyboardInterrupt):
+        Backtester(_cfg(True)).run(df, checkpoint_path=path, checkpoint_every=300)
+    monkeypatch.undo()
+
+    bt = Backtester.load_checkpoint(path)
+    assert bt._next_bar == 600
+    res = bt.extend(df)
+    pd.testing.assert_frame_equal(full['logs'], res['logs'])
+    pd.testing.assert_frame_equal(full['trades'], res['trades'])
+
+def test_checkpoint_records_are_appended_incrementally(tmp_path):
+    import pickle
+    df = synthetic_minute(minutes=500, seed=10)
+    path = str(tmp_path / "ck.pkl")
+    bt = Backtester(_cfg(False))
+    full = bt.run(df, checkpoint_path=path, checkpoint_every=100)
+    chunks = []
+    with open(path + ".logs", "rb") as f:
+        while True:
+            try:
+                chunks.append(pickle.load(f))
+            except EOFError:
+                break
+    assert [len(c) for c in chunks] == [100] * 4 + [99]   # each save appends only its new bars
+
+    # rows appended by a save that crashed before its snapshot was replaced are ignored
+    with open(path + ".logs", "ab") as f:
+        pickle.dump(chunks[-1], f)
+    resumed = Backtester.load_checkpoint(path)
+    pd.testing.assert_frame_equal(resumed._finalize()['logs'], full['logs'])
+    resumed.save_checkpoint(path)
+    assert Backtester.load_checkpoint(path)._finalize()['logs'].equals(full['logs'])
+
+def test_failed_save_keeps_attachments(tmp_path, monkeypatch):
+    from hft_mm_sim import backtester
+    from hft_mm_sim.profiling import StageProfiler
+    bt = Backtester(_cfg(True), profiler=StageProfiler())
+    def broken_dump(*a, **kw):
+        raise OSError("disk full")
+    monkeypatch.setattr(backtester.pickle, "dump", broken_dump)
+    with pytest.raises(OSError):
+        bt.save_checkpoint(str(tmp_path / "ck.pkl"))
+    assert bt.exec_lob.profiler is bt.profiler
@@ -0,0 +1,29 @@
+import os, subprocess, sys
+import pytest
+from hft_mm_sim.cli import COMMANDS, DOWNLOADERS, resolve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_resolve_commands():
+    assert resolve(['run', '--csv', 'x.csv']) == ('run_backtest', 'hftsim run', ['--csv', 'x.csv'])
+    assert resolve(['download', 'binance', '--symbols', 'BTC/USDT'])[:2] == \
+        ('scripts.download_binance', 'hftsim download binance')
+    for argv in (['nope'], ['download'], ['download', 'ftp'], []):
+        with pytest.raises(SystemExit) as e:
+            resolve(argv)
+        assert e.value.code == 2
+    mods = [m for m, _ in COMMANDS.values() if m] + list(DOWNLOADERS.values())
+    assert all(os.path.exists(os.path.join(ROOT, m.replace('.', '/') + '.py')) for m in mods)
+
+def test_headless_run_does_not_import_matplotlib(tmp_path):
+    code = ("import sys; from hft_mm_sim.cli import main; "
+            f"main(['run', '--plots', 'skip', '--outdir', {str(tmp_path)!r}]); "
+            "print('MPL', 'matplotlib' in sys.modules)")
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert 'MPL False' in out.stdout
+    assert os.path.exists(tmp_path / 'logs.csv')
+
+def test_package_import_is_lazy():
+    code = "import sys, hft_mm_sim.config; print('BT', 'hft_mm_sim.backtester' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert 'BT False' in out.stdout
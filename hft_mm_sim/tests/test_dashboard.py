@@ -0,0 +1,48 @@
+import io, os, time, zipfile
+import numpy as np
+import pandas as pd
+import pytest
+from hft_mm_sim import dashboard as db
+from hft_mm_sim.artifacts import write_table
+
+def _run(root, name, n, fmt, seed):
+    d = os.path.join(root, name)
+    idx = pd.date_range('2024-01-01', periods=n, freq='1min', name='time')
+    rng = np.random.default_rng(seed)
+    logs = pd.DataFrame({'equity': rng.standard_normal(n).cumsum(), 'inventory': 0.0, 'cash': 0.0}, index=idx)
+    trades = pd.DataFrame({'time': idx[::7], 'side': 'buy', 'price': 100.0, 'qty': 1.0, 'fee': 0.01,
+                           'liquidity': np.where(np.arange(len(idx[::7])) % 3 == 0, 'taker', 'maker')})
+    write_table(logs, d, 'logs', fmt, index=True)
+    write_table(trades, d, 'trades', fmt)
+    write_table(trades.assign(spread_edge=0.02, markout_5=-0.01), d, 'plots/trades_with_markouts', fmt)
+    return d, logs, trades
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_range_reads_and_aggregation(tmp_path, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    d, logs, trades = _run(str(tmp_path), 'a', 5000, fmt, 51)
+    start, end = logs.index[1000], logs.index[2999]
+    s = db.load_series(d, ['equity'], start, end, max_points=200)
+    assert len(s) <= 202 and s.index[0] == start and s.index[-1] == end
+    assert s['equity'].max() == logs['equity'].loc[start:end].max()
+    act = db.trade_activity(d, start, end, freq='1h')
+    sel = trades[(trades['time'] >= start) & (trades['time'] <= end)]
+    assert act[['maker_trades', 'taker_trades']].to_numpy().sum() == len(sel)
+    attr = db.attribution_series(d, start, end, freq='1h')
+    assert attr['fees'].sum() == pytest.approx(-0.01 * len(sel))
+    assert db.time_bounds(d) == (logs.index[0], logs.index[-1])
+
+def test_store_fingerprint_and_zip(tmp_path):
+    root = str(tmp_path)
+    d1, logs, _ = _run(root, 'run1', 300, 'csv', 52)
+    _run(root, 'run2', 200, 'csv', 53)
+    assert db.list_runs(root) == [d1, os.path.join(root, 'run2')]
+    summary = db.run_summary(d1)
+    assert summary['bars'] == 300 and summary['final_equity'] == pytest.approx(logs['equity'].iloc[-1])
+    fp = db.fingerprint(d1)
+    time.sleep(0.01)
+    write_table(logs.iloc[:100], d1, 'logs', 'csv', index=True)
+    assert db.fingerprint(d1) != fp
+    names = zipfile.ZipFile(io.BytesIO(db.build_zip(d1))).namelist()
+    assert sorted(names) == ['logs.csv', os.path.join('plots', 'trades_with_markouts.csv'), 'trades.csv']
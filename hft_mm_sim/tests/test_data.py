@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+from hft_mm_sim.data import (load_csv, _load_csv_legacy, synthetic_minute, validate_bars, iter_csv,
+                              ingest_csv, ChunkValidator)
+
+def test_fast_path_matches_legacy(tmp_path):
+    path = tmp_path / "bars.csv"
+    synthetic_minute(minutes=500, seed=15).to_csv(path)
+    fast = load_csv(str(path), engine='c')
+    legacy = _load_csv_legacy(str(path)).dropna()
+    pd.testing.assert_frame_equal(fast, legacy, check_freq=False)
+    chunked = load_csv(str(path), chunksize=120)
+    pd.testing.assert_frame_equal(fast, chunked, check_freq=False)
+    assert sum(len(c) for c in iter_csv(str(path), chunksize=100)) == 500
+
+def test_messy_csv_falls_back_and_reports(tmp_path):
+    path = tmp_path / "messy.csv"
+    path.write_text("Date,Open,High,Low,Close,Close.1,Volume\n"
+                    "2024-01-01 00:00,1,2,0.5,1.5,,\"1,000\"\n"
+                    "2024-01-01 00:01,1,2,0.5,null,1.6,-5\n"
+                    "2024-01-01 00:01,1,0.4,0.5,1.5,,7\n"
+                    "2024-01-01 00:05,1,2,0.5,1.5,,7\n")
+    df, rep = load_csv(str(path), return_report=True)
+    assert list(df['volume']) == [1000.0, 0.0, 7.0, 7.0]   # separators parsed, negative clipped
+    assert df['close'].iloc[1] == 1.6                      # duplicate close consolidated
+    assert rep['negative_volume'] == 1 and rep['duplicate_times'] == 1
+    assert rep['high_below_low'] == 1 and rep['high_below_open_close'] == 1
+    assert rep['gaps'] == 1
+    assert validate_bars(df, freq='1min')['missing_bars'] == 3
+
+def test_validate_clean_bars():
+    rep = validate_bars(synthetic_minute(minutes=100, seed=16), freq='1min')
+    assert rep['monotonic_time'] and rep['gaps'] == 0 and rep['negative_volume'] == 0
+
+def _holed_csv(path, minutes=300, hole=(100, 104)):
+    df = synthetic_minute(minutes=minutes, seed=17)
+    df.drop(df.index[hole[0]:hole[1]]).to_csv(path)
+    return df
+
+@pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+def test_gap_report_is_engine_independent(tmp_path, engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    path = tmp_path / "holed.csv"
+    _holed_csv(path)
+    _, rep = load_csv(str(path), engine=engine, return_report=True)
+    assert rep['bar_spacing'] == '0 days 00:01:00'
+    assert rep['gaps'] == 1 and rep['missing_bars'] == 4 and rep['largest_gap'] == '0 days 00:05:00'
+
+def test_report_describes_unsorted_raw_rows(tmp_path):
+    path = tmp_path / "unsorted.csv"
+    df = synthetic_minute(minutes=50, seed=18)
+    df.iloc[[1, 0] + list(range(2, 50))].to_csv(path)
+    for kw in ({}, {'chunksize': 20}):
+        out, rep = load_csv(str(path), return_report=True, **kw)
+        assert not rep['monotonic_time'] and out.index.is_monotonic_increasing
+
+def test_chunked_reports_merge_across_boundaries(tmp_path):
+    path = tmp_path / "holed.csv"
+    df = _holed_csv(path, hole=(96, 100))   # the hole sits on the first 96-row chunk boundary
+    whole = validate_bars(load_csv(str(path)), freq='1min')
+    val = ChunkValidator('1min')
+    assert sum(len(c) for c in iter_csv(str(path), chunksize=96, validator=val)) == len(df) - 4
+    assert val.report() == whole and whole['missing_bars'] == 4
+
+    # a duplicate and an order break that straddle chunk boundaries
+    path2 = tmp_path / "dup.csv"
+    pd.concat([df.iloc[:10], df.iloc[9:20], df.iloc[25:30], df.iloc[20:25]]).to_csv(path2)
+    val = ChunkValidator('1min')
+    list(iter_csv(str(path2), chunksize=10, validator=val))
+    rep = val.report()
+    assert rep['duplicate_times'] == 1 and not rep['monotonic_time'] and rep['rows'] == 31
+
+def test_ingest_streams_into_catalog(tmp_path):
+    pytest.importorskip('pyarrow')
+    from hft_mm_sim.catalog import BarCatalog
+    path = tmp_path / "bars.csv"
+    df = synthetic_minute(minutes=3000, seed=19)
+    df.to_csv(path)
+    rep = ingest_csv(str(path), str(tmp_path / "cat"), 'BTC/USDT', chunksize=700)
+    assert rep['rows'] == 3000 and rep['gaps'] == 0 and rep['monotonic_time']
+    back = BarCatalog(str(tmp_path / "cat")).load('BTC/USDT')
+    pd.testing.assert_frame_equal(back, load_csv(str(path)), check_freq=False, check_index_type=False)
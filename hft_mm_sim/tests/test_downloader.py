@@ -0,0 +1,67 @@
+import threading, time
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+from hft_mm_sim.catalog import BarCatalog
+from hft_mm_sim.downloader import IncrementalDownloader, TokenBucket, MS_PER_DAY
+
+T0 = int(pd.Timestamp('2024-01-01').value // 1_000_000)
+STEP = 60_000
+
+class FakeExchange:
+    """Stands in for ccxt: deterministic 1m bars, optional failures, call accounting."""
+    def __init__(self, fail_times=0):
+        self.calls = []
+        self.fail_times = fail_times
+        self.active = self.max_active = 0
+        self._lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=1000):
+        with self._lock:
+            self.calls.append((symbol, since))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            fail = self.fail_times > 0
+            self.fail_times -= fail
+        try:
+            time.sleep(0.002)
+            if fail:
+                raise ConnectionError("transient")
+            start = -(-since // STEP) * STEP
+            base = 100.0 if symbol == 'AAA' else 50.0
+            return [[t, base, base + 1, base - 1, base + (t - T0) / STEP * 1e-3, 1.0]
+                    for t in range(start, start + limit * STEP, STEP)]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def test_concurrent_sync_and_resume(tmp_path):
+    ex = FakeExchange(fail_times=1)
+    cat = BarCatalog(str(tmp_path))
+    dl = IncrementalDownloader(ex, cat, rate=1000, burst=50, workers=4, retry_sleep=0.0)
+    written = dl.sync(['AAA', 'BBB'], since_ms=T0, until_ms=T0 + 2 * MS_PER_DAY + 30 * STEP)
+    assert written == {'AAA': 2 * 1440 + 30, 'BBB': 2 * 1440 + 30}
+    assert ex.max_active > 1
+    df = cat.load('AAA')
+    assert df.index.is_unique and len(df) == 2910
+    assert df.index[-1] == pd.Timestamp(T0 + 2909 * STEP, unit='ms')
+
+    n_calls = len(ex.calls)
+    written = dl.sync(['AAA', 'BBB'], since_ms=T0, until_ms=T0 + 2 * MS_PER_DAY + 40 * STEP)
+    assert written == {'AAA': 10, 'BBB': 10}
+    assert {since for _, since in ex.calls[n_calls:]} == {T0 + 2 * MS_PER_DAY + 30 * STEP}
+    assert len(cat.load('BBB')) == 2920
+
+def test_missing_day_is_refetched(tmp_path):
+    cat = BarCatalog(str(tmp_path))
+    dl = IncrementalDownloader(FakeExchange(), cat, rate=1000, burst=50)
+    dl.sync(['AAA'], since_ms=T0 + MS_PER_DAY, until_ms=T0 + 2 * MS_PER_DAY)
+    assert dl.plan('AAA', T0, T0 + 2 * MS_PER_DAY) == [('AAA', T0, T0 + MS_PER_DAY)]
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=200, burst=1)
+    t0 = time.monotonic()
+    for _ in range(21):
+        bucket.acquire()
+    assert time.monotonic() - t0 >= 0.09
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.features import OnlineFeatures, add_features
+
+def test_online_matches_batch_across_chunks():
+    df = synthetic_minute(minutes=20_000, seed=71)
+    batch = add_features(df, vol_lookback=30, mom_lookback=5)
+    of = OnlineFeatures(30, 5, resync_every=1000)
+    online = pd.concat([of.transform(df.iloc[a:b]) for a, b in [(0, 3), (3, 40), (40, 12_345), (12_345, 20_000)]])
+    pd.testing.assert_series_equal(online['mid'], batch['mid'])
+    pd.testing.assert_series_equal(online['mom'], batch['mom'])
+    pd.testing.assert_series_equal(online['mom_sign'], batch['mom_sign'])
+    np.testing.assert_allclose(online['vol'], batch['vol'], rtol=1e-9, atol=1e-15)
+    assert (online['vol'].iloc[:15] == 0).all() and online['vol'].iloc[15] > 0  # min_periods = 15
+
+def test_update_returns_scalars():
+    of = OnlineFeatures(4, 2)
+    outs = [of.update(h, l, c) for h, l, c in [(2, 0, 1.0), (3, 1, 2.0), (3, 1, 2.0), (5, 3, 4.0)]]
+    assert outs[0][0] == 1.0 and np.isnan(outs[1][2]) and outs[2][2:] == (1.0, 1.0)
+    assert outs[3][1] == np.std([1.0, 0.0, 1.0], ddof=1)
@@ -0,0 +1,21 @@
+import numpy as np
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.hawkes import HawkesFlow
+
+def test_hawkes_rate_and_clustering():
+    flow = HawkesFlow(branching=0.7, cross_frac=0.2, decay=0.5, seed=3)
+    counts = np.array([len(flow.simulate_bar(100, 1.0)[0]) for _ in range(400)])
+    # long-run rate is one MO per micro-tick, same as the uniform path
+    assert abs(counts.mean() - 100) < 10
+    # self-excitation -> over-dispersed counts vs Poisson
+    assert counts.var() > 2 * counts.mean()
+
+def test_lob_run_with_hawkes_flow():
+    df = synthetic_minute(minutes=60, seed=4)
+    cfg = MMConfig(mo_flow='hawkes', latency_sec=0)
+    res = Backtester(cfg).run(df)
+    logs, trades = res['logs'], res['trades']
+    assert (logs['reason'] == 'lob_quote').any()
+    assert len(trades) > 0
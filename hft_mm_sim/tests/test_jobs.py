@@ -0,0 +1,73 @@
+import json, threading, urllib.error, urllib.request
+import pandas as pd
+import pytest
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.jobs import JobService, make_server
+
+@pytest.fixture
+def service(tmp_path):
+    svc = JobService(str(tmp_path / 'jobs'), processes=2)
+    srv = make_server(svc, port=0)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield svc, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+    svc.close()
+
+def _post(base, body):
+    req = urllib.request.Request(base + '/jobs', data=json.dumps(body).encode(), method='POST')
+    try:
+        with urllib.request.urlopen(req) as f:
+            return f.status, json.load(f)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+def _events(base, job_id):
+    with urllib.request.urlopen(f"{base}/jobs/{job_id}/events") as f:
+        return [json.loads(line) for line in f]
+
+def test_job_streams_progress_and_serves_artifacts(service):
+    svc, base = service
+    body = {'config': {'use_lob': False}, 'dataset': {'minutes': 400, 'seed': 7},
+            'progress_every': 4}
+    code, job = _post(base, body)
+    assert code == 202 and not job['cached']
+    events = _events(base, job['id'])
+    running = [e for e in events if e.get('stage') == 'running']
+    assert [e['bars_done'] for e in running] == [100, 200, 300, 400]
+    assert events[-1]['status'] == 'done' and events[-1]['metrics']['trades'] > 0
+
+    ref = Backtester(MMConfig(use_lob=False)).run(synthetic_minute(minutes=400, seed=7))
+    with urllib.request.urlopen(f"{base}/jobs/{job['id']}/artifacts/logs.csv") as f:
+        logs = pd.read_csv(f)
+    assert len(logs) == len(ref['logs'])
+    assert logs['equity'].to_numpy() == pytest.approx(ref['logs']['equity'].to_numpy())
+
+    # identical request (progress granularity aside) -> same finished job, no rerun
+    code, again = _post(base, dict(body, progress_every=50))
+    assert code == 200 and again['cached'] and again['id'] == job['id'] and again['status'] == 'done'
+    # and it survives a restart of the service
+    assert JobService(svc.root).status(job['id'])['metrics'] == events[-1]['metrics']
+
+def test_many_queued_jobs_dedupe_and_finish(service):
+    svc, base = service
+    ids = []
+    for i in range(40):
+        body = {'config': {'use_lob': False, 'k_vol': 0.05 + 0.01 * (i % 20)},
+                'dataset': {'minutes': 50, 'seed': 1}}
+        ids.append(_post(base, body)[1]['id'])
+    assert len(set(ids)) == 20
+    assert svc._running <= svc.processes
+    for job_id in set(ids):
+        assert _events(base, job_id)[-1]['status'] == 'done'
+    assert svc.counts()['done'] == 20
+
+def test_bad_requests(service):
+    _, base = service
+    assert _post(base, {'config': {'no_such_knob': 1}})[0] == 400
+    assert _post(base, {'dataset': {'csv': '/nonexistent.csv'}})[0] == 400
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(f"{base}/jobs/deadbeef")
+    assert e.value.code == 404
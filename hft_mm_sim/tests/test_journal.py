@@ -0,0 +1,80 @@
+import numpy as np
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.journal import EventJournal, JournalReader, build_index, diff_journals, FILL, REC_SIZE
+
+def _journaled(path, df, extend_at=None, **kw):
+    bt = Backtester(MMConfig(**kw))
+    with EventJournal(path, index_every=16) as jr:
+        bt.attach_journal(jr)
+        if extend_at:
+            bt.run(df.iloc[:extend_at])
+            return bt.extend(df)
+        return bt.run(df)
+
+def test_journal_replays_state_and_detects_divergence(tmp_path):
+    df = synthetic_minute(minutes=200, seed=7)
+    a, b = str(tmp_path / "a.jnl"), str(tmp_path / "b.jnl")
+    res = _journaled(a, df, use_lob=False)
+    _journaled(b, df, extend_at=120, use_lob=False)
+    assert diff_journals(a, b) is None   # extend() journals the same decisions as one run
+
+    reader = JournalReader(a)
+    assert reader.verify()['ok'] and reader.verify()['bars'] == len(res['logs'])
+    for bar in (0, 15, 16, 101, len(res['logs']) - 1):
+        st = reader.state_at(bar)
+        log = res['logs'].iloc[bar]
+        assert st['matches_journal'] and st['reason'] == log['reason']
+        assert (st['inventory'], st['cash']) == (log['inventory'], log['cash'])   # bit-exact
+    assert build_index(a, 50)['bar'].tolist() == [0, 50, 100, 150]
+    assert reader.state_at(137) == JournalReader(a).state_at(137)
+
+    # corrupt one fill price in b: verify() and diff_journals() both locate it
+    recs = JournalReader(b).records
+    k = int(np.flatnonzero(recs['kind'] == FILL)[-1])
+    bar = int(recs['bar'][k])
+    with open(b, 'r+b') as f:
+        f.seek(REC_SIZE * (k + 1) + 24)
+        f.write(np.float64(recs['a'][k] + 1.0).tobytes())
+    assert JournalReader(b).verify()['first_mismatch']['bar'] == bar
+    assert diff_journals(a, b)['record'] == k
+
+def test_lob_journal_records_book_interaction(tmp_path):
+    df = synthetic_minute(minutes=60, seed=8)
+    path = str(tmp_path / "lob.jnl")
+    res = _journaled(path, df, carry_orders=False)
+    reader = JournalReader(path)
+    kinds = set(reader.frame()['kind'])
+    assert {'bar', 'place', 'cancel', 'mo', 'fill', 'end'} <= kinds
+    assert reader.verify()['ok']
+    st = reader.state_at(40)
+    assert (st['inventory'], st['cash']) == tuple(res['logs'].iloc[40][['inventory', 'cash']])
+
+def test_resume_truncates_journal_to_checkpoint(tmp_path, monkeypatch):
+    import pytest
+    df = synthetic_minute(minutes=300, seed=9)
+    ref, jpath, ck = str(tmp_path / "ref.jnl"), str(tmp_path / "run.jnl"), str(tmp_path / "ck.pkl")
+    _journaled(ref, df, use_lob=False)
+
+    real_save = Backtester.save_checkpoint
+    def crashing_save(self, p):
+        if self._next_bar >= 150:   # bars 100..149 are journaled but not checkpointed
+            raise KeyboardInterrupt
+        real_save(self, p)
+    monkeypatch.setattr(Backtester, "save_checkpoint", crashing_save)
+    with pytest.raises(KeyboardInterrupt):
+        with EventJournal(jpath, index_every=16, buffer_records=1) as jr:
+            bt = Backtester(MMConfig(use_lob=False))
+            bt.attach_journal(jr)
+            bt.run(df, checkpoint_path=ck, checkpoint_every=50)
+    monkeypatch.undo()
+    assert JournalReader(jpath).records['bar'].max() == 149
+
+    bt = Backtester.load_checkpoint(ck)
+    with EventJournal(jpath, index_every=16, append=True, truncate_to=bt.journal_records) as jr:
+        assert jr.n_records == bt.journal_records
+        bt.attach_journal(jr)
+        bt.extend(df)
+    assert diff_journals(ref, jpath) is None
+    assert JournalReader(jpath).verify()['ok']
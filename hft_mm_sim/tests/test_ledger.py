@@ -0,0 +1,23 @@
+import pandas as pd
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.backtester import Backtester
+
+def test_compact_ledger_preserves_accounting():
+    df = synthetic_minute(minutes=200, seed=14)
+    kw = dict(latency_sec=0, carry_orders=False)
+    raw = Backtester(MMConfig(**kw)).run(df)
+    comp = Backtester(MMConfig(compact_ledger=True, **kw)).run(df)
+    # cash/inventory path is identical
+    pd.testing.assert_frame_equal(raw['logs'], comp['logs'])
+
+    rt, ct, cc = raw['trades'], comp['trades'], comp['costs']
+    assert len(ct) < len(rt) and (ct['qty'] > 0).all()
+    assert ct['n_fills'].sum() == (rt['qty'] > 0).sum()
+    cancels = rt[rt['qty'] == 0]
+    assert len(cc) == len(cancels) and abs(cc['cost'].sum() - cancels['fee'].sum()) < 1e-9
+    for side in ('buy', 'sell'):
+        r, c = rt[rt['side'] == side], ct[ct['side'] == side]
+        assert abs(r['qty'].sum() - c['qty'].sum()) < 1e-9
+        assert abs((r['price'] * r['qty']).sum() - (c['price'] * c['qty']).sum()) < 1e-6
+    assert abs(rt['fee'].sum() - ct['fee'].sum() - cc['cost'].sum()) < 1e-9
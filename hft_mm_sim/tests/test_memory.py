@@ -0,0 +1,45 @@
+import os
+import pandas as pd
+import pytest
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim import memory
+from hft_mm_sim.memory import MemoryTracker, MemoryBudgetExceeded, MB
+
+def test_spill_to_disk_keeps_results(tmp_path, monkeypatch):
+    df = synthetic_minute(minutes=300, seed=12)
+    cfg = MMConfig(latency_sec=0)
+    plain = Backtester(cfg).run(df)
+    # spill threshold at 0 and RSS that keeps growing -> every check spills; budget far above it
+    rss = iter(range(1 << 20, 1 << 40, 1 << 20))
+    monkeypatch.setattr(memory, 'current_rss_bytes', lambda: next(rss))
+    mem = MemoryTracker(budget_mb=1e6, spill_frac=0.0, check_every=50, spill_dir=str(tmp_path))
+    bt = Backtester(MMConfig(latency_sec=0), memory=mem)
+    res = bt.run(df)
+    assert mem.spills == 5 and len(os.listdir(tmp_path)) > 0
+    pd.testing.assert_frame_equal(plain['logs'], res['logs'])
+    pd.testing.assert_frame_equal(plain['trades'], res['trades'])
+    stages = list(mem.report()['stage'])
+    assert stages == ['backtest;check_input', 'backtest;features', 'backtest;bars', 'backtest;finalize']
+    bt.discard_spill()
+    assert os.listdir(tmp_path) == []
+
+def test_budget_exceeded_raises(tmp_path):
+    mem = MemoryTracker(budget_mb=1, check_every=10, spill_dir=str(tmp_path))
+    with pytest.raises(MemoryBudgetExceeded):
+        Backtester(MMConfig(use_lob=False), memory=mem).run(synthetic_minute(minutes=50, seed=13))
+
+def test_flat_rss_after_spill_neither_respills_nor_aborts(monkeypatch):
+    rss = [90 * MB]
+    monkeypatch.setattr(memory, 'current_rss_bytes', lambda: rss[0])
+    mem = MemoryTracker(budget_mb=100, spill_frac=0.8)
+    assert mem.should_spill()
+    mem.mark_spill()            # the allocator keeps the pages: RSS stays at 90MB
+    assert not mem.should_spill()
+    mem.check('bars')
+    rss[0] = 95 * MB            # new records outgrew the freed memory
+    assert mem.should_spill()
+    rss[0] = 101 * MB
+    with pytest.raises(MemoryBudgetExceeded):
+        mem.check('bars')
@@ -0,0 +1,33 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.paper import LatencyHistogram, paper_trade_replay
+
+@pytest.mark.parametrize('use_lob', [False, True])
+def test_replayed_stream_matches_backtest(use_lob):
+    df = synthetic_minute(minutes=200, seed=61)
+    ref = Backtester(MMConfig(use_lob=use_lob)).run(df)
+    trader, res = asyncio.run(paper_trade_replay(MMConfig(use_lob=use_lob), df,
+                                                 speed=0, latency_budget_ms=1e5))
+    pd.testing.assert_frame_equal(ref['logs'], res['logs'])
+    pd.testing.assert_frame_equal(ref['trades'], res['trades'])
+    assert len(ref['trades']) > 0
+    assert trader.tick_to_quote.n == len(df) and trader.stale_bars == 0
+
+def test_backlog_beyond_budget_is_not_quoted():
+    df = synthetic_minute(minutes=150, seed=62)
+    trader, res = asyncio.run(paper_trade_replay(MMConfig(use_lob=False), df,
+                                                 speed=0, latency_budget_ms=0.0))
+    assert trader.stale_bars == len(df)
+    assert (res['logs']['reason'] == 'stale').all() and res['trades'].empty
+
+def test_latency_histogram_percentiles():
+    h = LatencyHistogram()
+    for us in np.r_[np.full(90, 100.0), np.full(10, 5000.0)]:
+        h.add_ns(int(us * 1e3))
+    assert 100 <= h.percentile(50) <= 126 and 5000 <= h.percentile(99) <= 6310
+    assert h.to_frame()['count'].sum() == 100 and h.summary()['max_us'] == pytest.approx(5000.0)
@@ -0,0 +1,32 @@
+import os
+import numpy as np
+import pandas as pd
+from hft_mm_sim.analytics import minmax_downsample, render_run_plots
+
+def test_minmax_keeps_extremes_and_bounds_size():
+    idx = pd.date_range('2024-01-01', periods=100_003, freq='1min')
+    s = pd.Series(np.random.default_rng(41).standard_normal(len(idx)).cumsum(), index=idx)
+    s.iloc[777] = 1e6
+    s.iloc[50_000] = -1e6
+    out = minmax_downsample(s, 1000)
+    assert len(out) <= 1002 and out.index.is_monotonic_increasing
+    assert out.max() == 1e6 and out.min() == -1e6
+    assert out.index[0] == idx[0] and out.index[-1] == idx[-1]
+    # every bucket's extremes survive, so the envelope matches the full series
+    buckets = np.arange(len(s)) // (-(-len(s) // 500))
+    pd.testing.assert_series_equal(s.groupby(buckets).max().reset_index(drop=True),
+                                   out.groupby(buckets[s.index.get_indexer(out.index)]).max().reset_index(drop=True))
+    small = s.iloc[:50]
+    assert minmax_downsample(small, 1000) is small
+
+def test_render_run_plots_in_pool(tmp_path):
+    idx = pd.date_range('2024-01-01', periods=20_000, freq='1min')
+    rng = np.random.default_rng(42)
+    mid = 100 + rng.standard_normal(len(idx)).cumsum() * 0.01
+    logs = pd.DataFrame({'mid': mid, 'bid': mid - 0.01, 'ask': mid + 0.01,
+                         'equity': rng.standard_normal(len(idx)).cumsum(),
+                         'inventory': rng.integers(-5, 5, len(idx)).astype(float)}, index=idx)
+    markouts = pd.DataFrame({'time': idx[::10], 'spread_edge': 0.01, 'fee': 0.001, 'markout_5': -0.002})
+    render_run_plots(logs, str(tmp_path), markouts=markouts, processes=2)
+    for name in ('equity_curve', 'inventory', 'quotes_vs_mid', 'pnl_attribution_stacked'):
+        assert os.path.getsize(tmp_path / f'{name}.png') > 0
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.portfolio import PortfolioBacktester, merge_bars
+from hft_mm_sim.risk import PortfolioRiskManager
+
+def _book():
+    a = synthetic_minute(minutes=160, seed=71)
+    b = synthetic_minute(minutes=120, seed=72)
+    b.index = b.index + pd.Timedelta(minutes=30)   # overlapping, not aligned at the start
+    return {'AAA': a, 'BBB': b}
+
+def test_merge_is_time_ordered_and_complete():
+    data = _book()
+    groups = list(merge_bars(data))
+    times = [t for t, _ in groups]
+    assert times == sorted(times) and len(set(times)) == len(times)
+    assert sum(len(ev) for _, ev in groups) == sum(len(df) for df in data.values())
+
+@pytest.mark.parametrize('use_lob', [False, True])
+def test_open_gate_matches_solo_runs(use_lob):
+    cfg = MMConfig(use_lob=use_lob)
+    data = _book()
+    res = PortfolioBacktester(cfg, symbols=list(data)).run(data)
+    for sym, df in data.items():
+        ref = Backtester(MMConfig(use_lob=use_lob)).run(df)
+        pd.testing.assert_frame_equal(ref['logs'], res['symbols'][sym]['logs'])
+        pd.testing.assert_frame_equal(ref['trades'], res['symbols'][sym]['trades'])
+    # book is marked at each symbol's latest price
+    final = sum(r['logs']['cash'].iloc[-1] + r['logs']['inventory'].iloc[-1] * data[s]['close'].iloc[-1]
+                for s, r in res['symbols'].items())
+    assert res['logs']['equity'].iloc[-1] == pytest.approx(final)
+    assert set(res['breakdown']['symbol']) == set(data)
+
+def test_worker_processes_match_in_process():
+    cfg = MMConfig(use_lob=False)
+    data = _book()
+    risk = dict(max_gross_notional=300.0)
+    local = PortfolioBacktester(cfg, list(data), PortfolioRiskManager(**risk)).run(data)
+    par = PortfolioBacktester(cfg, list(data), PortfolioRiskManager(**risk), processes=2).run(data)
+    pd.testing.assert_frame_equal(local['logs'], par['logs'])
+    for sym in data:
+        pd.testing.assert_frame_equal(local['symbols'][sym]['logs'], par['symbols'][sym]['logs'])
+
+def test_gross_limit_blocks_all_symbols():
+    cfg = MMConfig(use_lob=False)
+    data = _book()
+    res = PortfolioBacktester(cfg, list(data), PortfolioRiskManager(max_gross_notional=0.0)).run(data)
+    assert (res['logs']['reason'] == 'portfolio_gross_notional').all()
+    assert all(r['trades'].empty for r in res['symbols'].values())
+    assert res['risk_blocks']['gross_notional'] == len(res['logs'])
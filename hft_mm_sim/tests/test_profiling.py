@@ -0,0 +1,31 @@
+import pandas as pd
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.profiling import StageProfiler
+
+def test_profiler_stages_counters_and_no_side_effects(tmp_path):
+    df = synthetic_minute(minutes=120, seed=11)
+    cfg = MMConfig(latency_sec=0)
+    prof = StageProfiler()
+    res = Backtester(cfg, profiler=prof).run(df)
+    plain = Backtester(MMConfig(latency_sec=0)).run(df)
+    pd.testing.assert_frame_equal(res['trades'], plain['trades'])
+
+    rep = prof.report().set_index('stage')
+    assert {'run', 'run;features', 'run;bar;risk', 'run;bar;lob;market_orders'} <= set(rep.index)
+    assert prof.counters['bars'] == 119
+    assert prof.counters['micro_ticks'] == 119 * cfg.lob_ticks_per_bar
+    assert prof.counters['fills'] == (res['trades']['qty'] > 0).sum()
+    assert abs(rep['self_s'].sum() - rep.loc['run', 'total_s']) < 1e-9
+
+    prof.save(str(tmp_path))
+    folded = (tmp_path / 'profile.folded').read_text().splitlines()
+    assert any(line.startswith('run;bar;lob;market_orders ') for line in folded)
+
+def test_profiler_and_memory_tracker_together():
+    from hft_mm_sim.memory import MemoryTracker
+    prof, mem = StageProfiler(), MemoryTracker()
+    Backtester(MMConfig(), profiler=prof, memory=mem).run(synthetic_minute(minutes=60, seed=12))
+    assert {'run', 'run;finalize'} <= set(prof.report()['stage'])
+    assert list(mem.report()['stage'])[-1] == 'backtest;finalize'
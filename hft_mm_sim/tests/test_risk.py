@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+import numpy as np
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.risk import FillRateThrottle, RiskManager
+
+def test_pregated_chain_matches_per_bar_chain():
+    cfg = MMConfig(vol_brake_mult=2.0, inv_cap=5, dd_stop=0.5, dd_warmup_bars=20, max_notional=400, max_fills=3,
+                   fill_window_bars=4)
+    rng = np.random.default_rng(0)
+    vol = rng.uniform(0, 3e-3, 300)
+    inv = rng.normal(0, 4, 300)
+    equity = np.cumsum(rng.normal(0, 8, 300))   # PnL; the account value is dd_capital (100) + PnL
+    fills = rng.integers(0, 3, 300)
+    a, b = RiskManager(cfg), RiskManager(cfg)
+    gate = b.pregate(vol)
+    assert set(gate.tolist()) == {-1, 0}
+    for i in range(300):
+        ok_a = a.allow_new_orders(inv[i], vol[i], equity[i], bar_i=i, price=100.0)
+        ok_b = b.allow_new_orders(inv[i], vol[i], equity[i], bar_i=i, price=100.0, blocked_by=int(gate[i]))
+        assert ok_a == ok_b and a.last_block == b.last_block
+        for rm in (a, b):
+            rm.on_fills([SimpleNamespace(qty=1.0)] * int(fills[i]))
+    assert a.blocks == b.blocks
+    assert all(a.blocks[k] > 0 for k in ('vol_brake', 'inventory_cap', 'drawdown', 'notional', 'fill_rate'))
+    assert a.equity_peak == 100.0 + equity.max()
+
+def test_drawdown_warmup_and_fill_throttle():
+    rm = RiskManager(MMConfig(dd_warmup_bars=5))   # -90 PnL leaves 10 of 100 capital: below the 80% stop
+    allowed = [rm.allow_new_orders(0.0, 0.0, -90.0 if i else 0.0, bar_i=i) for i in range(8)]
+    assert allowed == [True] * 5 + [False] * 3 and rm.blocks['drawdown'] == 3
+
+    th = FillRateThrottle(max_fills=4, window_bars=3)
+    totals = []
+    for n in (2, 1, 1, 0, 0, 5):
+        th.on_fills(n)
+        totals.append(th.total)
+    assert totals == [2, 3, 4, 2, 1, 5]
+
+def test_run_summary_reports_blocks_per_rule():
+    df = synthetic_minute(minutes=120, seed=5)
+    res = Backtester(MMConfig(vol_brake_mult=100, max_fills=20, fill_window_bars=5)).run(df)
+    n_blocked = int((res['logs']['reason'] == 'risk_block').sum())
+    assert res['risk_blocks']['fill_rate'] > 0 and sum(res['risk_blocks'].values()) == n_blocked
+
+def test_default_config_trades():
+    # the drawdown peak starts from the first observed account value, not a fixed seed
+    res = Backtester(MMConfig(use_lob=False)).run(synthetic_minute(minutes=120, seed=5))
+    assert res['risk_blocks']['drawdown'] == 0 and len(res['trades']) > 0
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.scenarios import (FlashCrash, Scenario, VolMultiplier, run_scenarios,
+                                  save_scenario_report, scenario_grid)
+
+def _bars(n=300, seed=5):
+    df = synthetic_minute(minutes=n, seed=seed)
+    df['high'] = df[['high', 'open', 'close']].max(axis=1)
+    df['low'] = df[['low', 'open', 'close']].min(axis=1)
+    return df
+
+def test_shocks_transform_bars_without_touching_base():
+    df = _bars()
+    before = df.copy()
+    grid = list(scenario_grid({'vol.mult': [1, 3], 'gap.pct': [0, -0.05], 'drought.mult': [1, 0.2],
+                               'spread.mult': [1, 3], 'crash.depth': [0, 0.1]}))
+    assert len(grid) == 32 and grid[0].build(df) is df
+    for sc in grid:
+        b = sc.build(df)
+        assert (b['high'] >= np.maximum(b['open'], b['close']) * (1 - 1e-12)).all()
+        assert (b['low'] <= np.minimum(b['open'], b['close']) * (1 + 1e-12)).all()
+    pd.testing.assert_frame_equal(df, before)
+
+    r = lambda d: np.log(d['close']).diff()
+    assert r(Scenario('v', (VolMultiplier(3.0),)).build(df)).std() == pytest.approx(3 * r(df).std())
+    crashed = Scenario('c', (FlashCrash(depth=0.1, at=0.5, recover_bars=20),)).build(df)
+    assert crashed['close'].iloc[150] == pytest.approx(df['close'].iloc[150] * 0.9)
+    assert crashed['close'].iloc[171] == pytest.approx(df['close'].iloc[171])
+
+def test_grid_validation():
+    with pytest.raises(ValueError):
+        scenario_grid({'tsunami.height': [1]})
+    with pytest.raises(ValueError):
+        scenario_grid({'vol.nope': [1]})
+    with pytest.raises(ValueError):
+        scenario_grid({'not_a_cfg_field': [1]})
+
+def test_parallel_runs_match_serial_and_report(tmp_path):
+    df = _bars(200)
+    cfg = MMConfig(use_lob=False, vol_brake_mult=100.0)
+    axes = {'vol.mult': [1, 3], 'crash.depth': [0, 0.1], 'latency_sec': [0, 30]}
+    serial = run_scenarios(cfg, df, scenario_grid(axes))
+    par = run_scenarios(cfg, df, scenario_grid(axes), processes=2, max_pending=2)
+    pd.testing.assert_frame_equal(serial, par)
+    assert len(serial) == 8 and serial['final_equity'].nunique() > 1
+    figs = save_scenario_report(serial, list(axes), str(tmp_path))
+    assert len(figs) == 3 and all((tmp_path / 'plots').joinpath(f.split('/')[-1]).exists() for f in figs)
+    assert (tmp_path / 'scenario_results.csv').exists()
+    assert 'Worst scenarios' in (tmp_path / 'scenario_report.md').read_text()
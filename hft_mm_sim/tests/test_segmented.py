@@ -0,0 +1,43 @@
+import pandas as pd
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.segmented import run_segment, run_segmented, split_bounds
+
+def test_split_bounds_cover_history():
+    b = split_bounds(1001, 4)
+    assert b[0][0] == 0 and b[-1][1] == 1000
+    assert all(e0 == s1 for (_, e0), (s1, _) in zip(b, b[1:]))
+
+def test_segmented_run_stitches_and_reports_divergence():
+    df = synthetic_minute(minutes=900, seed=10)
+    cfg = MMConfig(latency_sec=30)
+    res = run_segmented(cfg, df, segments=3, warmup_bars=100, processes=2, compare_serial=True)
+    serial = Backtester(cfg).run(df)
+    assert res['logs'].index.equals(serial['logs'].index)
+    assert len(res['segments']) == 3
+    assert abs(res['segments']['pnl'].sum() - res['logs']['equity'].iloc[-1]) < 1e-6
+    div = res['divergence']
+    assert div['final_equity_serial'] == serial['logs']['equity'].iloc[-1]
+    # the first segment has no warm-up and starts flat, exactly like the serial run
+    first_end = res['segments']['end'].iloc[0]
+    pd.testing.assert_series_equal(res['logs'].loc[:first_end, 'equity'],
+                                   serial['logs'].loc[:first_end, 'equity'])
+
+def test_segment_on_its_slice_matches_full_history():
+    df = synthetic_minute(minutes=400, seed=11)
+    cfg = MMConfig()
+    full = run_segment(cfg, df, 250, 399, 80)
+    part = run_segment(cfg, df.iloc[170:400], 80, 229, 80)
+    pd.testing.assert_frame_equal(full['logs'], part['logs'])
+
+def test_segmented_risk_blocks_use_global_bar_numbers():
+    df = synthetic_minute(minutes=600, seed=12)
+    # quotes too wide to fill keep PnL at 0, and negative capital puts that below the
+    # drawdown floor: every bar past dd_warmup_bars is blocked
+    cfg = MMConfig(dd_warmup_bars=150, dd_capital=-1.0, k_vol=1000.0, use_lob=False)
+    serial = Backtester(cfg).run(df)
+    res = run_segmented(cfg, df, segments=3, warmup_bars=50, processes=2)
+    assert res['risk_blocks'] == serial['risk_blocks']
+    assert res['risk_blocks']['drawdown'] == len(df) - 1 - 150
+    assert (res['logs']['reason'] == 'risk_block').sum() == sum(res['risk_blocks'].values())
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.features import add_features
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.strategy import (MarketMakerStrategy, Quotes, Strategy, STRATEGIES,
+                                 make_strategy, register_strategy)
+
+def test_batch_matches_per_bar():
+    cfg = MMConfig()
+    df = add_features(synthetic_minute(minutes=200, seed=5), cfg.vol_lookback, cfg.mom_lookback)
+    inv = np.linspace(-60, 60, len(df))
+    strat = MarketMakerStrategy(cfg)
+    bid, ask, sb, sa = strat.quote_batch(df['close'], df['mid'], df['vol'], df['mom_sign'], inv)
+    for i in range(len(df)):
+        q = strat.quote(df['close'].iloc[i], df['mid'].iloc[i], df['vol'].iloc[i], df['mom_sign'].iloc[i], inv[i])
+        assert (q.bid, q.ask, q.size_bid, q.size_ask) == (bid[i], ask[i], sb[i], sa[i])
+
+def test_registry_selects_custom_strategy():
+    @register_strategy("test_fixed")
+    class Fixed(Strategy):
+        def quote(self, price, mid, vol, mom_sign, inventory):
+            return Quotes(mid - 0.05, mid + 0.05, 1.0, 1.0, "fixed")
+    try:
+        cfg = MMConfig(strategy="test_fixed", use_lob=False)
+        bt = Backtester(cfg)
+        assert isinstance(bt.strategy, Fixed)
+        logs = bt.run(synthetic_minute(minutes=50, seed=6))['logs']
+        assert (logs['reason'] == 'fixed').any()
+        # default batch falls back to the per-bar call
+        bid, ask, _, _ = bt.strategy.quote_batch([100.0], [100.0], [0.0], [0.0], 0.0)
+        assert bid[0] == pytest.approx(99.95) and ask[0] == pytest.approx(100.05)
+    finally:
+        STRATEGIES.pop("test_fixed")
+    with pytest.raises(ValueError):
+        make_strategy(MMConfig(strategy="test_fixed"))
+
+def test_inventory_free_strategy_is_batch_quoted():
+    calls = []
+
+    @register_strategy("test_band")
+    class Band(Strategy):
+        def quote(self, price, mid, vol, mom_sign, inventory):
+            calls.append(price)
+            return Quotes(round(mid - 0.04, 2), round(mid + 0.04, 2), 1.0, 1.0, "band")
+    try:
+        df = synthetic_minute(minutes=120, seed=7)
+        cfg = MMConfig(strategy="test_band", use_lob=False)
+        per_bar = Backtester(cfg).run(df)
+        n_per_bar = len(calls)
+        Band.uses_inventory = False
+        batched = Backtester(cfg).run(df)
+        assert len(calls) - n_per_bar == len(df)   # one quote_batch() pass, not one call per bar
+        assert (batched['logs']['reason'] == 'test_band').any()
+        cols = ['bid', 'ask', 'inventory', 'cash', 'equity']
+        assert batched['logs'][cols].equals(per_bar['logs'][cols])
+        assert batched['trades'].equals(per_bar['trades'])
+    finally:
+        STRATEGIES.pop("test_band")
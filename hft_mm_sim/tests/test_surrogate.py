@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import synthetic_minute
+from hft_mm_sim.surrogate import FillTable, calibrate_fill_table, load_fill_table
+
+def _cfg(**kw):
+    return MMConfig(mo_frac=0.05, **kw)
+
+def test_calibrated_table_decays_with_distance(tmp_path):
+    df = synthetic_minute(minutes=400, seed=3)
+    table = calibrate_fill_table(_cfg(), df, max_ticks=5, vol_buckets=3, volume_buckets=3, min_count=5)
+    assert table.stats['fill_prob'].shape == (2, 5, 3, 3, 3)
+    assert table.counts.sum() == 2 * 5 * table.meta['bars']
+    by_dist = table.to_frame().groupby('dist_ticks')['fill_prob'].mean()
+    assert by_dist.iloc[0] > 0.05 and by_dist.is_monotonic_decreasing
+    assert table.lookup('buy', 50, 0.001, 1000.0, 1) == (0.0, 0.0)   # beyond the ladder
+
+    path = str(tmp_path / "ft.json")
+    table.save(path)
+    loaded = load_fill_table(path)
+    assert load_fill_table(path) is loaded
+    for k, v in table.stats.items():
+        np.testing.assert_allclose(loaded.stats[k], v)
+    assert loaded.lookup('sell', 1, 0.001, 900.0, -1) == table.lookup('sell', 1, 0.001, 900.0, -1)
+
+def test_surrogate_fill_model_runs_on_the_ohlc_path(tmp_path):
+    df = synthetic_minute(minutes=300, seed=4)
+    path = str(tmp_path / "ft.json")
+    calibrate_fill_table(_cfg(), df, min_count=5).save(path)
+    cfg = _cfg(use_lob=False, fill_model='surrogate', surrogate_table=path)
+    res = Backtester(cfg).run(df)
+    trades = res['trades']
+    assert len(trades) > 0 and (trades['liquidity'] == 'maker').all()
+    assert (trades['fee'] <= 0).all()   # maker rebate
+    again = Backtester(cfg).run(df)['trades']
+    assert trades.equals(again)
+
+    with pytest.raises(ValueError):
+        Backtester(_cfg(use_lob=True, fill_model='surrogate', surrogate_table=path))
+    with pytest.raises(ValueError):
+        Backtester(_cfg(use_lob=False, fill_model='surrogate'))
+    with pytest.raises(ValueError):
+        Backtester(_cfg(use_lob=False, fill_model='queue'))
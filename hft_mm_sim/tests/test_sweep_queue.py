@@ -0,0 +1,49 @@
+import multiprocessing as mp
+import time
+from hft_mm_sim.sweep_queue import SweepQueue, run_worker
+
+def _square(payload):
+    return {'x': payload['x'], 'y': payload['x'] ** 2}
+
+def _worker(path):
+    run_worker(SweepQueue(path), _square, poll_sec=0.05, idle_exit_sec=0.5)
+
+def test_several_workers_drain_queue(tmp_path):
+    path = str(tmp_path / "q.sqlite")
+    q = SweepQueue(path)
+    q.enqueue([{'x': i} for i in range(40)])
+    procs = [mp.Process(target=_worker, args=(path,)) for _ in range(3)]
+    for p in procs: p.start()
+    for p in procs: p.join(timeout=60)
+    assert q.counts()['done'] == 40
+    assert sorted(r['result']['y'] for r in q.results()) == sorted(i ** 2 for i in range(40))
+
+def test_expired_lease_is_requeued(tmp_path):
+    q = SweepQueue(str(tmp_path / "q.sqlite"), lease_sec=0.1)
+    q.enqueue([{'x': 3}])
+    job_id, _ = q.claim("dead-worker")
+    assert q.claim("live-worker") is None  # still leased
+    time.sleep(0.2)
+    assert run_worker(q, _square, worker="live-worker", poll_sec=0.01, idle_exit_sec=0.05) == 1
+    # the dead worker coming back late cannot overwrite the result
+    assert not q.complete(job_id, "dead-worker", {'y': -1})
+    assert q.results()[0]['result']['y'] == 9
+
+def test_lease_expiry_counts_as_an_attempt(tmp_path):
+    q = SweepQueue(str(tmp_path / "q.sqlite"), lease_sec=0.05, max_attempts=2)
+    q.enqueue([{'x': 1}])
+    for w in ("w1", "w2"):
+        assert q.claim(w) is not None
+        time.sleep(0.1)   # the worker dies holding the lease
+    assert q.claim("w3") is None
+    assert q.counts()['failed'] == 1 and q.wait(poll_sec=0.01, timeout=1)['running'] == 0
+
+def test_results_are_scoped_to_a_sweep(tmp_path):
+    path = str(tmp_path / "q.sqlite")
+    q = SweepQueue(path)
+    q.enqueue([{'x': i} for i in range(3)], sweep="old")
+    run_worker(q, _square, poll_sec=0.01, idle_exit_sec=0.05)
+    q.enqueue([{'x': 10}], sweep="new")
+    run_worker(q, _square, poll_sec=0.01, idle_exit_sec=0.05)
+    assert [r['result']['y'] for r in q.results("new")] == [100]
+    assert q.counts("old")['done'] == 3 and len(q.results()) == 4
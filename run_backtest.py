@@ -1,16 +1,20 @@
 import os
+import json
 import argparse
 import pandas as pd
 
 from hft_mm_sim.config import MMConfig
-from hft_mm_sim.data import load_csv, synthetic_minute  # synthetic is used only if --csv missing
+from hft_mm_sim.data import load_csv, load_bars, validate_bars, synthetic_minute  # synthetic is used only if no data source
 from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.strategy import STRATEGIES
+from hft_mm_sim.segmented import run_segmented
+from hft_mm_sim.profiling import StageProfiler
+from hft_mm_sim.memory import MemoryTracker
+from hft_mm_sim.artifacts import ArtifactWriter, FORMATS
 from hft_mm_sim.analytics import (
-    save_equity_plot,
-    save_inventory_plot,
-    save_quotes_plot,
+    MAX_PLOT_POINTS,
+    render_run_plots,
     save_markouts_and_attribution,
-    plot_attribution_stacked,
 )
 
 def _print_df_info(df: pd.DataFrame, label: str):
@@ -29,6 +33,10 @@ def parse_args():
         default="",
         help="Path to 1m CSV with columns: time,open,high,low,close,volume",
     )
+    ap.add_argument("--catalog", type=str, default="", help="Dataset catalog root (instead of --csv)")
+    ap.add_argument("--symbol", type=str, default="", help="Symbol to load from --catalog")
+    ap.add_argument("--start", type=str, default="", help="First bar time to load (inclusive)")
+    ap.add_argument("--end", type=str, default="", help="Last bar time to load (inclusive)")
     ap.add_argument("--fee_bps", type=float, default=5.0)
     ap.add_argument("--latency_sec", type=int, default=30)
     ap.add_argument("--inv_cap", type=float, default=10.0)
@@ -36,7 +44,63 @@ def parse_args():
     ap.add_argument("--k_vol", type=float, default=0.5)
     ap.add_argument("--k_inv", type=float, default=0.02)
     ap.add_argument("--k_mom", type=float, default=0.05)
+    ap.add_argument("--dd_warmup_bars", type=int, default=0, help="Bars before the drawdown stop is armed")
+    ap.add_argument("--dd_capital", type=float, default=100.0,
+                    help="Account capital the drawdown stop measures against (equity = capital + PnL)")
+    ap.add_argument("--max_notional", type=float, default=0.0, help="Cap on |inventory x price| (0 = off)")
+    ap.add_argument("--max_fills", type=int, default=0, help="Fill-rate throttle: fills per --fill_window_bars (0 = off)")
+    ap.add_argument("--fill_window_bars", type=int, default=60)
     ap.add_argument("--high_activity", action="store_true", help="Apply high-activity trading preset")
+    ap.add_argument("--strategy", choices=sorted(STRATEGIES), default="market_maker",
+                    help="Quoting strategy (registered in hft_mm_sim.strategy)")
+    ap.add_argument("--mo_flow", choices=["uniform", "hawkes"], default="uniform",
+                    help="Market-order flow model for the LOB path")
+    ap.add_argument("--fill_model", choices=["lob", "touch", "surrogate"], default="lob",
+                    help="LOB simulator, OHLC high/low touch, or the OHLC path with a LOB-calibrated fill table")
+    ap.add_argument("--surrogate_table", type=str, default="artifacts/surrogate/fill_table.json",
+                    help="Fill table for --fill_model surrogate (scripts/calibrate_surrogate.py)")
+    ap.add_argument("--record_book", type=str, default="",
+                    help="Ring-buffer file for LOB snapshots per market order (read with scripts/book_snapshots.py)")
+    ap.add_argument("--record_capacity", type=int, default=1 << 20, help="Snapshots kept in --record_book")
+    ap.add_argument("--record_depth", type=int, default=5, help="Book levels per side in each snapshot")
+    ap.add_argument("--journal", type=str, default="",
+                    help="Binary event journal of every decision (inspect with scripts/replay_journal.py)")
+    ap.add_argument("--journal_index_every", type=int, default=256, help="Bars between sparse index entries")
+    ap.add_argument("--checkpoint", type=str, default="",
+                    help="Snapshot file; written every --checkpoint_every bars and at the end")
+    ap.add_argument("--checkpoint_every", type=int, default=0)
+    ap.add_argument("--resume", action="store_true",
+                    help="Continue from --checkpoint (after a crash, or over newly appended bars)")
+    ap.add_argument("--segments", type=int, default=1,
+                    help="Split history into K segments run in parallel (approximate, flat start per segment)")
+    ap.add_argument("--warmup_bars", type=int, default=500, help="Warm-up overlap per segment")
+    ap.add_argument("--compare_serial", action="store_true",
+                    help="With --segments, also run serially and report the divergence")
+    ap.add_argument("--dq_report", action="store_true",
+                    help="Validate the input bars and write data_quality.json to --outdir")
+    ap.add_argument("--compact_ledger", action="store_true",
+                    help="Net fills per bar/side/price/liquidity; cancel costs go to costs.csv")
+    ap.add_argument("--profile", action="store_true",
+                    help="Per-stage timers/counters; prints a report and writes profile.{csv,json,folded}")
+    ap.add_argument("--cprofile", type=str, default="",
+                    help="Also dump cProfile stats of the backtest to this .prof file")
+    ap.add_argument("--mem_track", action="store_true",
+                    help="Record RSS per pipeline stage; writes memory_report.csv")
+    ap.add_argument("--mem_trace", action="store_true",
+                    help="With --mem_track, also take tracemalloc snapshots (slow)")
+    ap.add_argument("--mem_budget_mb", type=float, default=0.0,
+                    help="Spill logs/trades to disk near this RSS and abort above it (implies --mem_track); "
+                         "covers the simulation loop, not the final result frames")
+    ap.add_argument("--artifact_format", choices=list(FORMATS), default="csv",
+                    help="Format for logs/trades/costs/mark-out tables (parquet/feather need pyarrow)")
+    ap.add_argument("--sync_io", action="store_true",
+                    help="Write artifact tables on the main thread instead of in the background")
+    ap.add_argument("--plots", choices=["now", "defer", "skip"], default="now",
+                    help="Render PNGs now, defer them to scripts/render_plots.py, or skip them")
+    ap.add_argument("--plot_procs", type=int, default=0,
+                    help="Processes for figure rendering (0 = one per figure, up to 4; 1 = serial)")
+    ap.add_argument("--plot_points", type=int, default=MAX_PLOT_POINTS,
+                    help="Max points per plotted series after min/max downsampling")
     ap.add_argument(
         "--outdir",
         type=str,
@@ -57,48 +121,158 @@ def main():
         k_vol=args.k_vol,
         k_inv=args.k_inv,
         k_mom=args.k_mom,
+        dd_warmup_bars=args.dd_warmup_bars,
+        dd_capital=args.dd_capital,
+        max_notional=args.max_notional,
+        max_fills=args.max_fills,
+        fill_window_bars=args.fill_window_bars,
+        mo_flow=args.mo_flow,
+        use_lob=args.fill_model == "lob",
+        fill_model="surrogate" if args.fill_model == "surrogate" else "touch",
+        surrogate_table=args.surrogate_table if args.fill_model == "surrogate" else "",
+        strategy=args.strategy,
+        compact_ledger=args.compact_ledger,
     )
     # after cfg = MMConfig(...):
     from hft_mm_sim.config import apply_high_activity_preset
     if args.high_activity:
         cfg = apply_high_activity_preset(cfg)
 
+    mem = None
+    if args.mem_track or args.mem_budget_mb > 0:
+        mem = MemoryTracker(budget_mb=args.mem_budget_mb or None, trace=args.mem_trace,
+                            spill_dir=os.path.join(args.outdir, "spill"))
+        mem.start()
+        mem.begin("load_data")
+
     # Load data
-    if args.csv and os.path.exists(args.csv):
-        df = load_csv(args.csv)
+    dq = None
+    if args.catalog:
+        df = load_bars(catalog=args.catalog, symbol=args.symbol,
+                       start=args.start or None, end=args.end or None)
+        _print_df_info(df, f"catalog {args.catalog} [{args.symbol}]")
+        if args.dq_report:
+            dq = validate_bars(df)
+    elif args.csv and os.path.exists(args.csv):
+        if args.dq_report:
+            df, dq = load_csv(args.csv, return_report=True)
+        else:
+            df = load_csv(args.csv)
+        if args.start or args.end:
+            df = df.loc[args.start or None:args.end or None]
         _print_df_info(df, f"loaded: {args.csv}")
     else:
         print("[WARN] --csv not provided or file missing; using synthetic minute data.")
         df = synthetic_minute(minutes=600, seed=cfg.seed)
         _print_df_info(df, "synthetic_minute")
+    if dq is not None:
+        os.makedirs(args.outdir, exist_ok=True)
+        with open(os.path.join(args.outdir, "data_quality.json"), "w") as f:
+            json.dump(dq, f, indent=2)
+        print(f"[INFO] data quality: {dq}")
 
     # Backtest
-    bt = Backtester(cfg)
-    res = bt.run(df)
+    profiler = StageProfiler() if args.profile else None
+    cprof = None
+    if args.cprofile:
+        import cProfile
+        cprof = cProfile.Profile()
+        cprof.enable()
+    ckpt = args.checkpoint or None
+    divergence = None
+    bt = None
+    journal = None
+    resume = bool(args.resume and ckpt and os.path.exists(ckpt))
+    if resume and args.segments <= 1:
+        bt = Backtester.load_checkpoint(ckpt)
+    if args.journal and args.segments <= 1:
+        from hft_mm_sim.journal import EventJournal
+        # on resume, drop whatever the crashed run journaled after its last checkpoint
+        journal = EventJournal(args.journal, index_every=args.journal_index_every, append=resume,
+                               truncate_to=bt.journal_records if bt is not None else None)
+    recorder = None
+    if args.record_book and args.segments <= 1:
+        from hft_mm_sim.book_recorder import BookRecorder
+        recorder = BookRecorder(args.record_book, capacity=args.record_capacity, depth=args.record_depth,
+                                ns_per_tick=60_000_000_000 // max(1, cfg.lob_ticks_per_bar))
+    if args.segments > 1:
+        res = run_segmented(cfg, df, args.segments, warmup_bars=args.warmup_bars,
+                            compare_serial=args.compare_serial)
+        divergence = res['divergence']
+    elif resume:
+        bt.attach_profiler(profiler)
+        bt.attach_recorder(recorder)
+        bt.attach_journal(journal)
+        bt.memory = mem
+        print(f"[INFO] resuming from {ckpt} (config taken from the checkpoint)")
+        res = bt.extend(df, checkpoint_path=ckpt, checkpoint_every=args.checkpoint_every)
+    else:
+        bt = Backtester(cfg, profiler=profiler, memory=mem)
+        bt.attach_recorder(recorder)
+        bt.attach_journal(journal)
+        res = bt.run(df, checkpoint_path=ckpt, checkpoint_every=args.checkpoint_every)
+    if journal is not None:
+        journal.close()
+        print(f"[INFO] {journal.n_records} journal records -> {args.journal}")
+    if recorder is not None:
+        recorder.close()
+        print(f"[INFO] {recorder.count} book snapshots -> {args.record_book} (ring of {recorder.capacity})")
+    if cprof is not None:
+        cprof.disable()
+        os.makedirs(os.path.dirname(args.cprofile) or ".", exist_ok=True)
+        cprof.dump_stats(args.cprofile)
+        print(f"[INFO] cProfile stats written to {args.cprofile} (view with snakeviz or python -m pstats)")
     logs: pd.DataFrame = res["logs"]
     trades: pd.DataFrame = res["trades"]
+    if "risk_blocks" in res:
+        print(f"[INFO] risk blocks: {res['risk_blocks']}")
 
     # Ensure outdir exists
     os.makedirs(args.outdir, exist_ok=True)
     plots_dir = os.path.join(args.outdir, "plots")
     os.makedirs(plots_dir, exist_ok=True)
 
-    # Save CSVs
-    logs.to_csv(os.path.join(args.outdir, "equity_curve.csv"))
-    trades.to_csv(os.path.join(args.outdir, "trades.csv"), index=False)
-    logs.to_csv(os.path.join(args.outdir, "logs.csv"), index=False)
+    if profiler is not None:
+        print(profiler.to_text())
+        profiler.save(args.outdir)
+
+    # Save tables (each once; serialized in the background while plots are drawn)
+    if mem is not None:
+        mem.begin("save_tables")
+    writer = ArtifactWriter(args.outdir, fmt=args.artifact_format, background=not args.sync_io)
+    writer.write("logs", logs, index=True)
+    writer.write("trades", trades)
+    if cfg.compact_ledger:
+        writer.write("costs", res["costs"])
+    if args.segments > 1:
+        writer.write("segments", res['segments'])
+        if divergence is not None:
+            writer.write("segment_divergence", pd.DataFrame([divergence]))
+            print(f"[INFO] segment divergence: {divergence}")
 
     # Plots + attribution
-    save_equity_plot(logs, plots_dir)
-    save_inventory_plot(logs, plots_dir)
-    save_quotes_plot(logs, plots_dir)
-    save_markouts_and_attribution(
-        logs, trades, plots_dir, horizons=MMConfig().markout_horizons
-    )
-    # Stacked PnL attribution (spread vs. markout vs. fees)
-    plot_attribution_stacked(
-        logs, os.path.join(plots_dir, "trades_with_markouts.csv"), plots_dir
+    if mem is not None:
+        mem.begin("plots_attribution")
+    markouts = save_markouts_and_attribution(
+        logs, trades, plots_dir, horizons=MMConfig().markout_horizons,
+        costs=res["costs"] if cfg.compact_ledger else None, writer=writer,
     )
+    if args.plots == "now":
+        # equity / inventory / quotes + stacked PnL attribution (spread vs. markout vs. fees)
+        render_run_plots(logs, plots_dir, markouts=markouts, max_points=args.plot_points,
+                         processes=args.plot_procs or None)
+    elif args.plots == "defer":
+        print(f"[INFO] plots deferred; render with: ./hftsim plots --artifacts {args.outdir}")
+    if mem is not None:
+        mem.begin("flush_tables")
+    writer.close()
+
+    if mem is not None:
+        mem.stop()
+        mem.save(args.outdir)
+        print(mem.report().to_string(index=False))
+        if bt is not None:
+            bt.discard_spill()
 
     # Summary
     n_logs = 0 if logs is None else len(logs)
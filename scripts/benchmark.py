@@ -0,0 +1,196 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse, json, platform, statistics, subprocess, tempfile, time
+import numpy as np, pandas as pd
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import load_csv
+from hft_mm_sim.features import add_features
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.lob import LimitOrderBook
+
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+
+# The bar-by-bar engines are far slower per bar than the vectorized stages, so they are
+# capped unless --no_cap is given; skipped cases are still listed in the JSON.
+ENGINE_CAP = {'backtest_ohlc': 1_000_000, 'backtest_lob': 10_000}
+
+# Process start-up of the CLI up to argument parsing: the bare dispatcher, and the headless
+# run path (everything `hftsim run` imports before doing work, i.e. no matplotlib).
+HFTSIM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hftsim')
+COLD_START_TARGET_S = {'--help': 0.1, 'run --help': 1.0}
+
+def make_bars(n: int, seed: int = 0, start_price: float = 100.0) -> pd.DataFrame:
+    """Vectorized synthetic minute bars (random walk) for benchmark fixtures."""
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-01', periods=n, freq='1min', name='time')
+    close = start_price * np.exp(np.cumsum(0.0008 * rng.standard_normal(n)))
+    spread = np.abs(0.0024 * rng.standard_normal((2, n)))
+    high, low = close * (1 + spread[0]), close * (1 - spread[1])
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    volume = np.maximum(1.0, rng.normal(1000, 200, n))
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=idx)
+
+def timeit(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+def _fixture_csv(n: int, cache_dir: str) -> str:
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f'bars_{n}.csv')
+    if not os.path.exists(path):
+        make_bars(n).to_csv(path)
+    return path
+
+def bench_book(levels: int, n_ours: int, n_mo: int = 20_000, seed: int = 0):
+    """process_market_order throughput for a given ladder depth and number of our resting orders."""
+    rng = np.random.default_rng(seed)
+    sides = np.where(rng.random(n_mo) < 0.5, 'buy', 'sell')
+    sizes = rng.exponential(10.0, n_mo)
+
+    def top_up(book):
+        # background depth back to target, our orders back to n_ours spread over the levels
+        book.replenish(8.0, 0.75)
+        k = len(book.our_order_ids())
+        while k < n_ours:
+            lvl = (k // 2) % levels
+            side = 'buy' if k % 2 == 0 else 'sell'
+            ladder = book.bids if side == 'buy' else book.asks
+            book.place_limit(side, ladder[lvl][0], 1.0)
+            k += 1
+
+    def run():
+        book = LimitOrderBook(100.0, 0.01, levels, 8.0, 0.75)
+        for i, (side, q) in enumerate(zip(sides, sizes)):
+            if i % 100 == 0:  # one bar's worth of micro-ticks
+                top_up(book)
+            book.process_market_order(side, q, t=0)
+    return run, n_mo
+
+def run_suite(sizes, repeat: int, no_cap: bool, cache_dir: str, only=None) -> list:
+    results = []
+    def selected(name):
+        return not only or any(name.startswith(o) for o in only)
+
+    def record(name, size, params, fn, items, skipped=False):
+        if not selected(name):
+            return
+        row = {'name': name, 'size': size, 'params': params}
+        if skipped:
+            row['skipped'] = True
+        else:
+            best, med = timeit(fn, repeat)
+            row.update({'repeat': repeat, 'best_s': best, 'median_s': med,
+                        'per_item_us': best / max(1, items) * 1e6})
+            print(f"{name:<28} size={size:<9} {json.dumps(params):<32} best={best:.4f}s median={med:.4f}s")
+        results.append(row)
+
+    cfg = MMConfig()
+    for label in sizes:
+        n = SIZES[label]
+        df = make_bars(n)
+        feat = add_features(df, cfg.vol_lookback, cfg.mom_lookback)
+
+        if selected('load_csv'):
+            path = _fixture_csv(n, cache_dir)
+            record('load_csv', label, {}, lambda: load_csv(path), n)
+        record('add_features', label, {}, lambda: add_features(df, cfg.vol_lookback, cfg.mom_lookback), n)
+
+        for name, use_lob in (('backtest_ohlc', False), ('backtest_lob', True)):
+            capped = n > ENGINE_CAP[name] and not no_cap
+            bcfg = MMConfig(use_lob=use_lob)
+            record(name, label, {'use_lob': use_lob}, lambda: Backtester(bcfg).run(df), n, skipped=capped)
+
+        # analytics over a realistic-looking run: synthetic logs + one trade every few bars
+        logs = feat[['close', 'mid']].rename(columns={'close': 'price_ref'})
+        logs['equity'] = np.cumsum(np.random.default_rng(1).standard_normal(n))
+        k = max(1, n // 4)
+        trades = pd.DataFrame({'time': feat.index[::4][:k],
+                               'side': np.where(np.arange(k) % 2 == 0, 'buy', 'sell'),
+                               'price': feat['close'].to_numpy()[::4][:k],
+                               'qty': 1.0, 'fee': 0.01, 'liquidity': 'maker'})
+        with tempfile.TemporaryDirectory() as tmp:
+            from hft_mm_sim.analytics import save_markouts_and_attribution
+            record('save_markouts_and_attribution', label, {'trades': k},
+                   lambda: save_markouts_and_attribution(logs, trades, tmp, horizons=cfg.markout_horizons), k)
+
+    for argv in COLD_START_TARGET_S:
+        record('cli_cold_start', '1', {'argv': argv},
+               lambda: subprocess.run([sys.executable, HFTSIM, *argv.split()], capture_output=True, check=True), 1)
+        row = results[-1] if results and results[-1]['name'] == 'cli_cold_start' else None
+        if row is not None and row['best_s'] > COLD_START_TARGET_S[argv]:
+            print(f"[WARN] hftsim {argv}: {row['best_s']:.2f}s cold start, target {COLD_START_TARGET_S[argv]:.2f}s")
+
+    for levels in (10, 50):
+        for n_ours in (2, 20, 200):
+            fn, items = bench_book(levels, n_ours)
+            record('book_process_market_order', f'{items}', {'levels': levels, 'ours': n_ours}, fn, items)
+    return results
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'numpy': np.__version__, 'pandas': pd.__version__}
+
+def _key(r: dict) -> str:
+    return f"{r['name']}|{r['size']}|{json.dumps(r['params'], sort_keys=True)}"
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Print per-case speed ratios; return 1 if any case got slower by more than `threshold`."""
+    with open(base_path) as f: base = {_key(r): r for r in json.load(f)['results'] if 'best_s' in r}
+    with open(new_path) as f: new = {_key(r): r for r in json.load(f)['results'] if 'best_s' in r}
+    regressions = 0
+    for k in sorted(base.keys() & new.keys()):
+        ratio = new[k]['best_s'] / max(1e-12, base[k]['best_s'])
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  faster'
+        print(f"{k:<72} {base[k]['best_s']:.4f}s -> {new[k]['best_s']:.4f}s  x{ratio:.2f}{flag}")
+    for k in sorted(base.keys() - new.keys()):
+        print(f"{k:<72} missing in {new_path}")
+    print(f"{regressions} regression(s) above {threshold:.0%}")
+    return 1 if regressions else 0
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks for engine, book, loader and analytics hot paths")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    r = sub.add_parser('run')
+    r.add_argument('--sizes', default='10k', help="comma list of 10k,1m,10m")
+    r.add_argument('--repeat', type=int, default=3)
+    r.add_argument('--only', default='', help="comma list of benchmark name prefixes")
+    r.add_argument('--no_cap', action='store_true', help="run bar-by-bar engines at every size")
+    r.add_argument('--cache_dir', default='artifacts/bench_cache', help="where fixture CSVs are kept")
+    r.add_argument('--out', default='artifacts/bench.json')
+    c = sub.add_parser('compare')
+    c.add_argument('base')
+    c.add_argument('new')
+    c.add_argument('--threshold', type=float, default=0.10, help="allowed slowdown fraction")
+    args = ap.parse_args()
+
+    if args.cmd == 'compare':
+        raise SystemExit(compare(args.base, args.new, args.threshold))
+
+    sizes = [s.strip().lower() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        raise SystemExit(f"Unknown sizes {unknown}; choose from {list(SIZES)}")
+    only = [o.strip() for o in args.only.split(',') if o.strip()] or None
+    results = run_suite(sizes, args.repeat, args.no_cap, args.cache_dir, only)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump({'meta': _meta(), 'results': results}, f, indent=2, default=str)
+    print(f"Wrote {len(results)} results to {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+from hft_mm_sim.book_recorder import BookReader
+
+def main():
+    ap = argparse.ArgumentParser(description="Slice LOB snapshots recorded with run_backtest.py --record_book")
+    ap.add_argument("path", help="Snapshot ring file")
+    ap.add_argument("--start", default="", help="First time to include")
+    ap.add_argument("--end", default="", help="Last time to include")
+    ap.add_argument("--bars", default="", help="Global bar index or range, e.g. 120 or 120-130 (instead of --start/--end)")
+    ap.add_argument("--fills_only", action="store_true", help="Keep only market orders that hit our orders")
+    ap.add_argument("--out", default="", help="Write CSV here instead of printing")
+    args = ap.parse_args()
+
+    reader = BookReader(args.path)
+    if args.bars:
+        first, _, last = args.bars.partition('-')
+        recs = reader.bars(int(first), int(last) if last else None)
+    else:
+        recs = reader.slice(args.start or None, args.end or None)
+    if args.fills_only:
+        recs = recs[recs['our_fill'] > 0]
+    frame = reader.frame(recs)
+    print(f"[INFO] {len(frame)} of {len(reader)} snapshots (ring capacity {reader.capacity}, {reader.count} written)")
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        frame.to_csv(args.out, index=False)
+        print(f"[INFO] wrote {args.out}")
+    else:
+        print(frame.to_string(index=False, max_rows=60))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+from dataclasses import replace
+from time import perf_counter
+import pandas as pd
+from hft_mm_sim.config import MMConfig
+from hft_mm_sim.data import load_bars, synthetic_minute
+from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.surrogate import calibrate_fill_table
+
+def _summary(name: str, cfg: MMConfig, df: pd.DataFrame) -> dict:
+    t0 = perf_counter()
+    res = Backtester(cfg).run(df)
+    logs, trades = res['logs'], res['trades']
+    secs = perf_counter() - t0
+    qty = float(trades['qty'].sum()) if not trades.empty else 0.0
+    return {'model': name, 'seconds': round(secs, 3), 'bars_per_s': round(len(df) / max(secs, 1e-9)),
+            'fills': int((trades['qty'] > 0).sum()) if not trades.empty else 0, 'filled_qty': round(qty, 3),
+            'final_equity': float(logs['equity'].iloc[-1]) if len(logs) else 0.0}
+
+def main():
+    ap = argparse.ArgumentParser(description="Fit the surrogate fill table from offline LOB simulations")
+    ap.add_argument("--csv", default="")
+    ap.add_argument("--catalog", default="")
+    ap.add_argument("--symbol", default="")
+    ap.add_argument("--start", default="")
+    ap.add_argument("--end", default="")
+    ap.add_argument("--minutes", type=int, default=2000, help="Synthetic bars without --csv/--catalog")
+    ap.add_argument("--max_bars", type=int, default=0, help="Calibrate on at most this many (evenly spaced) bars")
+    ap.add_argument("--max_ticks", type=int, default=0, help="Ladder depth to probe (default: lob_levels)")
+    ap.add_argument("--vol_buckets", type=int, default=4)
+    ap.add_argument("--volume_buckets", type=int, default=4)
+    ap.add_argument("--min_count", type=int, default=20, help="Samples per cell before backing off to a marginal")
+    ap.add_argument("--mo_flow", choices=["uniform", "hawkes"], default="uniform")
+    ap.add_argument("--mo_frac", type=float, default=MMConfig.mo_frac, help="Share of bar volume sent as MOs")
+    ap.add_argument("--latency_sec", type=int, default=MMConfig.latency_sec)
+    ap.add_argument("--dd_stop", type=float, default=MMConfig.dd_stop)
+    ap.add_argument("--no_compare", action="store_true", help="Skip the LOB / touch / surrogate timing comparison")
+    ap.add_argument("--out", default="artifacts/surrogate/fill_table.json")
+    args = ap.parse_args()
+
+    df = load_bars(csv=args.csv, catalog=args.catalog, symbol=args.symbol,
+                   start=args.start or None, end=args.end or None)
+    if df is None:
+        print("[WARN] --csv/--catalog not provided or missing; using synthetic minute data.")
+        df = synthetic_minute(minutes=args.minutes, seed=42)
+    cfg = MMConfig(mo_flow=args.mo_flow, mo_frac=args.mo_frac, latency_sec=args.latency_sec,
+                   dd_stop=args.dd_stop)
+
+    t0 = perf_counter()
+    table = calibrate_fill_table(cfg, df, max_ticks=args.max_ticks or None, vol_buckets=args.vol_buckets,
+                                 volume_buckets=args.volume_buckets, min_count=args.min_count,
+                                 max_bars=args.max_bars or None)
+    table.save(args.out)
+    frame = table.to_frame()
+    frame.to_csv(os.path.splitext(args.out)[0] + ".csv", index=False)
+    print(f"[INFO] calibrated on {table.meta['bars']} bars in {perf_counter() - t0:.1f}s -> {args.out}")
+    by_dist = frame[frame['n'] > 0].groupby(['side', 'dist_ticks'])[['fill_prob', 'fill_frac', 'depletion']].mean()
+    print(by_dist.round(3).to_string())
+
+    if not args.no_compare:
+        rows = [_summary('lob', cfg, df),
+                _summary('touch', replace(cfg, use_lob=False), df),
+                _summary('surrogate', replace(cfg, use_lob=False, fill_model='surrogate',
+                                              surrogate_table=args.out), df)]
+        print(pd.DataFrame(rows).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,39 @@
-import argparse, os, time
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
 import pandas as pd
 import ccxt
-
-def fetch_ohlcv_all(exchange, symbol, timeframe='1m', since=None, limit=1000, max_batches=1000, sleep_s=0.2):
-    all_rows = []
-    now = exchange.milliseconds()
-    if since is None:
-        # ~ last 24h default if no since; but we’ll iterate forward
-        since = now - 24 * 60 * 60 * 1000
-
-    for _ in range(max_batches):
-        batch = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
-        if not batch:
-            break
-        all_rows += batch
-        # advance 'since'
-        since = batch[-1][0] + 1
-        time.sleep(sleep_s)
-        # safety stop (about 30 days for 1m * 1000 * batches)
-        if len(all_rows) >= limit * max_batches:
-            break
-    return all_rows
+from hft_mm_sim.catalog import BarCatalog
+from hft_mm_sim.downloader import IncrementalDownloader, MS_PER_DAY
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--symbol", default="BTC/USDT")  # Binance symbol
+    ap.add_argument("--symbol", default="BTC/USDT", help="Binance symbol(s), comma separated")
     ap.add_argument("--timeframe", default="1m")
-    ap.add_argument("--out", default="data/BTC-USD_1m.csv")  # we’ll write in your required schema
-    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--days", type=int, default=7, help="History to keep; already stored days are skipped")
+    ap.add_argument("--catalog", default="data/catalog")
+    ap.add_argument("--rate", type=float, default=5.0, help="Max requests per second across all workers")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--out", default="", help="Also export the first symbol's range to this CSV")
     args = ap.parse_args()
 
-    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
-
-    ex = ccxt.binance()
-    ms_per_day = 24*60*60*1000
-    since = ex.milliseconds() - args.days * ms_per_day
-
-    rows = fetch_ohlcv_all(ex, args.symbol, timeframe=args.timeframe, since=since, limit=1000)
-    if not rows:
-        raise SystemExit("No OHLCV returned. Try fewer days or different symbol.")
-
-    df = pd.DataFrame(rows, columns=["time","open","high","low","close","volume"])
-    df["time"] = pd.to_datetime(df["time"], unit="ms")
-    # ensure numeric
-    for c in ["open","high","low","close","volume"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    df = df.dropna().sort_values("time")
-
-    df.to_csv(args.out, index=False)
-    print(f"Wrote {len(df)} rows to {args.out} with columns {list(df.columns)}")
+    symbols = [s.strip() for s in args.symbol.split(",") if s.strip()]
+    ex = ccxt.binance({"enableRateLimit": False})  # throttled by our own token bucket
+    cat = BarCatalog(args.catalog)
+    dl = IncrementalDownloader(ex, cat, timeframe=args.timeframe, rate=args.rate,
+                               burst=max(1, int(args.rate)), workers=args.workers)
+    now = ex.milliseconds()
+    since = now - args.days * MS_PER_DAY
+    written = dl.sync(symbols, since_ms=since, until_ms=now)
+    for sym, n in written.items():
+        print(f"{sym}: {n} new rows -> {args.catalog} (last bar {cat.last_timestamp(sym)})")
+    print(f"{dl.requests} requests")
+
+    if args.out:
+        df = cat.load(symbols[0], start=pd.Timestamp(since, unit="ms"))
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        df.reset_index().to_csv(args.out, index=False)
+        print(f"Wrote {len(df)} rows to {args.out} with columns {['time'] + list(df.columns)}")
 
 if __name__ == "__main__":
     main()
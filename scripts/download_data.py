@@ -1,3 +1,5 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import argparse
 import pandas as pd
 from datetime import datetime, timedelta
@@ -21,14 +23,22 @@ def main():
     ap.add_argument('--start', required=True)
     ap.add_argument('--end', required=True)
     ap.add_argument('--interval', default='1m')
-    ap.add_argument('--out', required=True)
+    ap.add_argument('--out', default='')
+    ap.add_argument('--catalog', default='', help="Write into this dataset catalog instead of --out CSV")
     args = ap.parse_args()
+    if not args.out and not args.catalog:
+        ap.error("one of --out or --catalog is required")
 
     try:
         df = try_yfinance(args.symbol, args.start, args.end, args.interval)
     except Exception as e:
         raise SystemExit(f"yfinance download failed: {e}")
 
+    if args.catalog:
+        from hft_mm_sim.catalog import BarCatalog
+        n = BarCatalog(args.catalog).write(args.symbol, df.set_index('time'))
+        print(f"Wrote {len(df)} rows for {args.symbol} to catalog {args.catalog} ({n} day partitions)")
+        return
     df.to_csv(args.out, index=False)
     print(f"Wrote {len(df)} rows to {args.out}")
 
@@ -1,4 +1,6 @@
-import argparse, os
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
 import pandas as pd
 import yfinance as yf
 
@@ -8,10 +10,9 @@ def main():
     ap.add_argument("--period", default="5d")       # 1m supports ~5-7 days
     ap.add_argument("--interval", default="1m")     # try 1h if 1m is empty
     ap.add_argument("--out", default="data/BTC-USD_1m.csv")
+    ap.add_argument("--catalog", default="", help="Write into this dataset catalog instead of --out CSV")
     args = ap.parse_args()
 
-    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
-
     df = yf.download(args.symbol, period=args.period, interval=args.interval, progress=False)
     if df is None or df.empty:
         raise SystemExit("Downloaded DataFrame is empty. Try different --period/--interval.")
@@ -52,6 +53,12 @@ def main():
     if df.empty:
         raise SystemExit("All rows dropped after cleaning. Try --period 3d or --interval 1h.")
 
+    if args.catalog:
+        from hft_mm_sim.catalog import BarCatalog
+        n = BarCatalog(args.catalog).write(args.symbol, df.set_index("time"))
+        print(f"Wrote {len(df)} rows for {args.symbol} to catalog {args.catalog} ({n} day partitions)")
+        return
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
     df.to_csv(args.out, index=False)
     print(f"Wrote {len(df)} rows to {args.out} with columns {list(df.columns)}")
 
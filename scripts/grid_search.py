@@ -1,9 +1,16 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import itertools, os, argparse, numpy as np, pandas as pd
-from hft_mm_sim.config import MMConfig
-from hft_mm_sim.data import load_csv, synthetic_minute
+import itertools, argparse, time, numpy as np, pandas as pd
+from hft_mm_sim.config import MMConfig, config_to_dict, config_from_dict
+from hft_mm_sim.data import load_bars, synthetic_minute
 from hft_mm_sim.backtester import Backtester
+from hft_mm_sim.sweep_queue import SweepQueue, run_worker
+
+GRID = {
+    'k_vol': [0.3, 0.5, 0.8],
+    'k_inv': [0.01, 0.02, 0.05],
+    'latency_sec': [0, 30, 60]
+}
 
 def summarize(logs: pd.DataFrame):
     if logs.empty or 'equity' not in logs:
@@ -15,31 +22,75 @@ def summarize(logs: pd.DataFrame):
     max_dd = (eq.cummax() - eq).max()
     return {'final_equity': float(eq.iloc[-1]), 'sharpe': float(sharpe), 'max_drawdown': float(max_dd)}
 
+def load_data(csv: str, catalog: str = '', symbol: str = '', start=None, end=None) -> pd.DataFrame:
+    df = load_bars(csv=csv, catalog=catalog, symbol=symbol, start=start, end=end)
+    return df if df is not None else synthetic_minute(minutes=600, seed=42)
+
+def grid_configs():
+    for k_vol, k_inv, latency in itertools.product(GRID['k_vol'], GRID['k_inv'], GRID['latency_sec']):
+        yield {'k_vol': k_vol, 'k_inv': k_inv, 'latency_sec': latency}, MMConfig(k_vol=k_vol, k_inv=k_inv, latency_sec=latency)
+
+_DATA_CACHE = {}
+
+def run_job(payload: dict) -> dict:
+    """Worker side: one queued grid point -> summary row (data is loaded once per worker)."""
+    src = tuple(payload.get(k) or '' for k in ('csv', 'catalog', 'symbol')) + \
+        tuple(payload.get(k) or None for k in ('start', 'end'))
+    if src not in _DATA_CACHE:
+        _DATA_CACHE[src] = load_data(*src)
+    res = Backtester(config_from_dict(payload['cfg'])).run(_DATA_CACHE[src])
+    summ = summarize(res['logs'])
+    summ.update(payload['params'])
+    summ['trades'] = len(res['trades'])
+    return summ
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--csv', type=str, default='')
+    ap.add_argument('--catalog', type=str, default='', help="Dataset catalog root (instead of --csv)")
+    ap.add_argument('--symbol', type=str, default='')
+    ap.add_argument('--start', type=str, default='')
+    ap.add_argument('--end', type=str, default='')
     ap.add_argument('--outcsv', type=str, default='artifacts/grid_search.csv')
+    ap.add_argument('--role', choices=['local', 'coordinator', 'worker'], default='local',
+                    help="local: run in-process; coordinator: enqueue grid + collect; worker: drain queue")
+    ap.add_argument('--queue', type=str, default='artifacts/sweep_queue.sqlite',
+                    help="SQLite queue file (put it on shared storage for multi-node runs)")
+    ap.add_argument('--lease_sec', type=float, default=300.0)
+    ap.add_argument('--idle_exit_sec', type=float, default=30.0, help="worker exits after this long with no jobs")
     args = ap.parse_args()
 
-    if args.csv and os.path.exists(args.csv):
-        df = load_csv(args.csv)
+    if args.role == 'worker':
+        n = run_worker(SweepQueue(args.queue, lease_sec=args.lease_sec), run_job,
+                       idle_exit_sec=args.idle_exit_sec)
+        print(f"Worker finished {n} jobs from {args.queue}")
+        return
+
+    if args.role == 'coordinator':
+        os.makedirs(os.path.dirname(args.queue) or ".", exist_ok=True)
+        q = SweepQueue(args.queue, lease_sec=args.lease_sec)
+        # the queue file may hold earlier sweeps: collect only this one's rows
+        sweep = f"grid-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        n = q.enqueue([{'csv': os.path.abspath(args.csv) if args.csv else '',
+                        'catalog': os.path.abspath(args.catalog) if args.catalog else '',
+                        'symbol': args.symbol, 'start': args.start, 'end': args.end,
+                        'cfg': config_to_dict(cfg), 'params': params}
+                       for params, cfg in grid_configs()], sweep=sweep)
+        print(f"Enqueued {n} jobs to {args.queue} as sweep {sweep}; waiting for workers...")
+        counts = q.wait(sweep=sweep)
+        rows = [r['result'] for r in q.results(sweep)]
+        if counts['failed']:
+            print(f"[WARN] {counts['failed']} jobs failed")
     else:
-        df = synthetic_minute(minutes=600, seed=42)
-
-    grid = {
-        'k_vol': [0.3, 0.5, 0.8],
-        'k_inv': [0.01, 0.02, 0.05],
-        'latency_sec': [0, 30, 60]
-    }
-
-    rows = []
-    for k_vol, k_inv, latency in itertools.product(grid['k_vol'], grid['k_inv'], grid['latency_sec']):
-        cfg = MMConfig(k_vol=k_vol, k_inv=k_inv, latency_sec=latency)
-        bt = Backtester(cfg)
-        res = bt.run(df)
-        summ = summarize(res['logs'])
-        summ.update({'k_vol': k_vol, 'k_inv': k_inv, 'latency_sec': latency, 'trades': len(res['trades'])})
-        rows.append(summ)
+        df = load_data(args.csv, args.catalog, args.symbol, args.start or None, args.end or None)
+        rows = []
+        for params, cfg in grid_configs():
+            bt = Backtester(cfg)
+            res = bt.run(df)
+            summ = summarize(res['logs'])
+            summ.update(params)
+            summ['trades'] = len(res['trades'])
+            rows.append(summ)
 
     os.makedirs(os.path.dirname(args.outcsv), exist_ok=True)
     pd.DataFrame(rows).to_csv(args.outcsv, index=False)
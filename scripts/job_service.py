@@ -0,0 +1,34 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse, ipaddress
+from hft_mm_sim.jobs import JobService, make_server
+
+def main():
+    ap = argparse.ArgumentParser(description="Local HTTP service that queues and runs backtest jobs")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--root", default="artifacts/jobs", help="Job directories (artifacts + cached results)")
+    ap.add_argument("--processes", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    ap.add_argument("--max_queued", type=int, default=1000)
+    args = ap.parse_args()
+    try:
+        local = ipaddress.ip_address(args.host).is_loopback
+    except ValueError:
+        local = args.host == "localhost"
+    if not local:
+        ap.error("the job service only binds to a loopback address")
+
+    service = JobService(args.root, processes=args.processes, max_queued=args.max_queued)
+    server = make_server(service, args.host, args.port)
+    print(f"[INFO] job service on http://{args.host}:{server.server_address[1]} "
+          f"({args.processes} workers, {len(service.jobs)} cached jobs in {args.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
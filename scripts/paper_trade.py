@@ -0,0 +1,69 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse, asyncio
+import pandas as pd
+from hft_mm_sim.config import MMConfig, apply_high_activity_preset
+from hft_mm_sim.data import load_bars, synthetic_minute
+from hft_mm_sim.paper import PaperTrader, ReplayServer
+from hft_mm_sim.artifacts import ArtifactWriter, FORMATS
+
+def _replay_df(args) -> pd.DataFrame:
+    df = load_bars(csv=args.csv, catalog=args.catalog, symbol=args.symbol,
+                   start=args.start or None, end=args.end or None)
+    return df if df is not None else synthetic_minute(minutes=600, seed=42)
+
+async def _main(args):
+    server = None
+    if args.mode in ('serve', 'replay'):
+        server = ReplayServer(_replay_df(args), host=args.host, port=args.port, speed=args.speed)
+        port = await server.start()
+        print(f"[INFO] replay feed on {args.host}:{port} at {args.speed}x")
+        if args.mode == 'serve':
+            await server.serve_forever()
+            return
+    else:
+        port = args.port
+
+    cfg = MMConfig(use_lob=not args.ohlc, dd_stop=args.dd_stop)
+    if args.high_activity:
+        cfg = apply_high_activity_preset(cfg)
+    trader = PaperTrader(cfg, latency_budget_ms=args.budget_ms)
+    try:
+        res = await trader.run_stream(args.host, port)
+    finally:
+        if server is not None:
+            await server.close()
+
+    with ArtifactWriter(args.outdir, fmt=args.artifact_format) as w:
+        w.write("logs", res["logs"], index=True)
+        w.write("trades", res["trades"])
+        w.write("latency_summary", trader.latency_report())
+        w.write("latency_histogram", trader.tick_to_quote.to_frame())
+    print(trader.latency_report().to_string(index=False))
+    print(f"Finished. {len(res['trades'])} trades over {len(res['logs'])} bars -> {args.outdir}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Paper-trade the market maker against a live or replayed bar feed")
+    ap.add_argument("--mode", choices=["replay", "serve", "connect"], default="replay",
+                    help="replay: local feed + trader in one process; serve: feed only; connect: trader only")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=0, help="Feed port (0 = any free port for replay/serve)")
+    ap.add_argument("--csv", default="")
+    ap.add_argument("--catalog", default="")
+    ap.add_argument("--symbol", default="")
+    ap.add_argument("--start", default="")
+    ap.add_argument("--end", default="")
+    ap.add_argument("--speed", type=float, default=60.0, help="Replay speed multiple (0 = as fast as possible)")
+    ap.add_argument("--budget_ms", type=float, default=50.0, help="Tick-to-quote latency budget")
+    ap.add_argument("--ohlc", action="store_true", help="Use the OHLC next-bar fill model instead of the LOB")
+    ap.add_argument("--dd_stop", type=float, default=MMConfig.dd_stop)
+    ap.add_argument("--high_activity", action="store_true")
+    ap.add_argument("--artifact_format", choices=list(FORMATS), default="csv")
+    ap.add_argument("--outdir", default="artifacts/paper")
+    args = ap.parse_args()
+    if args.mode == "connect" and not args.port:
+        ap.error("--port is required with --mode connect")
+    asyncio.run(_main(args))
+
+if __name__ == "__main__":
+    main()
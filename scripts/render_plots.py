@@ -0,0 +1,27 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+from hft_mm_sim.artifacts import read_table
+from hft_mm_sim.analytics import MAX_PLOT_POINTS, RUN_PLOTS, render_run_plots
+
+def main():
+    ap = argparse.ArgumentParser(description="Render run plots from saved artifacts (e.g. after --plots defer)")
+    ap.add_argument("--artifacts", default="artifacts")
+    ap.add_argument("--plots", default="equity,inventory,quotes", help=f"Comma list from {sorted(RUN_PLOTS)}")
+    ap.add_argument("--plot_points", type=int, default=MAX_PLOT_POINTS)
+    ap.add_argument("--procs", type=int, default=0, help="0 = one process per figure (up to 4); 1 = serial")
+    args = ap.parse_args()
+
+    logs = read_table(args.artifacts, "logs")
+    if logs is None:
+        raise SystemExit(f"No logs table in {args.artifacts}")
+    if "time" in logs.columns:
+        logs = logs.set_index("time")
+    markouts = read_table(args.artifacts, "plots/trades_with_markouts")
+    plots_dir = os.path.join(args.artifacts, "plots")
+    render_run_plots(logs, plots_dir, markouts=markouts, plots=[p for p in args.plots.split(",") if p],
+                     max_points=args.plot_points, processes=args.procs or None)
+    print(f"Wrote plots to {plots_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse, json
+from time import perf_counter
+from hft_mm_sim.journal import JournalReader, build_index, diff_journals
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect and verify an event journal written with run_backtest.py --journal")
+    ap.add_argument("path", help="Journal file")
+    ap.add_argument("--bar", type=int, action="append", default=[],
+                    help="Rebuild the state at the end of this bar (via the sparse index) and list its events; repeatable")
+    ap.add_argument("--verify", action="store_true",
+                    help="Sequential pass: replay every fill and check it against each bar's recorded state")
+    ap.add_argument("--compare", default="", help="Another journal of the same run; report the first divergence")
+    ap.add_argument("--reindex", type=int, default=0, help="Rebuild the sparse index every N bars")
+    args = ap.parse_args()
+
+    if args.reindex:
+        idx = build_index(args.path, args.reindex)
+        print(f"[INFO] rebuilt {args.path}.idx with {len(idx)} entries")
+    reader = JournalReader(args.path)
+    print(f"[INFO] {len(reader)} records, {len(reader.index)} index entries, reasons: {', '.join(reader.reasons)}")
+
+    for bar in args.bar:
+        t0 = perf_counter()
+        state = reader.state_at(bar)
+        ms = (perf_counter() - t0) * 1e3
+        print(f"[INFO] bar {bar} state ({ms:.1f} ms): {json.dumps(state, default=str)}")
+        print(reader.events(bar).to_string(index=False, max_rows=60))
+
+    status = 0
+    if args.verify:
+        t0 = perf_counter()
+        res = reader.verify()
+        print(f"[INFO] verify ({perf_counter() - t0:.2f}s): {json.dumps(res)}")
+        if not res['ok']:
+            print(f"[WARN] replay diverges from the journal at bar {res['first_mismatch']['bar']}")
+            status = 1
+    if args.compare:
+        d = diff_journals(args.path, args.compare)
+        if d is None:
+            print(f"[INFO] {args.compare} is identical: the run is deterministic")
+        else:
+            print(f"[WARN] journals diverge at record {d['record']}:\n  a: {d['a']}\n  b: {d['b']}")
+            status = 1
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
-import argparse, os, json
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse, json
 import pandas as pd
+from hft_mm_sim.artifacts import find_table, read_table
 
 TEMPLATE = """# HFT Market-Making Simulation — Report
 
@@ -17,29 +20,33 @@ TEMPLATE = """# HFT Market-Making Simulation — Report
   - `plots/heatmap_equity_slip_latency.png`
 
 ## Files
-- Logs: `equity_curve.csv`
-- Trades: `trades.csv`
-- Walk-Forward: `walk_forward.csv` (if run)
-- Stress: `stress_results.csv` (if run)
-- Attribution Summary: `plots/attribution_summary.csv`
+{files_list}
 """
 
+FILES = [('Logs', 'logs'), ('Trades', 'trades'), ('Trade Mark-outs', 'plots/trades_with_markouts'),
+         ('Walk-Forward', 'walk_forward'), ('Stress', 'stress_results'),
+         ('Attribution Summary', 'plots/attribution_summary')]
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--artifacts", default="artifacts")
     ap.add_argument("--out", default="artifacts/report.md")
     args = ap.parse_args()
 
-    plots_dir = os.path.join(args.artifacts, "plots")
-    metrics_path = os.path.join(plots_dir, "metrics.csv")
-
-    if os.path.exists(metrics_path):
-        m = pd.read_csv(metrics_path)
+    m = read_table(args.artifacts, "plots/metrics")
+    if m is not None:
         metrics_table = m.to_markdown(index=False)
     else:
-        metrics_table = "_No metrics.csv found_"
+        metrics_table = "_No metrics table found_"
+
+    files = []
+    for label, name in FILES:
+        path = find_table(args.artifacts, name)
+        if path is not None:
+            files.append(f"- {label}: `{os.path.relpath(path, args.artifacts)}`")
+    files_list = "\n".join(files) or "_No tables found_"
 
-    report = TEMPLATE.format(metrics_table=metrics_table)
+    report = TEMPLATE.format(metrics_table=metrics_table, files_list=files_list)
     os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
     with open(args.out, "w", encoding="utf-8") as f:
         f.write(report)
@@ -1,5 +1,5 @@
 import os, argparse, itertools, numpy as np, pandas as pd
-from hft_mm_sim.data import load_csv, synthetic_minute
+from hft_mm_sim.data import load_bars, synthetic_minute
 from hft_mm_sim.config import MMConfig
 from hft_mm_sim.backtester import Backtester
 
@@ -16,14 +16,18 @@ def run_with(cfg, df_slice):
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--csv', type=str, default='')
+    ap.add_argument('--catalog', type=str, default='', help="Dataset catalog root (instead of --csv)")
+    ap.add_argument('--symbol', type=str, default='')
+    ap.add_argument('--start', type=str, default='', help="Only load bars from this time on")
+    ap.add_argument('--end', type=str, default='', help="Only load bars up to this time")
     ap.add_argument('--train_len', type=int, default=2000)
     ap.add_argument('--test_len', type=int, default=1000)
     ap.add_argument('--outcsv', type=str, default='artifacts/walk_forward.csv')
     args = ap.parse_args()
 
-    if args.csv and os.path.exists(args.csv):
-        df = load_csv(args.csv)
-    else:
+    df = load_bars(csv=args.csv, catalog=args.catalog, symbol=args.symbol,
+                   start=args.start or None, end=args.end or None)
+    if df is None:
         df = synthetic_minute(minutes=args.train_len + args.test_len + 1000)
 
     rows = []